@@ -1,5 +1,44 @@
-from .control.vehicle import Vehicle, Lights
+from .misc.const import Lights
 from .misc.track_pieces import TrackPiece, TrackPieceType
-from .control.controller import Controller
 from .misc.lanes import Lane3, Lane4, BaseLane
 from . import errors
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .control.vehicle import Vehicle
+    from .control.controller import Controller
+
+# Vehicle and Controller are imported on first access, so that
+# the codec, track and lane modules can be used without loading bleak.
+_LAZY_IMPORTS = {
+    "Vehicle": ".control.vehicle",
+    "Controller": ".control.controller",
+}
+
+__all__ = (
+    "Vehicle",
+    "Lights",
+    "TrackPiece",
+    "TrackPieceType",
+    "Controller",
+    "Lane3",
+    "Lane4",
+    "BaseLane",
+    "errors",
+)
+
+
+def __getattr__(name: str):
+    try:
+        module = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    # Cache the attribute, so that __getattr__ is only called once per name
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | _LAZY_IMPORTS.keys())
@@ -0,0 +1,70 @@
+from collections.abc import Iterable, Sequence
+from typing import NamedTuple, Optional
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .vehicle import Vehicle
+    pass
+
+__all__ = (
+    "AdapterLoad",
+    "adapter_loads",
+    "least_loaded",
+)
+
+LATENCY_PER_CONNECTION = 0.03
+"""
+The extra ping round trip time, in seconds, that weighs as much as one more connection
+when placing vehicles on adapters. Round trips are only sampled once per ping interval,
+so latency mostly separates adapters that have been congested for a while
+"""
+
+
+class AdapterLoad(NamedTuple):
+    """The load of one Bluetooth adapter of a :class:`Controller`"""
+    adapter: Optional[str]
+    """The name of the adapter, such as ``hci1``. `None` for the default adapter"""
+    connections: int
+    """The number of vehicles connected or connecting through the adapter"""
+    latency: Optional[float]
+    """
+    The mean ping round trip time of those vehicles in seconds.
+    `None` if none of them has answered a ping yet. This is a moving average over
+    the automatic pings, not a per-notification measurement, see :attr:`Vehicle.latency`
+    """
+
+    @property
+    def score(self) -> float:
+        """
+        The number the least loaded adapter is chosen by: the connections,
+        plus one for every :data:`LATENCY_PER_CONNECTION` of latency
+        """
+        return self.connections + (self.latency or 0.0) / LATENCY_PER_CONNECTION
+
+
+def adapter_loads(
+        adapters: Sequence[Optional[str]],
+        vehicles: Iterable["Vehicle"]
+) -> list[AdapterLoad]:
+    """The load of every adapter, in the order of adapters"""
+    members: dict[Optional[str], list["Vehicle"]] = {adapter: [] for adapter in adapters}
+    for vehicle in vehicles:
+        if vehicle.adapter in members:
+            members[vehicle.adapter].append(vehicle)
+    loads = []
+    for adapter, placed in members.items():
+        latencies = [v.latency for v in placed if v.latency is not None]
+        loads.append(AdapterLoad(
+            adapter,
+            len(placed),
+            sum(latencies) / len(latencies) if latencies else None  # type: ignore
+        ))
+    return loads
+
+
+def least_loaded(
+        adapters: Sequence[Optional[str]],
+        vehicles: Iterable["Vehicle"]
+) -> Optional[str]:
+    """The adapter with the lowest :attr:`AdapterLoad.score`. Ties go to the adapter listed first"""
+    return min(adapter_loads(adapters, vehicles), key=lambda load: load.score).adapter
@@ -0,0 +1,188 @@
+import dataclasses
+import json
+import os
+import time
+from collections.abc import Iterator
+from typing import NamedTuple, Optional
+
+from ..misc.advertisement import BatteryState
+
+__all__ = (
+    "CachedVehicle",
+    "VehicleCache",
+)
+
+DEFAULT_MAX_AGE = 600.0
+"""
+The time after which a cached vehicle is scanned for again
+instead of connected to directly, in seconds
+"""
+BATTERY_CHECK_TIMEOUT = 1.0
+"""
+The time a vehicle connected to directly is given to report that it is on a charger, in seconds.
+Vehicles that stay silent are assumed to be off the charger
+"""
+
+_FORMAT_VERSION = 1
+# Stored in the file. Files of other versions are ignored
+
+
+class CachedVehicle(NamedTuple):
+    """What a :class:`VehicleCache` remembers about a vehicle"""
+    address: str
+    """The address of the vehicle"""
+    vehicle_id: Optional[int]
+    """The id the vehicle had on its last connection. `None` if it was never connected"""
+    name: str
+    """The name the vehicle last advertised"""
+    version: int
+    """The firmware version the vehicle last advertised"""
+    battery: BatteryState
+    """The battery state the vehicle last advertised"""
+    rssi: Optional[int]
+    """The signal strength of the last advertisement in dBm, if known"""
+    last_seen: float
+    """:func:`time.time` at which the vehicle was last seen or connected to"""
+
+    def _to_json(self) -> dict:
+        entry = self._asdict()
+        entry["battery"] = dataclasses.asdict(self.battery)
+        return entry
+
+    @classmethod
+    def _from_json(cls, entry: dict) -> "CachedVehicle":
+        return cls(**{**entry, "battery": BatteryState(**entry["battery"])})
+
+
+class VehicleCache:
+    """
+    Remembers the vehicles a :class:`Controller` has seen across restarts,
+    so that it can connect to them by address instead of scanning.
+
+    The cache is a small JSON file. It is read on creation and written by
+    :meth:`VehicleCache.save`, which replaces the file atomically.
+    A missing or unreadable file is treated as an empty cache.
+
+    The battery state in the cache may be outdated, since a vehicle can be put on
+    a charger after it was last seen. The :class:`Controller` therefore checks it
+    after connecting directly, see :data:`BATTERY_CHECK_TIMEOUT`.
+
+    .. code-block:: python
+
+        controller = Controller(cache="vehicles.json")
+        await controller.connect_many(4)  # Known vehicles are connected to directly
+
+    :param path: :class:`str`
+        The file the cache is stored in
+    :param max_age: :class:`Optional[float]`
+        Vehicles not seen for this many seconds are not tried directly anymore.
+        `None` tries them regardless of their age
+    """
+    __slots__ = ("path", "max_age", "_entries", "_dirty")
+
+    def __init__(self, path: str, *, max_age: Optional[float]=DEFAULT_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._entries: dict[str, CachedVehicle] = {}
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        """Replace the cached vehicles with the contents of the file"""
+        self._entries.clear()
+        self._dirty = False
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("version") != _FORMAT_VERSION:
+                return
+            for entry in data["vehicles"]:
+                vehicle = CachedVehicle._from_json(entry)
+                self._entries[vehicle.address] = vehicle
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            # The cache only saves time, so a broken one is simply started over
+            self._entries.clear()
+
+    def save(self):
+        """Write the cache to its file, if anything has changed since it was read or written"""
+        if not self._dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "version": _FORMAT_VERSION,
+                    "vehicles": [vehicle._to_json() for vehicle in self._entries.values()],
+                },
+                file,
+                indent=1
+            )
+        os.replace(temporary, self.path)
+        # Readers never see a half written file
+        self._dirty = False
+
+    def seen(
+            self,
+            address: str,
+            *,
+            name: str,
+            version: int,
+            battery: BatteryState,
+            rssi: Optional[int]=None
+    ):
+        """Record an advertisement of a vehicle"""
+        previous = self._entries.get(address)
+        self._entries[address] = CachedVehicle(
+            address,
+            None if previous is None else previous.vehicle_id,
+            name,
+            version,
+            battery,
+            rssi,
+            time.time()
+        )
+        self._dirty = True
+
+    def assign(self, address: str, vehicle_id: int):
+        """Record that the vehicle at address was connected to with vehicle_id"""
+        previous = self._entries.get(address)
+        if previous is None:
+            return
+        self._entries[address] = previous._replace(vehicle_id=vehicle_id, last_seen=time.time())
+        self._dirty = True
+
+    def forget(self, address: str):
+        """Remove a vehicle from the cache"""
+        if self._entries.pop(address, None) is not None:
+            self._dirty = True
+
+    def get(self, address: str) -> Optional[CachedVehicle]:
+        """The cached vehicle at address, if there is one"""
+        return self._entries.get(address)
+
+    def known(self) -> list[CachedVehicle]:
+        """
+        The vehicles worth connecting to directly: not on a charger
+        and seen within :attr:`VehicleCache.max_age`, most recently seen first
+        """
+        oldest = None if self.max_age is None else time.time() - self.max_age
+        return sorted(
+            (
+                vehicle for vehicle in self._entries.values()
+                if not vehicle.battery.on_charger
+                and (oldest is None or vehicle.last_seen >= oldest)
+            ),
+            key=lambda vehicle: vehicle.last_seen,
+            reverse=True
+        )
+
+    def __iter__(self) -> Iterator[CachedVehicle]:
+        return iter(self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} path={self.path!r} vehicles={len(self._entries)}>"
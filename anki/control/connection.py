@@ -0,0 +1,195 @@
+import random
+import time
+from enum import Enum
+from typing import NamedTuple, Optional
+
+from .. import errors
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .vehicle import Vehicle
+    pass
+
+__all__ = (
+    "ConnectPhase",
+    "ConnectTimings",
+    "RetryPolicy",
+    "ConnectFailure",
+    "PhaseStats",
+    "ConnectReport",
+)
+
+DEFAULT_CONNECT_CONCURRENCY = 3
+"""The number of vehicles a :class:`Controller` connects to at once per adapter by default"""
+
+
+class ConnectPhase(Enum):
+    """The steps of establishing a connection to a vehicle, in the order they happen in"""
+    DISCOVER = "discover"
+    """Scanning for the vehicle"""
+    CONNECT = "connect"
+    """Establishing the Bluetooth connection"""
+    SERVICE_LOOKUP = "service_lookup"
+    """Finding the Anki service and its characteristics"""
+    SDK_ENABLE = "sdk_enable"
+    """Switching the vehicle into SDK mode"""
+    NOTIFY_START = "notify_start"
+    """Subscribing to the notifications of the vehicle"""
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class ConnectTimings:
+    """
+    The time each :class:`ConnectPhase` of a connection took, in seconds.
+    Phases that have not completed (yet) are missing.
+
+    .. code-block:: python
+
+        await vehicle.connect()
+        print(vehicle.connect_timings[ConnectPhase.CONNECT])
+
+    .. note::
+        These are created by :func:`Vehicle.connect`. See :attr:`Vehicle.connect_timings`.
+    """
+    __slots__ = ("durations", "_lap_start")
+
+    def __init__(self):
+        self.durations: dict[ConnectPhase, float] = {}
+        """The duration of every completed phase"""
+        self._lap_start = time.perf_counter()
+
+    def restart(self):
+        """Start timing the next phase now"""
+        self._lap_start = time.perf_counter()
+
+    def lap(self, phase: ConnectPhase):
+        """Record the time since the previous lap (or restart) as the duration of phase"""
+        now = time.perf_counter()
+        self.durations[phase] = now - self._lap_start
+        self._lap_start = now
+
+    def record(self, phase: ConnectPhase, duration: float):
+        """Set the duration of a phase that was timed elsewhere"""
+        self.durations[phase] = duration
+
+    @property
+    def failed_phase(self) -> Optional[ConnectPhase]:
+        """The first phase that has not completed. `None` if all of them did"""
+        for phase in ConnectPhase:
+            if phase not in self.durations:
+                return phase
+        return None
+
+    @property
+    def total(self) -> float:
+        """The sum of all recorded durations"""
+        return sum(self.durations.values())
+
+    def __getitem__(self, phase: ConnectPhase) -> float:
+        return self.durations[phase]
+
+    def __contains__(self, phase: ConnectPhase) -> bool:
+        return phase in self.durations
+
+    def __repr__(self):
+        phases = " ".join(
+            f"{phase.value}={duration * 1000:.1f}ms" for phase, duration in self.durations.items()
+        )
+        return f"<{self.__class__.__name__} {phases}>"
+
+
+class RetryPolicy(NamedTuple):
+    """
+    How failed connection attempts are retried.
+
+    Retries wait for an exponentially growing delay with full jitter:
+    a random time between zero and ``min(max_delay, base_delay * 2 ** retry)``.
+    The jitter keeps vehicles that failed together from retrying in lockstep.
+    """
+    attempts: int = 4
+    """The maximum number of attempts per vehicle, including the first one"""
+    base_delay: float = 0.5
+    """The upper bound of the delay before the first retry, in seconds"""
+    max_delay: float = 8.0
+    """The largest delay between two attempts, in seconds"""
+    retry_on: tuple[type[BaseException], ...] = (
+        errors.ConnectionDatabusError,
+        errors.ConnectionTimedoutError,
+    )
+    """
+    The errors that are worth retrying. These usually go away on their own,
+    while other errors (such as :class:`VehicleNotFoundError`) fail immediately
+    """
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """`True` if another attempt should follow the failed attempt number attempt (from 1)"""
+        return attempt < self.attempts and isinstance(error, self.retry_on)
+
+    def delay(self, attempt: int) -> float:
+        """The time to wait after the failed attempt number attempt (from 1), in seconds"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+NO_RETRY = RetryPolicy(attempts=1)
+"""A :class:`RetryPolicy` that gives up after the first attempt"""
+
+
+class ConnectFailure(NamedTuple):
+    """A vehicle that could not be connected to"""
+    vehicle_id: Optional[int]
+    """The requested vehicle id. `None` if the id was to be assigned automatically"""
+    error: BaseException
+    """The error raised by the last attempt"""
+    attempts: int
+    """The number of attempts made"""
+    timings: ConnectTimings
+    """The timings of the last attempt. :attr:`ConnectTimings.failed_phase` is where it failed"""
+
+
+class PhaseStats(NamedTuple):
+    """The durations of one :class:`ConnectPhase` across several connections, in seconds"""
+    count: int
+    mean: float
+    min: float
+    max: float
+
+
+class ConnectReport(NamedTuple):
+    """The outcome of :func:`Controller.connect_fleet`"""
+    vehicles: tuple["Vehicle", ...]
+    """The connected vehicles, in the order they were requested in"""
+    failures: tuple[ConnectFailure, ...]
+    """The vehicles that could not be connected to"""
+    elapsed: float
+    """The wall-clock time the whole fleet took to connect, in seconds"""
+
+    @property
+    def ok(self) -> bool:
+        """`True` if every vehicle was connected"""
+        return not self.failures
+
+    def phase_stats(self) -> dict[ConnectPhase, PhaseStats]:
+        """
+        Statistics of the time every phase took, over all connected and failed vehicles.
+        Phases no vehicle completed are left out.
+        """
+        timings = [vehicle.connect_timings for vehicle in self.vehicles]
+        timings += [failure.timings for failure in self.failures]
+        stats = {}
+        for phase in ConnectPhase:
+            durations = [t[phase] for t in timings if t is not None and phase in t]
+            if durations:
+                stats[phase] = PhaseStats(
+                    len(durations),
+                    sum(durations) / len(durations),
+                    min(durations),
+                    max(durations)
+                )
+        return stats
+
+    def raise_first(self):
+        """Raise the error of the first failure, if there is one"""
+        if self.failures:
+            raise self.failures[0].error
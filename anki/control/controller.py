@@ -1,16 +1,43 @@
 import bleak
 import asyncio
+import time
 from bleak.backends.device import BLEDevice
 from bleak.backends.scanner import AdvertisementData
 
 from ..misc.const import TrackPieceType
 from .. import errors
 from .vehicle import Vehicle, interpret_local_name
+from .ingress import NotificationIngress
+from .events import EventBus, FleetEvent, Subscription, VehicleEvent
+from .streams import OverflowPolicy, TelemetryStream, _notification_stream
+from .snapshot import FleetSnapshot, FleetTable
+from .export import TelemetryRecorder
+from .connection import (
+    DEFAULT_CONNECT_CONCURRENCY,
+    NO_RETRY,
+    ConnectFailure,
+    ConnectPhase,
+    ConnectReport,
+    ConnectTimings,
+    RetryPolicy
+)
+from ..misc import msg_protocol
+from ..misc.msgs import DECODERS, decode_raw
 from ..misc.track_pieces import TrackPiece
 from .scanner import BaseScanner, Scanner
+from .discovery import Candidate, DiscoverySession
+from .cache import BATTERY_CHECK_TIMEOUT, CachedVehicle, VehicleCache
+from .monitor import AdvertisementMonitor, MonitoredVehicle
+from .adapters import AdapterLoad, adapter_loads, least_loaded
+from ..misc.advertisement import BatteryState
 
-from typing import Optional
-from collections.abc import Collection
+from typing import Any, Optional
+from collections.abc import Callable, Collection, Sequence
+
+_FLEET_EVENT = "fleet"
+# The event published on Controller._events for every notification of every vehicle
+DEFAULT_FLEET_STREAM_SIZE = 256
+"""The number of events a fleet stream buffers by default"""
 
 
 def _is_anki(device: BLEDevice, advertisement: AdvertisementData):
@@ -34,41 +61,312 @@ class Controller:
     With it you can connect to any number of vehicles and disconnect cleanly.
 
     :param timeout: :class:`float` The time until the controller gives up searching for a vehicle.
+    :param connect_concurrency: :class:`int`
+        The number of vehicles connected to at once per adapter.
+    :param cache: :class:`Optional[str | VehicleCache]`
+        A file to remember vehicles in across restarts.
+        Known vehicles are connected to by address first, see :class:`VehicleCache`.
+        Those that report being on a charger are disconnected again and scanned for instead.
+    :param adapters: :class:`Optional[Sequence[str]]`
+        The Bluetooth adapters to use, such as ``hci0``.
+        New vehicles are placed on the least loaded one, see :func:`Controller.adapter_load`.
+        Scans run on the first one. Defaults to the default adapter only.
     """
     __slots__ = (
         "_scanner",
         "timeout",
         "vehicles",
         "map",
+        "_ingress",
+        "_events",
+        "_fleet",
+        "_recorders",
+        "connect_concurrency",
+        "_connect_slots",
+        "_discovery_lock",
+        "_discovery",
+        "_cache",
+        "_monitor",
+        "adapters",
     )
 
-    def __init__(self, *, timeout: float=10):
-        self._scanner = bleak.BleakScanner()
+    def __init__(
+            self,
+            *,
+            timeout: float=10,
+            connect_concurrency: int=DEFAULT_CONNECT_CONCURRENCY,
+            cache: str|VehicleCache|None=None,
+            adapters: Optional[Sequence[str]]=None
+    ):
+        if connect_concurrency < 1:
+            raise ValueError("connect_concurrency has to be at least 1")
+        self.adapters: tuple[Optional[str], ...] = tuple(adapters) if adapters else (None,)
+        # None stands for the default adapter
+        self._scanner = bleak.BleakScanner(**self._bluez(self.adapters[0]))
         self.timeout = timeout
+        self.connect_concurrency = connect_concurrency
+        self._connect_slots: dict[Optional[str], asyncio.Semaphore] = {}
+        # Limits the connection attempts running at once. One per adapter, None is the default
+        self._discovery_lock = asyncio.Lock()
+        # Only one scan runs at a time, so concurrent connections never discover the same vehicle
+        self._discovery: Optional[DiscoverySession] = None
+        # Vehicles found by the last call to discover. Claimed before scanning again
+        self._cache = VehicleCache(cache) if isinstance(cache, str) else cache
+        self._monitor: Optional[AdvertisementMonitor] = None
+        # While it runs, vehicles are taken from its inventory instead of scanning
         self.vehicles: set[Vehicle] = set()
         self.map: Optional[list[TrackPiece]] = None
+        self._ingress: Optional[NotificationIngress] = None
+        # Created on the first connection, since it needs the running loop
+        self._events = EventBus()
+        self._fleet = FleetTable()
+        # Updated by the vehicles whenever their state changes
+        self._recorders: list[TelemetryRecorder] = []
         pass
 
+    def _notification_ingress(self) -> NotificationIngress:
+        # The ingress shared by all vehicles of this controller
+        loop = asyncio.get_running_loop()
+        if self._ingress is None or self._ingress.loop is not loop:
+            self._ingress = NotificationIngress(loop)
+        return self._ingress
+
+    def _tapping(self) -> bool:
+        # True if the vehicles have to pass their notifications to _fleet_tap
+        return bool(self._recorders) or self._events.has_subscribers(_FLEET_EVENT)
+
+    def _install_tap(self):
+        for vehicle in self.vehicles:
+            vehicle._tap = self._fleet_tap
+
+    def _fleet_tap(self, vehicle: Vehicle, msg_type: int, message: Any, data: bytearray):
+        # Installed on the vehicles once a fleet stream or a recorder has been opened
+        if self._recorders:
+            closed = False
+            for recorder in self._recorders:
+                closed |= not recorder.add(vehicle._received_at, vehicle.id, data)
+            if closed:
+                self._recorders = [r for r in self._recorders if not r.closed]
+        if not self._events.has_subscribers(_FLEET_EVENT):
+            return
+        if message is None:
+            # The vehicle itself ignores this message type
+            message = DECODERS.get(msg_type, decode_raw)(data, msg_protocol.PAYLOAD_OFFSET)
+        self._events.publish(
+            _FLEET_EVENT,
+            FleetEvent(vehicle._received_at, vehicle.id, msg_type, message)
+        )
+
+    def events(
+            self,
+            *,
+            maxsize: int=DEFAULT_FLEET_STREAM_SIZE,
+            policy: OverflowPolicy=OverflowPolicy.DROP_OLDEST
+    ) -> TelemetryStream[FleetEvent]:
+        """
+        Open a single stream of the notifications of all vehicles of this controller,
+        including vehicles that connect later on.
+
+        Notifications of all vehicles are processed in the order they were received in,
+        so the stream is ordered by :attr:`FleetEvent.timestamp`. Use this instead of
+        one callback per vehicle when your logic has to look at the whole fleet at once.
+
+        .. code-block:: python
+
+            with controller.events() as events:
+                async for event in events:
+                    if event.msg_type == const.VehicleMsg.TRACK_PIECE_CHANGE:
+                        check_collisions(event.vehicle_id, event.timestamp)
+
+        :param maxsize: :class:`int`
+            The number of events buffered for a slow consumer
+        :param policy: :class:`OverflowPolicy`
+            What happens to new events while the buffer is full. See :func:`Vehicle.stream`
+
+        Returns
+        -------
+        :class:`TelemetryStream[FleetEvent]`
+            The stream. Close it when you are done with it
+
+        Raises
+        ------
+        :class:`ValueError`
+            policy is :attr:`OverflowPolicy.BLOCK`. The vehicles never wait for a consumer
+        """
+        stream = _notification_stream(maxsize, policy)
+        stream._attach(self._events.subscribe(_FLEET_EVENT, stream.offer))
+        self._install_tap()
+        return stream
+
+    def record(self, directory: str, **kwargs) -> TelemetryRecorder:
+        """
+        Record the notifications of all vehicles of this controller to disk,
+        including vehicles that connect later on.
+
+        The notifications are only copied into a buffer on the event loop.
+        Decoding and writing happen on a background thread, see :class:`TelemetryRecorder`.
+        Recording stops once the recorder is closed.
+
+        .. code-block:: python
+
+            async with controller.record("telemetry", chunks_per_file=64) as recorder:
+                await race()
+
+        :param directory: :class:`str`
+            The directory the files are written to
+        :param kwargs:
+            Passed on to :class:`TelemetryRecorder`
+
+        Returns
+        -------
+        :class:`TelemetryRecorder`
+            The recorder. Close it when you are done recording
+
+        Raises
+        ------
+        :class:`ImportError`
+            NumPy is not installed
+        """
+        recorder = TelemetryRecorder(directory, **kwargs)
+        self._recorders.append(recorder)
+        self._install_tap()
+        return recorder
+
+    def at_position(
+            self,
+            position: int,
+            action: Callable[[Vehicle], Any],
+            *,
+            once: bool=False,
+            **kwargs
+    ) -> tuple[Subscription, ...]:
+        """
+        Run an action whenever one of the connected vehicles drives onto a position of the map.
+        See :func:`Vehicle.at_position`. With once, the action runs once per vehicle.
+
+        .. note::
+            Only vehicles that are connected at the time of the call are affected.
+
+        Returns
+        -------
+        :class:`tuple[Subscription, ...]`
+            One subscription per vehicle
+        """
+        return tuple(
+            vehicle.at_position(position, action, once=once, **kwargs)
+            for vehicle in self.vehicles
+        )
+
+    def at_piece_type(
+            self,
+            piece_type: TrackPieceType,
+            action: Callable[[Vehicle], Any],
+            *,
+            once: bool=False,
+            **kwargs
+    ) -> tuple[Subscription, ...]:
+        """
+        Run an action whenever one of the connected vehicles drives onto a track piece
+        of the given type. See :func:`Vehicle.at_piece_type` and :func:`Controller.at_position`
+
+        Returns
+        -------
+        :class:`tuple[Subscription, ...]`
+            One subscription per vehicle
+        """
+        return tuple(
+            vehicle.at_piece_type(piece_type, action, once=once, **kwargs)
+            for vehicle in self.vehicles
+        )
+
     async def _get_vehicle(
             self,
             vehicle_id: Optional[int]=None,
-            address: str|None=None
+            address: str|None=None,
+            timings: Optional[ConnectTimings]=None,
+            cached: Optional[CachedVehicle]=None
     ) -> Vehicle:
         # Finds a Supercar and creates a Vehicle instance around it
-        device = await self._scanner.find_device_by_filter(
-            lambda device, advertisement:
-                _is_anki(device, advertisement)
-                and (address is None or device.address == address),
-            timeout=self.timeout
-        )  # type: ignore
-        # Get a BLEDevice and ensure it is of a required address if address was given
-        if device is None:
-            raise errors.VehicleNotFoundError("Could not find a supercar within the given timeout")
-            pass
+        if cached is not None:
+            # Known from an earlier run. Connecting by address skips the scan
+            if timings is not None:
+                timings.record(ConnectPhase.DISCOVER, 0.0)
+            return self._add_vehicle(vehicle_id, cached.address, cached.battery)
 
-        client = bleak.BleakClient(device)
+        async with self._discovery_lock:
+            if timings is not None:
+                timings.restart()
+            claimed = {v._client.address for v in self.vehicles}
+            # Vehicles that are still connecting keep advertising, so they have to be skipped
+            candidate = None
+            if self._discovery is not None:
+                candidate = self._discovery.claim(address, claimed)
+                if candidate is not None and timings is not None:
+                    timings.record(ConnectPhase.DISCOVER, self._discovery.elapsed)
+                    # The vehicle was found by the shared scan
+            if candidate is None and self._monitoring():
+                # A second scan would interfere with the monitor's
+                found = await self._watch(1, self.timeout, claimed, address)
+                if not found:
+                    raise errors.VehicleNotFoundError(
+                        "Could not find a supercar within the given timeout"
+                    )
+                candidate = found[0]
+                if timings is not None:
+                    timings.lap(ConnectPhase.DISCOVER)
+            if candidate is not None:
+                device = candidate.device
+                battery = candidate.battery
+            else:
+                device = await self._scanner.find_device_by_filter(
+                    lambda device, advertisement:
+                        _is_anki(device, advertisement)
+                        and device.address not in claimed
+                        and (address is None or device.address == address),
+                    timeout=self.timeout,
+                    **self._bluez(self.adapters[0])
+                )  # type: ignore
+                # Get a BLEDevice and ensure it is of a required address if address was given
+                if device is None:
+                    raise errors.VehicleNotFoundError(
+                        "Could not find a supercar within the given timeout"
+                    )
+                    pass
+                if timings is not None:
+                    timings.lap(ConnectPhase.DISCOVER)
+                battery, version, name = interpret_local_name(device.name)
+                if self._cache is not None:
+                    self._cache.seen(device.address, name=name, version=version, battery=battery)
 
+            return self._add_vehicle(vehicle_id, device, battery)
+        pass
+
+    @staticmethod
+    def _bluez(adapter: Optional[str]) -> dict[str, Any]:
+        # The keyword arguments that make a bleak scanner or client use adapter
+        return {} if adapter is None else {"bluez": {"adapter": adapter}}
+
+    def _make_client(self, device: BLEDevice|str, adapter: Optional[str]) -> bleak.BleakClient:
+        if isinstance(device, str) or adapter != self.adapters[0]:
+            # Devices found by a scan belong to the scanning adapter.
+            # Other adapters are given the address and look the device up themselves
+            address = device if isinstance(device, str) else device.address
+            return bleak.BleakClient(address, timeout=self.timeout, **self._bluez(adapter))
+        return bleak.BleakClient(device, **self._bluez(adapter))
+
+    def _add_vehicle(
+            self,
+            vehicle_id: Optional[int],
+            device: BLEDevice|str,
+            battery: BatteryState
+    ) -> Vehicle:
+        address = device if isinstance(device, str) else device.address
         vehicle_ids = {v.id for v in self.vehicles}
+        if vehicle_id is None and self._cache is not None:
+            known = self._cache.get(address)
+            if known is not None and known.vehicle_id not in vehicle_ids:
+                vehicle_id = known.vehicle_id
+                # Keep the id the vehicle had last time
         if vehicle_id is None:
             # Automatically assign generate unused vehicle id
             vehicle_id = 1024
@@ -79,25 +377,391 @@ class Controller:
         elif vehicle_id in vehicle_ids:
             raise RuntimeError(f"Duplicate id for vehicle. Id {vehicle_id} already in use.")
 
+        adapter = least_loaded(self.adapters, self.vehicles)
         vehicle = Vehicle(
             vehicle_id,
-            device,
-            client,
+            device,  # type: ignore
+            # Only used if no client is given, so an address does just as well
+            self._make_client(device, adapter),
             self,
-            battery=interpret_local_name(device.name)[0]
+            battery=battery
         )
-        self.vehicles.add(vehicle)
+        vehicle._adapter = adapter
+        self._adopt(vehicle)
         return vehicle
-        pass
+
+    def _adopt(self, vehicle: Vehicle):
+        # Makes a vehicle part of this controller
+        if self._tapping():
+            vehicle._tap = self._fleet_tap
+        vehicle._fleet_table = self._fleet
+        vehicle._fleet_row = self._fleet.add(vehicle, vehicle.id)
+        vehicle._map = self.map
+        # If there is no map it sets None which is the default for Vehicle._map anyway
+        self.vehicles.add(vehicle)
+
+    def _forget(self, vehicle: Vehicle):
+        # Removes a vehicle that never finished connecting
+        self.vehicles.discard(vehicle)
+        if vehicle._fleet_table is not None:
+            vehicle._fleet_table.remove(vehicle._fleet_row)
+            vehicle._fleet_table = None
+
+    def _connect_slot(self, adapter: Optional[str]=None) -> asyncio.Semaphore:
+        slot = self._connect_slots.get(adapter)
+        if slot is None:
+            slot = self._connect_slots[adapter] = asyncio.Semaphore(self.connect_concurrency)
+        return slot
+
+    async def _connect_with_retry(
+            self,
+            vehicle_id: Optional[int],
+            address: Optional[str],
+            retry: RetryPolicy,
+            cached: Optional[CachedVehicle]=None,
+            vehicle: Optional[Vehicle]=None
+    ) -> Vehicle|ConnectFailure:
+        # Discovers and connects one vehicle, unless one is passed that only needs connecting.
+        # Never raises, failures are returned instead
+        timings = ConnectTimings()
+        if vehicle is not None:
+            timings.record(ConnectPhase.DISCOVER, 0.0)
+            # Already known, nothing to look for
+        attempt = 0
+        while True:
+            attempt += 1
+            if attempt > 1:
+                # Every attempt gets timings of its own, so that a failure only
+                # shows the phases of the last attempt. Discovery is not repeated
+                # once it has succeeded
+                previous, timings = timings, ConnectTimings()
+                if vehicle is not None and ConnectPhase.DISCOVER in previous:
+                    timings.record(ConnectPhase.DISCOVER, previous[ConnectPhase.DISCOVER])
+            try:
+                if vehicle is None:
+                    vehicle = await self._get_vehicle(vehicle_id, address, timings, cached)
+                async with self._connect_slot(vehicle.adapter):
+                    await vehicle.connect(timings=timings)
+                if self._cache is not None:
+                    self._cache.assign(vehicle._client.address, vehicle.id)
+                return vehicle
+            except Exception as e:
+                if vehicle is not None:
+                    try:
+                        await vehicle._client.disconnect()
+                        # A later phase may have failed on an established connection
+                    except Exception:
+                        pass
+                if not retry.should_retry(e, attempt):
+                    if vehicle is not None:
+                        self._forget(vehicle)
+                    return ConnectFailure(vehicle_id, e, attempt, timings)
+            await asyncio.sleep(retry.delay(attempt))
+
+    def _cached_plan(
+            self,
+            vehicle_ids: list[Optional[int]],
+            address: Optional[str]
+    ) -> list[Optional[CachedVehicle]]:
+        # Picks a known vehicle to try directly for each requested id, if there are enough
+        plan: list[Optional[CachedVehicle]] = [None] * len(vehicle_ids)
+        if self._cache is None:
+            return plan
+        connected = {v._client.address for v in self.vehicles}
+        known = [
+            vehicle for vehicle in self._cache.known()
+            if vehicle.address not in connected and (address is None or vehicle.address == address)
+        ]
+        if self._monitoring():
+            # The monitor knows the current battery states.
+            # Vehicles it has not heard from are unlikely to answer
+            current = {
+                vehicle.address: vehicle for vehicle in self._monitor.inventory()  # type: ignore
+            }
+            known = [
+                vehicle for vehicle in known
+                if vehicle.address in current and not current[vehicle.address].battery.on_charger
+            ]
+        for i, vehicle_id in enumerate(vehicle_ids):
+            # A requested id goes to the vehicle that had it last time
+            match = next(
+                (v for v in known if vehicle_id is not None and v.vehicle_id == vehicle_id),
+                None
+            )
+            if match is not None:
+                plan[i] = match
+                known.remove(match)
+        for i in range(len(plan)):
+            if plan[i] is None and known:
+                plan[i] = known.pop(0)
+        return plan
+
+    async def _connect_all(
+            self,
+            vehicle_ids: list[Optional[int]],
+            address: Optional[str],
+            retry: RetryPolicy,
+            discover: bool
+    ) -> list[Vehicle|ConnectFailure]:
+        # Connects to known vehicles by address first, then scans for the rest
+        results: list[Vehicle|ConnectFailure|None] = [None] * len(vehicle_ids)
+        plan = self._cached_plan(vehicle_ids, address)
+        direct = [i for i, cached in enumerate(plan) if cached is not None]
+        if direct:
+            confirmed = self._monitoring()
+            # _cached_plan has already checked the battery states with the monitor
+            outcomes = await asyncio.gather(*[
+                self._connect_cached(vehicle_ids[i], plan[i], confirmed)  # type: ignore
+                for i in direct
+            ])
+            for i, outcome in zip(direct, outcomes):
+                results[i] = outcome
+                # Vehicles that are off, out of range or charging are scanned for like unknown ones
+
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            if discover:
+                await self.discover(len(misses))
+                # One scan for the whole fleet. Vehicles it misses are scanned for one by one
+            outcomes = await asyncio.gather(*[
+                self._connect_with_retry(vehicle_ids[i], address, retry)
+                for i in misses
+            ])
+            for i, outcome in zip(misses, outcomes):
+                results[i] = outcome
+        if self._cache is not None:
+            self._cache.save()
+        return results  # type: ignore
+
+    async def _connect_cached(
+            self,
+            vehicle_id: Optional[int],
+            cached: CachedVehicle,
+            confirmed: bool
+    ) -> Optional[Vehicle]:
+        # Connects to a known vehicle by address.
+        # None if it could not be reached or turned out to be on a charger
+        outcome = await self._connect_with_retry(vehicle_id, None, NO_RETRY, cached)
+        if not isinstance(outcome, Vehicle):
+            return None
+        if confirmed or not await self._reports_charging(outcome, cached.battery):
+            return outcome
+
+        if self._cache is not None:
+            self._cache.seen(
+                cached.address,
+                name=cached.name,
+                version=cached.version,
+                battery=outcome.battery_state
+            )
+        try:
+            await outcome.disconnect()
+        except errors.DisconnectFailedError:
+            # It is not handed out, so it is dropped all the same
+            outcome._ping_task.cancel()
+            self._forget(outcome)
+        return None
+
+    async def _reports_charging(self, vehicle: Vehicle, cached: BatteryState) -> bool:
+        # Waits for the first battery notification of a vehicle connected to from the cache.
+        # The cached state may be outdated, and charging vehicles must not be handed out
+        if vehicle.battery_state is cached:
+            # Every CHARGER_INFO replaces the state, so nothing has been reported yet
+            reported = asyncio.get_running_loop().create_future()
+            subscription = vehicle.subscribe(
+                VehicleEvent.BATTERY_CHANGE,
+                lambda: reported.done() or reported.set_result(None),
+                once=True
+            )
+            try:
+                await asyncio.wait_for(reported, BATTERY_CHECK_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                subscription.cancel()
+        return vehicle.battery_state.on_charger
+
+    async def discover(
+            self,
+            amount: Optional[int]=None,
+            *,
+            timeout: Optional[float]=None
+    ) -> DiscoverySession:
+        """Scan for vehicles once and keep the results for the next connections.
+
+        The connect methods hand out the vehicles found, best first, before scanning again.
+        See :class:`DiscoverySession` and :attr:`Candidate.rank`.
+        :func:`Controller.connect_fleet` calls this itself.
+
+        :param amount: :class:`Optional[int]`
+            Stop scanning as soon as this many vehicles have been found
+        :param timeout: :class:`Optional[float]`
+            The longest time to scan for. Defaults to :attr:`Controller.timeout`
+
+        Returns
+        -------
+        :class:`DiscoverySession`
+            The vehicles found
+        """
+        session = DiscoverySession(scanner_factory=self._scanner_factory())
+        if timeout is None:
+            timeout = self.timeout
+        async with self._discovery_lock:
+            if self._monitoring():
+                started = time.perf_counter()
+                claimed = {v._client.address for v in self.vehicles}
+                for candidate in await self._watch(amount or 0, timeout, claimed):
+                    session.add(candidate)
+                session.elapsed = time.perf_counter() - started
+                candidates = session.candidates()
+            else:
+                candidates = await session.run(amount, timeout)
+        self._discovery = session
+        if self._cache is not None:
+            for candidate in candidates:
+                self._cache.seen(
+                    candidate.address,
+                    name=candidate.name,
+                    version=candidate.version,
+                    battery=candidate.battery,
+                    rssi=candidate.rssi
+                )
+        return session
+
+    def _monitoring(self) -> bool:
+        return self._monitor is not None and self._monitor.running
+
+    async def _watch(
+            self,
+            amount: int,
+            timeout: float,
+            claimed: set[str],
+            address: Optional[str]=None
+    ) -> list[Candidate]:
+        # Waits until the monitor has seen amount connectable vehicles.
+        # Returns the ones it has seen by then, which may be fewer
+        def connectable(vehicle: MonitoredVehicle) -> bool:
+            return (
+                not vehicle.battery.on_charger
+                and vehicle.address not in claimed
+                and (address is None or vehicle.address == address)
+            )
+
+        try:
+            vehicles = await self._monitor.wait_for_available(  # type: ignore
+                amount, connectable, timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            vehicles = self._monitor.available(connectable)  # type: ignore
+        return [vehicle.to_candidate() for vehicle in vehicles]
+
+    def monitor(self, **kwargs) -> AdvertisementMonitor:
+        """Watch the advertisements of the vehicles nearby without connecting to them.
+
+        While the monitor is running, the controller takes the vehicles it connects to
+        from the monitor's inventory instead of starting scans of its own.
+        Stopping the controller with ``async with`` stops the monitor as well.
+
+        .. code-block:: python
+
+            async with controller.monitor() as monitor:
+                await monitor.wait_for_available(4)
+                await controller.connect_many(4)
+
+        :param kwargs:
+            Passed on to :class:`AdvertisementMonitor`
+
+        Returns
+        -------
+        :class:`AdvertisementMonitor`
+            The monitor. It has to be started with ``async with``
+            or :meth:`AdvertisementMonitor.start`
+        """
+        kwargs.setdefault("scanner_factory", self._scanner_factory())
+        self._monitor = AdvertisementMonitor(**kwargs)
+        return self._monitor
+
+    def _scanner_factory(self) -> Optional[Callable[..., Any]]:
+        # Creates scanners on the scanning adapter. None means bleak's default
+        bluez = self._bluez(self.adapters[0])
+        if not bluez:
+            return None
+        return lambda **kwargs: bleak.BleakScanner(**bluez, **kwargs)
+
+    def adapter_load(self) -> list[AdapterLoad]:
+        """
+        The load of every adapter in :attr:`Controller.adapters`: the number of vehicles
+        connected through it and their mean ping round trip time.
+        New vehicles are placed on the one with the lowest :attr:`AdapterLoad.score`.
+
+        Returns
+        -------
+        :class:`list[AdapterLoad]`
+            One entry per adapter, in the order they were given in
+        """
+        return adapter_loads(self.adapters, self.vehicles)
+
+    async def reconnect(self, vehicle: Vehicle, *, retry: RetryPolicy=NO_RETRY) -> Vehicle:
+        """Connect to a vehicle again, on the adapter that is least loaded now.
+
+        The vehicle is disconnected first if it still is connected.
+        It keeps its id, subscriptions and history.
+
+        :param vehicle: :class:`Vehicle`
+            A vehicle of this controller
+        :param retry: :class:`RetryPolicy`
+            How failed connection attempts are retried. By default they are not
+
+        Returns
+        -------
+        :class:`Vehicle`
+            The vehicle passed
+
+        Raises
+        ------
+        :class:`ConnectionTimedoutException`
+            The connection attempt to the supercar did not succeed within the set timeout
+
+        :class:`ConnectionDatabusException`
+            A databus error occured whilst connecting to the supercar
+
+        :class:`ConnectionFailedException`
+            A generic error occured whilst connection to the supercar
+        """
+        if vehicle.is_connected:
+            await vehicle.disconnect()
+        else:
+            # The connection was lost without Vehicle.disconnect
+            self._forget(vehicle)
+            ping_task = getattr(vehicle, "_ping_task", None)
+            if ping_task is not None:
+                ping_task.cancel()
+
+        adapter = least_loaded(self.adapters, self.vehicles)
+        vehicle._client = self._make_client(vehicle._client.address, adapter)
+        vehicle._adapter = adapter
+        vehicle._latency = None
+        # Measured through the old adapter
+        self._adopt(vehicle)
+        result = await self._connect_with_retry(vehicle.id, None, retry, vehicle=vehicle)
+        if self._cache is not None:
+            self._cache.save()
+        if isinstance(result, ConnectFailure):
+            raise result.error
+        return result
 
     async def connect_one(
             self,
-            vehicle_id: Optional[int]=None
+            vehicle_id: Optional[int]=None,
+            *,
+            retry: RetryPolicy=NO_RETRY
     ) -> Vehicle:
         """Connect to one non-charging Supercar and return the Vehicle instance
 
         :param vehicle_id: :class:`Optional[int]`
             The id given to the :class:`Vehicle` instance on connection
+        :param retry: :class:`RetryPolicy`
+            How failed connection attempts are retried. By default they are not
 
 
         Returns
@@ -124,17 +788,18 @@ class Controller:
             A vehicle with the specified id already exists.
             This will only be raised when using a custom id.
         """
-        vehicle = await self._get_vehicle(vehicle_id)
-        vehicle._map = self.map
-        # If there is no map it sets None which is the default for Vehicle._map anyway
-        await vehicle.connect()
-        return vehicle
+        result, = await self._connect_all([vehicle_id], None, retry, discover=False)
+        if isinstance(result, ConnectFailure):
+            raise result.error
+        return result
         pass
 
     async def connect_specific(
             self,
             address: str,
-            vehicle_id: Optional[int]=None
+            vehicle_id: Optional[int]=None,
+            *,
+            retry: RetryPolicy=NO_RETRY
     ) -> Vehicle:
         """Connect to a supercar with a specified MAC address
         
@@ -142,6 +807,8 @@ class Controller:
             The MAC-address of the vehicle to connect to. Needs to be uppercase seperated by colons
         :param vehicle_id: :class:`int`
             The id passed to the :class:`Vehicle` object on its creation
+        :param retry: :class:`RetryPolicy`
+            How failed connection attempts are retried. By default they are not
 
         Returns
         -------
@@ -166,22 +833,84 @@ class Controller:
             A vehicle with the specified id already exists.
             This will only be raised when using a custom id.
         """
-        vehicle = await self._get_vehicle(vehicle_id, address)
-        await vehicle.connect()
-        return vehicle
+        result, = await self._connect_all([vehicle_id], address, retry, discover=False)
+        if isinstance(result, ConnectFailure):
+            raise result.error
+        return result
         pass
+
+    async def connect_fleet(
+            self,
+            amount: int,
+            vehicle_ids: Collection[int|None]|None=None,
+            *,
+            retry: RetryPolicy=RetryPolicy()
+    ) -> ConnectReport:
+        """Connect to <amount> non-charging Supercars concurrently and report the outcome.
+
+        With a cache, vehicles known from earlier runs are connected to by address first.
+        The remaining vehicles are found with a single scan, see :func:`Controller.discover`.
+        Scans run one at a time, so no vehicle is discovered twice.
+        The slow part, setting up the connections, runs for up to
+        :attr:`Controller.connect_concurrency` vehicles at once.
+        Attempts failing with a transient error are retried as configured by retry.
+        A vehicle that cannot be connected to does not abort the others.
+
+        .. code-block:: python
+
+            report = await controller.connect_fleet(8)
+            for failure in report.failures:
+                print(failure.error, "after", failure.attempts, "attempts")
+            print(report.phase_stats()[ConnectPhase.CONNECT].mean)
+
+        :param amount: :class:`int`
+            The amount of vehicles to connect to
+        :param vehicle_ids: :class:`Optional[Iterable[int]]`
+            The vehicle ids passed to the :class:`Vehicle` instances
+        :param retry: :class:`RetryPolicy`
+            How failed connection attempts are retried
+
+        Returns
+        -------
+        :class:`ConnectReport`
+            The connected vehicles, the failures and how long each phase took
+
+        Raises
+        ------
+        :class:`ValueError`
+            The amount of requested supercars does not match the length of :param vehicle_ids:
+        """
+        if vehicle_ids is None:
+            vehicle_ids = [None] * amount
+        if amount != len(vehicle_ids):
+            raise ValueError(
+                "Amount of passed vehicle ids is different to amount of requested connections"
+            )
+
+        started = time.perf_counter()
+        results = await self._connect_all(list(vehicle_ids), None, retry, discover=True)
+        return ConnectReport(
+            tuple(result for result in results if isinstance(result, Vehicle)),
+            tuple(result for result in results if isinstance(result, ConnectFailure)),
+            time.perf_counter() - started
+        )
     
     async def connect_many(
             self,
             amount: int,
-            vehicle_ids: Collection[int|None]|None=None
+            vehicle_ids: Collection[int|None]|None=None,
+            *,
+            retry: RetryPolicy=RetryPolicy()
     ) -> tuple[Vehicle, ...]:
-        """Connect to <amount> non-charging Supercars
+        """Connect to <amount> non-charging Supercars.
+        The connections are set up concurrently, see :func:`Controller.connect_fleet`
         
         :param amount: :class:`int`
             The amount of vehicles to connect to
         :param vehicle_ids: :class:`Optional[Iterable[int]]`
             The vehicle ids passed to the :class:`Vehicle` instances
+        :param retry: :class:`RetryPolicy`
+            How failed connection attempts are retried
 
         Returns
         -------
@@ -208,20 +937,15 @@ class Controller:
         :class:`RuntimeError`
             A vehicle with the specified id already exists.
             This will only be raised when using a custom id.
-        """
 
-        if vehicle_ids is None:
-            vehicle_ids = [None] * amount
-        if amount != len(vehicle_ids):
-            raise ValueError(
-                "Amount of passed vehicle ids is different to amount of requested connections"
-            )
-
-        return tuple([
-            await self.connect_one(vehicle_id)
-            for vehicle_id in vehicle_ids]
-        )
-        # Done in series because the documentation said that would be more stable
+        .. note::
+            The error of the first vehicle that failed is raised once all attempts are over.
+            The vehicles that did connect stay connected.
+            Use :func:`Controller.connect_fleet` to get all failures.
+        """
+        report = await self.connect_fleet(amount, vehicle_ids, retry=retry)
+        report.raise_first()
+        return report.vehicles
         pass
 
     async def scan(
@@ -306,7 +1030,7 @@ class Controller:
 
         for v in self.vehicles:
             v._map = self.map
-            v._position = len(self.map) - 1 if v in vehicles_no_scan else 0
+            v._set_position(len(self.map) - 1 if v in vehicles_no_scan else 0)
             # Scanner is always one piece ahead
             pass
 
@@ -332,9 +1056,31 @@ class Controller:
         pass
 
     async def __aexit__(self, *args):
+        if self._monitor is not None:
+            await self._monitor.stop()
         await self.disconnect_all()
         pass
 
+    def snapshot(self) -> FleetSnapshot:
+        """
+        The current state of all vehicles as one struct-of-arrays view.
+        Reading a snapshot costs a single call, instead of one property access
+        per vehicle and value. The columns are maintained by the vehicles as
+        notifications arrive, so taking a snapshot only copies them.
+        If nothing has changed since the last call, the same snapshot is returned.
+
+        .. code-block:: python
+
+            snapshot = controller.snapshot()
+            lanes = Lane4.get_closest_lanes(snapshot.offsets)
+
+        Returns
+        -------
+        :class:`FleetSnapshot`
+            An immutable copy of the fleet state
+        """
+        return self._fleet.snapshot()
+
     @property
     def map_types(self) -> tuple[TrackPieceType, ...]|None:
         if self.map is None:
@@ -0,0 +1,223 @@
+import asyncio
+import time
+from collections.abc import Callable, Collection
+from typing import Any, NamedTuple, Optional
+
+import bleak
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+
+from ..misc.advertisement import BatteryState, interpret_local_name
+
+__all__ = (
+    "Candidate",
+    "DiscoverySession",
+)
+
+DEFAULT_MAX_AGE = 10.0
+"""
+The time after which a candidate that was not heard from again
+is not handed out anymore, in seconds
+"""
+
+
+class Candidate(NamedTuple):
+    """A vehicle found by a :class:`DiscoverySession`"""
+    device: BLEDevice
+    """The device to connect to"""
+    battery: BatteryState
+    """The battery state the vehicle advertised"""
+    version: int
+    """The firmware version the vehicle advertised"""
+    name: str
+    """The name the vehicle advertised"""
+    rssi: int
+    """The signal strength of the latest advertisement in dBm"""
+    last_seen: float
+    """:func:`time.monotonic` at which the latest advertisement was received"""
+
+    @property
+    def address(self) -> str:
+        """The address of the vehicle"""
+        return self.device.address
+
+    @property
+    def rank(self) -> tuple:
+        """
+        Sorts better candidates first: full batteries before others,
+        low batteries last, and a stronger signal within each group
+        """
+        return (not self.battery.full_battery, bool(self.battery.low_battery), -self.rssi)
+
+
+class DiscoverySession:
+    """
+    Finds many vehicles with a single scan.
+
+    Every advertisement of a vehicle is decoded only once: repeated advertisements
+    with the same local name just update the signal strength. Vehicles on a charger
+    are left out. The candidates are kept per address, so every vehicle appears once,
+    and each one is handed out by :meth:`DiscoverySession.claim` only once.
+    Candidates not heard from within max_age seconds are not handed out, since
+    the vehicle may have left or been put on a charger since.
+
+    .. code-block:: python
+
+        session = await controller.discover(4)
+        for candidate in session.candidates():
+            print(candidate.name, candidate.rssi)
+
+    :param scanner_factory: :class:`Optional[Callable[..., bleak.BleakScanner]]`
+        Creates the scanner. Called with the detection callback as keyword argument.
+        Defaults to :class:`bleak.BleakScanner`
+    :param max_age: :class:`float`
+        Candidates whose latest advertisement is older than this many seconds are not claimed
+
+    .. note::
+        Use :func:`Controller.discover` to make the controller connect to the
+        vehicles found by a session.
+    """
+    __slots__ = (
+        "_scanner_factory",
+        "max_age",
+        "_candidates",
+        "_names",
+        "_claimed",
+        "_wanted",
+        "_found",
+        "elapsed",
+        "advertisements",
+    )
+
+    def __init__(
+            self,
+            *,
+            scanner_factory: Optional[Callable[..., Any]]=None,
+            max_age: float=DEFAULT_MAX_AGE
+    ):
+        self._scanner_factory = scanner_factory
+        self.max_age = max_age
+        self._candidates: dict[str, Candidate] = {}
+        self._names: dict[str, Optional[str]] = {}
+        # The last local name decoded per address. None if it was not a usable vehicle
+        self._claimed: set[str] = set()
+        self._wanted: Optional[int] = None
+        self._found: Optional[asyncio.Event] = None
+        self.elapsed: float = 0.0
+        """The time spent scanning, in seconds"""
+        self.advertisements: int = 0
+        """The number of advertisements received"""
+
+    def _on_advertisement(self, device: BLEDevice, advertisement: AdvertisementData):
+        self.advertisements += 1
+        address = device.address
+        local_name = advertisement.local_name
+        candidate = self._candidates.get(address)
+        if address in self._names and self._names[address] == local_name:
+            # Nothing but the signal has changed since the last advertisement
+            if candidate is not None:
+                self._candidates[address] = candidate._replace(
+                    rssi=advertisement.rssi, last_seen=time.monotonic()
+                )
+            return
+
+        self._names[address] = local_name
+        try:
+            battery, version, name = interpret_local_name(local_name)
+        except ValueError:
+            # If we can't interprete the name, it can't be a vehicle
+            battery = None
+        if battery is None or battery.on_charger:
+            # We don't want to connect to a charging vehicle
+            self._candidates.pop(address, None)
+            return
+        self._candidates[address] = Candidate(
+            device, battery, version, name, advertisement.rssi, time.monotonic()
+        )
+        if (
+            self._found is not None
+            and self._wanted is not None
+            and len(self._candidates.keys() - self._claimed) >= self._wanted
+        ):
+            self._found.set()
+
+    async def run(self, amount: Optional[int]=None, timeout: float=10) -> list[Candidate]:
+        """
+        Scan once.
+
+        :param amount: :class:`Optional[int]`
+            Stop as soon as this many unclaimed vehicles have been found.
+            Scans for the whole timeout if not given
+        :param timeout: :class:`float`
+            The longest time to scan for, in seconds
+
+        Returns
+        -------
+        :class:`list[Candidate]`
+            The unclaimed candidates, best first. These may be fewer than amount
+        """
+        self._wanted = amount
+        self._found = asyncio.Event()
+        if amount is not None and len(self._candidates.keys() - self._claimed) >= amount:
+            self._found.set()
+        started = time.perf_counter()
+        try:
+            factory = self._scanner_factory or bleak.BleakScanner
+            async with factory(detection_callback=self._on_advertisement):
+                try:
+                    await asyncio.wait_for(self._found.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.elapsed += time.perf_counter() - started
+            self._found = None
+        return self.candidates()
+
+    def add(self, candidate: Candidate):
+        """Add a vehicle found elsewhere, such as by an :class:`AdvertisementMonitor`"""
+        self._candidates[candidate.address] = candidate
+
+    def candidates(self) -> list[Candidate]:
+        """The unclaimed candidates, best first. See :attr:`Candidate.rank`"""
+        return sorted(
+            (c for address, c in self._candidates.items() if address not in self._claimed),
+            key=lambda candidate: candidate.rank
+        )
+
+    def claim(
+            self,
+            address: Optional[str]=None,
+            exclude: Collection[str]=()
+    ) -> Optional[Candidate]:
+        """
+        Hand out a candidate. It will not be handed out again.
+        Candidates older than :attr:`DiscoverySession.max_age` are skipped.
+
+        :param address: :class:`Optional[str]`
+            Only claim the vehicle with this address
+        :param exclude: :class:`Collection[str]`
+            Addresses that must not be claimed
+
+        Returns
+        -------
+        :class:`Optional[Candidate]`
+            The best matching candidate. `None` if there is none
+        """
+        oldest = time.monotonic() - self.max_age
+        for candidate in self.candidates():
+            if candidate.address in exclude or candidate.last_seen < oldest:
+                continue
+            if address is None or candidate.address == address:
+                self._claimed.add(candidate.address)
+                return candidate
+        return None
+
+    def __len__(self) -> int:
+        # The number of unclaimed candidates
+        return len(self._candidates.keys() - self._claimed)
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} candidates={len(self)} claimed={len(self._claimed)} "
+            f"advertisements={self.advertisements}>"
+        )
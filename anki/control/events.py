@@ -0,0 +1,361 @@
+import asyncio
+import inspect
+import weakref
+from enum import Enum
+from collections import deque
+from collections.abc import Callable, Hashable
+from concurrent.futures import Executor
+from typing import Any, NamedTuple, Optional
+
+__all__ = (
+    "VehicleEvent",
+    "Subscription",
+    "EventBus",
+    "FleetEvent",
+)
+
+DEFAULT_MAX_IN_FLIGHT = 16
+"""The number of calls of an offloaded subscription that may be queued or running at once"""
+
+
+class VehicleEvent(Enum):
+    """The events a :class:`Vehicle` publishes besides raw vehicle messages"""
+    TRACK_PIECE_CHANGE = "track_piece_change"
+    PONG = "pong"
+    DELOCALIZED = "delocalized"
+    BATTERY_CHANGE = "battery_change"
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class FleetEvent(NamedTuple):
+    """A notification of one of the vehicles of a :class:`Controller`"""
+    timestamp: int
+    """:func:`time.monotonic_ns` at the time the notification was received"""
+    vehicle_id: int
+    """The id of the vehicle that sent the notification"""
+    msg_type: int
+    """The message type. See :class:`anki.misc.const.VehicleMsg`"""
+    message: Any
+    """
+    The decoded message, such as :class:`anki.misc.msgs.TrackPieceUpdate`.
+    Message types without a decoder are passed as the raw payload
+    """
+
+
+class Subscription:
+    """
+    A handle to a callback subscribed to an :class:`EventBus`.
+    Cancelling it removes the callback from the bus in constant time.
+
+    .. note::
+        You should not be creating these manually, use :meth:`EventBus.subscribe`.
+    """
+    __slots__ = (
+        "event",
+        "is_async",
+        "executor",
+        "max_in_flight",
+        "in_flight",
+        "dropped",
+        "once",
+        "_bus",
+        "_callback",
+        "_weak",
+        "_key",
+        "__weakref__",
+    )
+
+    def __init__(
+            self,
+            bus: "EventBus",
+            event: Hashable,
+            callback: Callable,
+            weak: bool,
+            executor: Optional[Executor]=None,
+            max_in_flight: int=DEFAULT_MAX_IN_FLIGHT,
+            once: bool=False
+    ):
+        self.event = event
+        self.is_async = inspect.iscoroutinefunction(callback)
+        self.executor = executor
+        """The executor the callback runs in. `None` if it runs on the event loop"""
+        self.max_in_flight = max_in_flight
+        """The number of calls that may be queued or running in the executor at once"""
+        self.in_flight: int = 0
+        """The number of calls currently queued or running in the executor"""
+        self.dropped: int = 0
+        """The number of events not passed on because max_in_flight calls were in flight"""
+        self.once = once
+        """`True` if the subscription is cancelled after the first event"""
+        self._bus = bus
+        self._weak = weak
+        self._key = (event, id(callback))
+        # The callback's entry in the bus index. Kept, since weak callbacks may be gone on removal
+        if weak:
+            ref_type = weakref.WeakMethod if inspect.ismethod(callback) else weakref.ref
+            self._callback = ref_type(callback, self._on_collected)
+        else:
+            self._callback = callback
+
+    def _on_collected(self, _):
+        # Called by the weak reference once the callback has been garbage collected
+        self.cancel()
+
+    @property
+    def callback(self) -> Optional[Callable]:
+        """
+        The subscribed callback.
+        This is :class:`None` for weak subscriptions whose callback has been garbage collected.
+        """
+        return self._callback() if self._weak else self._callback
+
+    @property
+    def active(self) -> bool:
+        """`True` while the callback is subscribed"""
+        return self._bus is not None
+
+    def cancel(self):
+        """
+        Unsubscribe the callback. Events that have already been published
+        but not yet dispatched will not reach it anymore.
+        Cancelling an inactive subscription does nothing.
+        """
+        if self._bus is not None:
+            self._bus._remove(self)
+            self._bus = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cancel()
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} event={self.event!s} "
+            f"callback={self.callback!r} active={self.active}>"
+        )
+
+
+class _OffloadLane:
+    # Runs the offloaded callbacks of one bus in one executor.
+    # Calls are submitted one at a time, so they complete in the order
+    # the events were published in, while other buses use the executor concurrently.
+    __slots__ = ("_executor", "_pending", "_running")
+
+    def __init__(self, executor: Executor):
+        self._executor = executor
+        self._pending: deque[tuple[Subscription, Callable, tuple]] = deque()
+        self._running = False
+
+    def submit(self, subscription: Subscription, callback: Callable, args: tuple):
+        if subscription.in_flight >= subscription.max_in_flight:
+            # Never let a slow callback queue up work (or latency) without bounds
+            subscription.dropped += 1
+            return
+        subscription.in_flight += 1
+        self._pending.append((subscription, callback, args))
+        if not self._running:
+            self._start_next()
+
+    def _start_next(self):
+        while self._pending:
+            subscription, callback, args = self._pending.popleft()
+            if subscription._bus is None and not subscription.once:
+                # Cancelled while queued. One-shot subscriptions are
+                # cancelled on dispatch, but their single call still has to run
+                subscription.in_flight -= 1
+                continue
+            try:
+                future = asyncio.get_running_loop().run_in_executor(
+                    self._executor, callback, *args
+                )
+            except Exception as e:
+                # Such as a shut down executor
+                subscription.in_flight -= 1
+                _report(e, callback)
+                continue
+            self._running = True
+            future.add_done_callback(
+                lambda future, subscription=subscription, callback=callback:
+                    self._done(future, subscription, callback)
+            )
+            return
+        self._running = False
+
+    def _done(self, future: asyncio.Future, subscription: Subscription, callback: Callable):
+        subscription.in_flight -= 1
+        if not future.cancelled() and future.exception() is not None:
+            _report(future.exception(), callback)  # type: ignore
+        self._start_next()
+
+
+class EventBus:
+    """
+    Dispatches events to subscribed callbacks.
+
+    Publishing an event schedules a single callback on the running event loop,
+    which then runs every subscriber in the order they subscribed in.
+    Synchronous callbacks are called directly, coroutine functions are started as tasks.
+    Callbacks subscribed with an executor are run in it instead, see :meth:`EventBus.subscribe`.
+    An exception raised by one callback is passed to the loop's exception handler
+    and does not keep the others from running.
+    """
+    __slots__ = ("_subscribers", "_by_callback", "_tasks", "_lanes")
+
+    def __init__(self):
+        self._subscribers: dict[Hashable, dict[Subscription, None]] = {}
+        # Dicts are used as ordered sets, so removal is O(1) and order is kept
+        self._by_callback: dict[tuple[Hashable, int], list[Subscription]] = {}
+        # Finds the subscriptions of a callback for the remove_*_watcher style methods
+        self._tasks: set[asyncio.Task] = set()
+        # Keeps running async callbacks alive
+        self._lanes: dict[Executor, _OffloadLane] = {}
+        # One lane per executor keeps offloaded calls in order
+
+    def subscribe(
+            self,
+            event: Hashable,
+            callback: Callable[..., Any],
+            *,
+            weak: bool=False,
+            executor: Optional[Executor]=None,
+            max_in_flight: int=DEFAULT_MAX_IN_FLIGHT,
+            once: bool=False
+    ) -> Subscription:
+        """
+        Subscribe a callback to an event.
+
+        :param event: :class:`Hashable`
+            The event to subscribe to
+        :param callback: :class:`Callable`
+            A function or coroutine function that is called with the arguments of the event
+        :param weak: :class:`bool`
+            Only keep a weak reference to the callback. The subscription is cancelled
+            automatically once the callback is garbage collected.
+            Bound methods are referenced through :class:`weakref.WeakMethod`.
+
+            .. warning::
+                Lambdas and closures that are not referenced anywhere else
+                are collected (and unsubscribed) immediately.
+        :param executor: :class:`Optional[concurrent.futures.Executor]`
+            Run the callback in this thread or process pool instead of on the event loop,
+            so that slow callbacks don't delay the processing of notifications.
+            All offloaded callbacks of this bus that share an executor are run
+            one after another, in the order the events were published in.
+            For a :class:`concurrent.futures.ProcessPoolExecutor` the callback
+            and the event arguments have to be picklable.
+        :param max_in_flight: :class:`int`
+            The number of calls of an offloaded callback that may be queued or running at once.
+            Events published while this many are in flight are dropped for this callback
+            and counted in :attr:`Subscription.dropped`
+        :param once: :class:`bool`
+            Cancel the subscription after the callback has been called for the first time
+
+        Returns
+        -------
+        :class:`Subscription`
+            A handle that can be used to unsubscribe again
+
+        Raises
+        ------
+        :class:`ValueError`
+            A coroutine function was passed together with an executor,
+            or max_in_flight is smaller than 1
+        """
+        if executor is not None:
+            if inspect.iscoroutinefunction(callback):
+                raise ValueError("Coroutine functions cannot be run in an executor")
+            if max_in_flight < 1:
+                raise ValueError("max_in_flight has to be at least 1")
+        subscription = Subscription(self, event, callback, weak, executor, max_in_flight, once)
+        self._subscribers.setdefault(event, {})[subscription] = None
+        self._by_callback.setdefault(subscription._key, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, event: Hashable, callback: Callable):
+        """
+        Cancel the oldest subscription of callback to event.
+
+        Raises
+        ------
+        :class:`ValueError`
+            The callback is not subscribed to this event
+        """
+        subscriptions = self._by_callback.get((event, id(callback)), ())
+        for subscription in subscriptions:
+            if subscription.callback is callback:
+                subscription.cancel()
+                return
+        raise ValueError("The function passed is not an event handler")
+
+    def _remove(self, subscription: Subscription):
+        subscribers = self._subscribers[subscription.event]
+        del subscribers[subscription]
+        if not subscribers:
+            del self._subscribers[subscription.event]
+
+        subscriptions = self._by_callback[subscription._key]
+        subscriptions.remove(subscription)
+        if not subscriptions:
+            del self._by_callback[subscription._key]
+
+    def has_subscribers(self, event: Hashable) -> bool:
+        """`True` if at least one callback is subscribed to event"""
+        return event in self._subscribers
+
+    def publish(self, event: Hashable, *args):
+        """
+        Publish an event. This schedules a single dispatch of the event
+        to all current subscribers on the running event loop.
+        Nothing is scheduled if there are no subscribers.
+
+        :param event: :class:`Hashable`
+            The event to publish
+        :param args:
+            The arguments passed to every callback
+        """
+        subscribers = self._subscribers.get(event)
+        if subscribers:
+            asyncio.get_running_loop().call_soon(self._dispatch, tuple(subscribers), args)
+
+    def _dispatch(self, subscriptions: tuple[Subscription, ...], args: tuple):
+        for subscription in subscriptions:
+            if subscription._bus is None:
+                # Cancelled after the event was published
+                continue
+            callback = subscription.callback
+            if callback is None:
+                continue
+            if subscription.once:
+                subscription.cancel()
+            try:
+                if subscription.executor is not None:
+                    lane = self._lanes.get(subscription.executor)
+                    if lane is None:
+                        lane = self._lanes[subscription.executor] = _OffloadLane(
+                            subscription.executor
+                        )
+                    lane.submit(subscription, callback, args)
+                elif subscription.is_async:
+                    task = asyncio.get_running_loop().create_task(callback(*args))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._task_done)
+                else:
+                    callback(*args)
+            except Exception as e:
+                _report(e, callback)
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            _report(task.exception(), task)  # type: ignore
+
+
+def _report(exception: BaseException, callback: object):
+    asyncio.get_running_loop().call_exception_handler({
+        "message": f"Exception in event handler {callback!r}",
+        "exception": exception,
+    })
@@ -0,0 +1,398 @@
+import asyncio
+import os
+import queue
+import threading
+from array import array
+from enum import Enum
+from typing import Any, NamedTuple, Optional
+
+from ..misc import const
+from ..errors import MalformedPacketWarning
+
+__all__ = (
+    "ExportFormat",
+    "TelemetryRecorder",
+)
+
+DEFAULT_CHUNK_SIZE = 8192
+"""The number of notifications collected before they are handed to the writer thread"""
+DEFAULT_CHUNKS_PER_FILE = 16
+"""The number of chunks written to a file before the recorder moves on to the next one"""
+DEFAULT_MAX_PENDING = 8
+"""The number of chunks that may wait for the writer thread before new ones are dropped"""
+
+_TABLE_NAMES = {
+    value: name.lower() for name, value in vars(const.VehicleMsg).items()
+    if not name.startswith("_")
+}
+# Message types are stored in tables named after them, such as track_piece_update
+
+
+class ExportFormat(Enum):
+    """The on-disk formats a :class:`TelemetryRecorder` can write"""
+    NPZ = "npz"
+    """
+    One uncompressed NumPy ``.npz`` archive per file.
+    The arrays are named ``<table>.<column>``, such as ``track_piece_update.speed``
+    """
+    PARQUET = "parquet"
+    """One Parquet file per table and file. Requires pyarrow"""
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _Chunk(NamedTuple):
+    timestamps: array
+    vehicle_ids: array
+    starts: array
+    packets: bytearray
+
+
+class _NpzWriter:
+    # Collects the tables of chunks_per_file chunks and writes them into a single archive
+    def __init__(self, numpy, path: str, chunks_per_file: int, files: list[str]):
+        self._numpy = numpy
+        self._path = path
+        self._chunks_per_file = chunks_per_file
+        self._files = files
+        self._pending: list[dict[str, dict[str, Any]]] = []
+        self._index = 0
+
+    def write(self, tables: dict[str, dict[str, Any]]):
+        self._pending.append(tables)
+        if len(self._pending) >= self._chunks_per_file:
+            self._rotate()
+
+    def _rotate(self):
+        if not self._pending:
+            return
+        numpy = self._numpy
+        arrays = {}
+        for name in dict.fromkeys(name for tables in self._pending for name in tables):
+            parts = [tables[name] for tables in self._pending if name in tables]
+            for column in parts[0]:
+                arrays[f"{name}.{column}"] = numpy.concatenate([part[column] for part in parts])
+        path = self._path.format(index=self._index, table="") + ".npz"
+        numpy.savez(path, **arrays)
+        self._files.append(path)
+        self._pending.clear()
+        self._index += 1
+
+    def close(self):
+        self._rotate()
+
+
+class _ParquetWriter:
+    # Appends every chunk as a row group to one file per table
+    def __init__(self, numpy, path: str, chunks_per_file: int, files: list[str]):
+        import pyarrow
+        import pyarrow.parquet
+        self._pyarrow = pyarrow
+        self._parquet = pyarrow.parquet
+        self._path = path
+        self._chunks_per_file = chunks_per_file
+        self._files = files
+        self._writers: dict[str, Any] = {}
+        self._chunks = 0
+        self._index = 0
+
+    def write(self, tables: dict[str, dict[str, Any]]):
+        for name, columns in tables.items():
+            table = self._pyarrow.table(columns)
+            writer = self._writers.get(name)
+            if writer is None:
+                path = self._path.format(index=self._index, table=f"-{name}") + ".parquet"
+                writer = self._writers[name] = self._parquet.ParquetWriter(path, table.schema)
+                self._files.append(path)
+            writer.write_table(table)
+        self._chunks += 1
+        if self._chunks >= self._chunks_per_file:
+            self._rotate()
+
+    def _rotate(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+        self._chunks = 0
+        self._index += 1
+
+    def close(self):
+        self._rotate()
+
+
+class TelemetryRecorder:
+    """
+    Records notifications to disk in a columnar format for offline analysis.
+
+    Notifications are collected in compact buffers on the event loop. Every chunk_size
+    notifications, the buffers are handed to a background thread, which decodes them
+    with :mod:`anki.misc.batch` and writes them. Nothing is decoded or written on the
+    notification path. If the writer falls behind by more than max_pending chunks,
+    new chunks are dropped and counted in :attr:`TelemetryRecorder.dropped`,
+    so memory use stays bounded.
+
+    Every message type with a layout in :data:`anki.misc.batch.BATCH_DTYPES` is written
+    to its own table (such as ``track_piece_update``) with a ``timestamp`` and
+    ``vehicle_id`` column followed by the message fields. The ``packets`` table
+    lists the timestamp, vehicle id and message type of every notification,
+    including those without a layout. Empty packets have the message type -1.
+
+    .. code-block:: python
+
+        recorder = controller.record("telemetry")
+        ...
+        await recorder.aclose()
+
+    :param directory: :class:`str`
+        The directory the files are written to. It is created if it does not exist
+    :param prefix: :class:`str`
+        The start of every file name. Files are numbered in the order they were written in
+    :param format: :class:`Optional[ExportFormat]`
+        The file format. Defaults to Parquet if pyarrow is installed, otherwise npz
+    :param chunk_size: :class:`int`
+        The number of notifications handed to the writer thread at once
+    :param chunks_per_file: :class:`int`
+        The number of chunks written to a file before starting a new one
+    :param max_pending: :class:`int`
+        The number of chunks that may wait for the writer thread
+
+    Raises
+    ------
+    :class:`ImportError`
+        NumPy is not installed, or pyarrow is not installed and Parquet was requested
+
+    .. note::
+        Use :func:`Controller.record` to record the notifications of all vehicles.
+    """
+    __slots__ = (
+        "_batch",
+        "_chunk_size",
+        "_timestamps",
+        "_vehicle_ids",
+        "_starts",
+        "_packets",
+        "_queue",
+        "_writer",
+        "_thread",
+        "_closed",
+        "_error",
+        "files",
+        "recorded",
+        "dropped",
+        "malformed",
+    )
+
+    def __init__(
+            self,
+            directory: str,
+            *,
+            prefix: str="telemetry",
+            format: Optional[ExportFormat]=None,
+            chunk_size: int=DEFAULT_CHUNK_SIZE,
+            chunks_per_file: int=DEFAULT_CHUNKS_PER_FILE,
+            max_pending: int=DEFAULT_MAX_PENDING
+    ):
+        from ..misc import batch
+        # Raises an ImportError with installation instructions if NumPy is missing
+        self._batch = batch
+        if chunk_size < 1 or chunks_per_file < 1 or max_pending < 1:
+            raise ValueError("chunk_size, chunks_per_file and max_pending have to be at least 1")
+        if format is None:
+            format = ExportFormat.PARQUET if _has_pyarrow() else ExportFormat.NPZ
+        format = ExportFormat(format)
+
+        os.makedirs(directory, exist_ok=True)
+        self.files: list[str] = []
+        """The paths of the files written so far"""
+        writer_type = _ParquetWriter if format is ExportFormat.PARQUET else _NpzWriter
+        self._writer = writer_type(
+            batch.np,
+            os.path.join(
+                directory,
+                prefix.replace("{", "{{").replace("}", "}}") + "-{index:05}{table}"
+            ),
+            chunks_per_file,
+            self.files
+        )
+
+        self._chunk_size = chunk_size
+        self._new_buffers()
+        self._queue: queue.Queue[Optional[_Chunk]] = queue.Queue(max_pending)
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self.recorded: int = 0
+        """The number of notifications handed to the writer thread"""
+        self.dropped: int = 0
+        """The number of notifications dropped because the writer thread fell behind"""
+        self.malformed: int = 0
+        """
+        The number of notifications that could not be decoded
+        and were left out of the message tables
+        """
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"{self.__class__.__name__}({directory!r})",
+            daemon=True
+        )
+        self._thread.start()
+
+    def _new_buffers(self):
+        self._timestamps = array("q")
+        self._vehicle_ids = array("q")
+        self._starts = array("q")
+        # Where each packet begins in _packets. Kept, so that a packet
+        # with a wrong size byte cannot shift the ones after it
+        self._packets = bytearray()
+
+    def add(self, timestamp: int, vehicle_id: int, packet: bytes) -> bool:
+        """
+        Record a notification. This only appends to the current chunk.
+
+        :param timestamp: :class:`int`
+            :func:`time.monotonic_ns` at which the notification was received
+        :param vehicle_id: :class:`int`
+            The id of the vehicle that sent it
+        :param packet: :class:`bytes`
+            The raw packet, including the size byte
+
+        Returns
+        -------
+        :class:`bool`
+            `False` if the recorder has been closed
+        """
+        if self._closed:
+            return False
+        self._timestamps.append(timestamp)
+        self._vehicle_ids.append(vehicle_id)
+        self._starts.append(len(self._packets))
+        self._packets += packet
+        if len(self._timestamps) >= self._chunk_size:
+            self._hand_off()
+        return True
+
+    def _hand_off(self):
+        chunk = _Chunk(self._timestamps, self._vehicle_ids, self._starts, self._packets)
+        self._new_buffers()
+        try:
+            self._queue.put_nowait(chunk)
+        except queue.Full:
+            self.dropped += len(chunk.timestamps)
+        else:
+            self.recorded += len(chunk.timestamps)
+
+    def flush(self):
+        """Hand the notifications collected so far to the writer thread"""
+        if self._timestamps:
+            self._hand_off()
+
+    def close(self):
+        """
+        Stop recording, write the remaining notifications and close the files.
+        This blocks until the writer thread is done, use :meth:`TelemetryRecorder.aclose`
+        inside of coroutines.
+
+        Raises
+        ------
+        :class:`Exception`
+            Writing failed. The first error raised by the writer thread is re-raised
+        """
+        if not self._closed:
+            self.flush()
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    async def aclose(self):
+        """Like :meth:`TelemetryRecorder.close`, but waits for the writer thread in an executor"""
+        await asyncio.to_thread(self.close)
+
+    @property
+    def closed(self) -> bool:
+        """`True` once the recorder has been closed"""
+        return self._closed
+
+    def _run(self):
+        # The writer thread
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            if self._error is not None:
+                # Keep draining the queue, so that close() does not block forever
+                continue
+            try:
+                self._writer.write(self._decode(chunk))
+            except BaseException as e:
+                self._error = e
+        try:
+            self._writer.close()
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+
+    def _decode(self, chunk: _Chunk) -> dict[str, dict[str, Any]]:
+        # Turns a chunk into columns, one table per message type
+        batch = self._batch
+        numpy = batch.np
+        timestamps = numpy.frombuffer(chunk.timestamps, dtype=numpy.int64)
+        vehicle_ids = numpy.frombuffer(chunk.vehicle_ids, dtype=numpy.int64)
+        starts = numpy.frombuffer(chunk.starts, dtype=numpy.int64)
+        data = numpy.frombuffer(chunk.packets, dtype=numpy.uint8)
+        lengths = numpy.diff(starts, append=len(data))
+        valid = lengths >= 2
+        # Every packet needs at least its size byte and a message type
+        opcodes = numpy.full(len(starts), -1, dtype=numpy.int16)
+        opcodes[valid] = data[starts[valid] + 1]
+        checked = starts[valid]
+        # Empty packets at the end of a chunk start past the last byte, so only those are indexed
+        valid[valid] = data[checked].astype(numpy.int64) + 1 == lengths[valid]
+        self.malformed += len(starts) - int(valid.sum())
+
+        tables = {
+            "packets": {
+                "timestamp": timestamps,
+                "vehicle_id": vehicle_ids,
+                "msg_type": opcodes,
+            }
+        }
+        for msg_type, dtype in batch.BATCH_DTYPES.items():
+            selected = (opcodes == msg_type) & valid
+            if not selected.any():
+                continue
+            try:
+                payloads = batch._decode_payloads(data, starts[selected], msg_type, dtype)
+            except MalformedPacketWarning:
+                self.malformed += int(selected.sum())
+                continue
+            table = {"timestamp": timestamps[selected], "vehicle_id": vehicle_ids[selected]}
+            for name in dtype.names:
+                table[name] = numpy.ascontiguousarray(payloads[name])
+            tables[_TABLE_NAMES[msg_type]] = table
+        return tables
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} recorded={self.recorded} dropped={self.dropped} "
+            f"files={len(self.files)} closed={self._closed}>"
+        )
@@ -0,0 +1,208 @@
+from array import array
+from bisect import bisect_left
+from typing import NamedTuple, Optional
+
+from .snapshot import NO_POSITION
+
+__all__ = (
+    "HistoryWindow",
+    "TelemetryHistory",
+)
+
+DEFAULT_HISTORY_SIZE = 4096
+"""The number of samples a history keeps by default"""
+
+_COLUMNS = (
+    # Name and array typecode of every column
+    ("timestamps", "q"),
+    ("pieces", "B"),
+    ("locs", "B"),
+    ("offsets", "d"),
+    ("speeds", "H"),
+    ("positions", "q"),
+)
+
+
+class HistoryWindow(NamedTuple):
+    """
+    A range of samples of a :class:`TelemetryHistory`, oldest first.
+
+    Every field is a column: a read-only :class:`memoryview` with one entry per sample.
+    The entries at the same index belong to the same sample.
+    """
+    timestamps: memoryview
+    """:func:`time.monotonic_ns` at which the sample was received"""
+    pieces: memoryview
+    """The raw track piece ids. See :class:`TrackPieceType`"""
+    locs: memoryview
+    """The location ids on the track pieces"""
+    offsets: memoryview
+    """The offsets from the road centre in mm"""
+    speeds: memoryview
+    """The speeds in mm/s"""
+    positions: memoryview
+    """The positions on the map. :data:`NO_POSITION` if the vehicle was not aligned"""
+
+    @property
+    def size(self) -> int:
+        """The number of samples in the window"""
+        return len(self.timestamps)
+
+    def to_numpy(self) -> dict[str, "numpy.ndarray"]:  # type: ignore # noqa: F821
+        """
+        The columns as read-only NumPy arrays. They share memory with the window.
+
+        Raises
+        ------
+        :class:`ImportError`
+            NumPy is not installed
+        """
+        try:
+            import numpy
+        except ImportError as e:
+            raise ImportError(
+                "HistoryWindow.to_numpy requires numpy. "
+                "Install it with 'pip install py-drivesdk[numpy]'"
+            ) from e
+        return {name: numpy.asarray(column) for name, column in zip(self._fields, self)}
+
+
+class TelemetryHistory:
+    """
+    A fixed-capacity record of the track piece updates of a vehicle.
+    Samples are stored in preallocated typed arrays used as a ring buffer,
+    so recording a sample does not create any objects. Once the history is full,
+    the oldest samples are overwritten.
+
+    .. code-block:: python
+
+        history = vehicle.enable_history(1000)
+        ...
+        recent = history.last(50)
+        average_speed = sum(recent.speeds) / recent.size
+
+    :param capacity: :class:`int`
+        The number of samples kept
+
+    .. note::
+        Use :func:`Vehicle.enable_history` to record the history of a vehicle.
+    """
+    __slots__ = (
+        "timestamps",
+        "pieces",
+        "locs",
+        "offsets",
+        "speeds",
+        "positions",
+        "_capacity",
+        "_next",
+        "_size",
+    )
+
+    def __init__(self, capacity: int=DEFAULT_HISTORY_SIZE):
+        if capacity < 1:
+            raise ValueError("The capacity of a history has to be at least 1")
+        for name, typecode in _COLUMNS:
+            setattr(self, name, array(typecode, bytes(array(typecode).itemsize * capacity)))
+        self._capacity = capacity
+        self._next = 0
+        # The index the next sample is written to
+        self._size = 0
+
+    def record(
+            self,
+            timestamp: int,
+            piece: int,
+            loc: int,
+            offset: float,
+            speed: int,
+            position: Optional[int]
+    ):
+        """Add a sample, overwriting the oldest one if the history is full"""
+        i = self._next
+        self.timestamps[i] = timestamp
+        self.pieces[i] = piece
+        self.locs[i] = loc
+        self.offsets[i] = offset
+        self.speeds[i] = speed
+        self.positions[i] = NO_POSITION if position is None else position
+        i += 1
+        self._next = 0 if i == self._capacity else i
+        if self._size < self._capacity:
+            self._size += 1
+
+    def clear(self):
+        """Remove all samples"""
+        self._next = 0
+        self._size = 0
+
+    def _window(self, skip: int) -> HistoryWindow:
+        # The samples after the oldest skip samples
+        start = (self._next - self._size + skip) % self._capacity
+        stop = self._next
+        columns = []
+        for name, _ in _COLUMNS:
+            column = getattr(self, name)
+            if skip == self._size:
+                part = column[:0]
+            elif start < stop:
+                part = column[start:stop]
+            else:
+                # The window wraps around the end of the buffer
+                part = column[start:] + column[:stop]
+            columns.append(memoryview(part).toreadonly())
+        return HistoryWindow(*columns)
+
+    def last(self, count: int) -> HistoryWindow:
+        """
+        The newest samples.
+
+        :param count: :class:`int`
+            The number of samples. All samples are returned if there are fewer
+
+        Returns
+        -------
+        :class:`HistoryWindow`
+            The samples, oldest first
+        """
+        if count < 0:
+            raise ValueError("Cannot get a negative number of samples")
+        return self._window(self._size - min(count, self._size))
+
+    def since(self, timestamp: int) -> HistoryWindow:
+        """
+        The samples received at or after timestamp.
+        Found by bisection, since samples are recorded in the order they were received in.
+
+        :param timestamp: :class:`int`
+            A :func:`time.monotonic_ns` timestamp
+
+        Returns
+        -------
+        :class:`HistoryWindow`
+            The samples, oldest first
+        """
+        oldest = self._next - self._size
+        timestamps = self.timestamps
+        capacity = self._capacity
+        skip = bisect_left(
+            range(self._size),
+            timestamp,
+            key=lambda i: timestamps[(oldest + i) % capacity]
+        )
+        return self._window(skip)
+
+    def all(self) -> HistoryWindow:
+        """All samples, oldest first"""
+        return self._window(0)
+
+    @property
+    def capacity(self) -> int:
+        """The maximum number of samples kept"""
+        return self._capacity
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} samples={self._size}/{self._capacity}>"
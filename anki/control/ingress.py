@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+__all__ = (
+    "NotificationIngress",
+)
+
+Sink = Callable[[int, bytearray], None]
+"""Processes a packet on the event loop. Called with the receive timestamp and the packet"""
+
+DEFAULT_MAX_BATCH = 256
+"""The number of packets processed per loop iteration before yielding to other callbacks"""
+
+
+def _is_running(loop: asyncio.AbstractEventLoop) -> bool:
+    # True if loop is running in the current thread
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+class NotificationIngress:
+    """
+    Moves notifications from the thread the BLE backend delivers them on to an event loop.
+
+    Packets are timestamped with :func:`time.monotonic_ns` on arrival and appended
+    to a queue, which is safe to do from any thread. The loop is woken once per batch:
+    packets arriving while a batch is already scheduled are simply appended to it.
+    The batch is then processed on the loop in the order the packets arrived in,
+    even if they belong to different vehicles.
+
+    :param loop: :class:`Optional[asyncio.AbstractEventLoop]`
+        The loop packets are processed on. Defaults to the running loop
+    :param max_batch: :class:`int`
+        The number of packets processed before yielding to other callbacks on the loop
+
+    .. note::
+        You should not be creating these manually. Every :class:`Controller`
+        shares one between its vehicles.
+    """
+    __slots__ = (
+        "_loop",
+        "_thread_id",
+        "_queue",
+        "_scheduled",
+        "_max_batch",
+        "batches",
+        "packets",
+    )
+
+    def __init__(
+            self,
+            loop: Optional[asyncio.AbstractEventLoop]=None,
+            *,
+            max_batch: int=DEFAULT_MAX_BATCH
+    ):
+        if loop is None:
+            loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._thread_id: Optional[int] = threading.get_ident() if _is_running(loop) else None
+        # The thread running the loop, if known. Wakeups from it skip the self-pipe
+        self._queue: deque[tuple[Sink, int, bytearray]] = deque()
+        # deque.append and deque.popleft are atomic, so no lock is needed
+        self._scheduled = False
+        self._max_batch = max_batch
+        self.batches: int = 0
+        """The number of batches processed so far"""
+        self.packets: int = 0
+        """The number of packets processed so far"""
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The loop packets are processed on"""
+        return self._loop
+
+    def callback(self, sink: Sink) -> Callable[[Any, bytearray], None]:
+        """
+        Create a notification callback for :meth:`bleak.BleakClient.start_notify`
+        that hands packets to sink.
+
+        :param sink: :class:`Callable[[int, bytearray], None]`
+            Called on the loop with the receive timestamp and the packet
+        """
+        push = self.push
+        def notify(sender, data: bytearray):
+            push(sink, data)
+        return notify
+
+    def push(self, sink: Sink, data: bytearray):
+        """
+        Queue a packet for sink. This may be called from any thread.
+
+        :param sink: :class:`Callable[[int, bytearray], None]`
+            Called on the loop with the receive timestamp and the packet
+        :param data: :class:`bytearray`
+            The packet. It is not copied, so it must not be modified afterwards
+        """
+        self._queue.append((sink, time.monotonic_ns(), data))
+        if not self._scheduled:
+            # Wake the loop for the first packet of a batch only
+            self._scheduled = True
+            self._schedule()
+
+    def _schedule(self):
+        if threading.get_ident() == self._thread_id:
+            self._loop.call_soon(self._drain)
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self._drain)
+            except RuntimeError:
+                # The loop has been closed, nobody is going to process the packets anymore
+                self._queue.clear()
+
+    def _drain(self):
+        self._scheduled = False
+        # Cleared before draining, so a packet pushed meanwhile either
+        # ends up in this batch or schedules the next one
+        queue = self._queue
+        count = 0
+        try:
+            while count < self._max_batch:
+                try:
+                    sink, timestamp, data = queue.popleft()
+                except IndexError:
+                    break
+                count += 1
+                sink(timestamp, data)
+        finally:
+            self.batches += 1
+            self.packets += count
+            if queue and not self._scheduled:
+                # Yield to the loop and continue with the rest later
+                self._scheduled = True
+                self._loop.call_soon(self._drain)
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} pending={len(self._queue)} "
+            f"batches={self.batches} packets={self.packets}>"
+        )
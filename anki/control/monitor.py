@@ -0,0 +1,395 @@
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any, NamedTuple, Optional
+
+import bleak
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+
+from ..misc.advertisement import BatteryState, interpret_local_name
+from .discovery import Candidate
+from .events import EventBus, Subscription
+
+__all__ = (
+    "MonitoredVehicle",
+    "AdvertisementMonitor",
+    "is_charged",
+)
+
+DEFAULT_COALESCE_INTERVAL = 0.25
+"""The time changes are collected for before subscribers and waiters are notified, in seconds"""
+DEFAULT_MAX_AGE = 10.0
+"""The time after which a vehicle that stopped advertising leaves the inventory, in seconds"""
+MAX_IGNORED = 1024
+"""
+The number of other devices the monitor remembers not to be vehicles.
+Devices such as phones rotate their addresses, so the oldest ones are forgotten first
+"""
+MAX_SIGHTINGS = 1024
+"""
+The number of devices with a vehicle's local name format the monitor keeps track of.
+Any named device passes as one, so the least recently heard ones are forgotten first
+"""
+
+_CHANGE_EVENT = "change"
+
+
+class MonitoredVehicle(NamedTuple):
+    """A vehicle in the inventory of an :class:`AdvertisementMonitor`"""
+    device: BLEDevice
+    """The device to connect to"""
+    battery: BatteryState
+    """The battery state the vehicle advertised"""
+    version: int
+    """The firmware version the vehicle advertised"""
+    name: str
+    """The name the vehicle advertised"""
+    rssi: int
+    """The signal strength of the latest advertisement in dBm"""
+    last_seen: float
+    """:func:`time.monotonic` at which the latest advertisement was received"""
+
+    @property
+    def address(self) -> str:
+        """The address of the vehicle"""
+        return self.device.address
+
+    def to_candidate(self) -> Candidate:
+        """The vehicle as a discovery :class:`Candidate`"""
+        return Candidate(*self)
+
+
+def is_charged(vehicle: MonitoredVehicle) -> bool:
+    """`True` for vehicles that are off the charger with a full battery"""
+    return not vehicle.battery.on_charger and vehicle.battery.full_battery
+
+
+class _Sighting:
+    # The mutable inventory entry of one vehicle.
+    # Repeated advertisements only overwrite rssi and last_seen
+    __slots__ = ("device", "local_name", "battery", "version", "name", "rssi", "last_seen")
+
+    def __init__(
+            self,
+            device: BLEDevice,
+            local_name: str,
+            battery: BatteryState,
+            version: int,
+            name: str
+    ):
+        self.device = device
+        self.local_name = local_name
+        self.battery = battery
+        self.version = version
+        self.name = name
+        self.rssi = 0
+        self.last_seen = 0.0
+
+    def freeze(self) -> MonitoredVehicle:
+        return MonitoredVehicle(
+            self.device, self.battery, self.version, self.name, self.rssi, self.last_seen
+        )
+
+
+class AdvertisementMonitor:
+    """
+    Keeps a live inventory of the vehicles nearby by listening to their advertisements,
+    without connecting to them.
+
+    The detection callback only does constant work per advertisement: an advertisement
+    with the same local name as the previous one of that device just updates its signal
+    strength and time. Only a changed name (and with it battery state or version),
+    or a vehicle appearing, counts as a change. Changes are collected for interval seconds
+    before subscribers and waiters are notified once, so busy radio environments
+    do not translate into more callbacks.
+
+    .. code-block:: python
+
+        async with controller.monitor() as monitor:
+            vehicles = await monitor.wait_for_available(2, timeout=30)
+            await controller.connect_many(2)  # Uses the monitor instead of scanning
+
+    :param interval: :class:`float`
+        The time changes are collected for before notifying, in seconds
+    :param max_age: :class:`float`
+        Vehicles not heard from for this many seconds leave the inventory
+    :param scanner_factory: :class:`Optional[Callable[..., bleak.BleakScanner]]`
+        Creates the scanner. Called with the detection callback and scanner_kwargs as
+        keyword arguments. Defaults to :class:`bleak.BleakScanner`
+    :param scanner_kwargs:
+        Passed on to the scanner, such as ``scanning_mode="passive"``
+    """
+    __slots__ = (
+        "interval",
+        "max_age",
+        "_scanner_factory",
+        "_scanner_kwargs",
+        "_scanner",
+        "_sightings",
+        "_ignored",
+        "_changed",
+        "_flush_handle",
+        "_events",
+        "_waiters",
+        "advertisements",
+        "changes",
+    )
+
+    def __init__(
+            self,
+            *,
+            interval: float=DEFAULT_COALESCE_INTERVAL,
+            max_age: float=DEFAULT_MAX_AGE,
+            scanner_factory: Optional[Callable[..., Any]]=None,
+            **scanner_kwargs
+    ):
+        self.interval = interval
+        self.max_age = max_age
+        self._scanner_factory = scanner_factory
+        self._scanner_kwargs = scanner_kwargs
+        self._scanner: Any = None
+        self._sightings: dict[str, _Sighting] = {}
+        self._ignored: dict[str, Optional[str]] = {}
+        # Devices that are not vehicles and the local name they were dismissed with
+        self._changed: dict[str, None] = {}
+        # Addresses changed since the last notification, in order
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._events = EventBus()
+        self._waiters: list[tuple[Callable[[], bool], asyncio.Future]] = []
+        self.advertisements: int = 0
+        """The number of advertisements received"""
+        self.changes: int = 0
+        """The number of advertisements that changed the inventory"""
+
+    @property
+    def running(self) -> bool:
+        """`True` while the monitor is scanning"""
+        return self._scanner is not None
+
+    async def start(self):
+        """Start scanning. Does nothing if the monitor is already running"""
+        if self._scanner is not None:
+            return
+        factory = self._scanner_factory or bleak.BleakScanner
+        scanner = factory(detection_callback=self._on_advertisement, **self._scanner_kwargs)
+        await scanner.start()
+        self._scanner = scanner
+
+    async def stop(self):
+        """
+        Stop scanning. Pending changes are delivered and waiters
+        still waiting fail with :class:`RuntimeError`. The inventory is kept.
+        """
+        if self._scanner is None:
+            return
+        scanner, self._scanner = self._scanner, None
+        try:
+            await scanner.stop()
+        finally:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+                self._flush()
+            for _, waiter in self._waiters:
+                if not waiter.done():
+                    waiter.set_exception(RuntimeError("The advertisement monitor was stopped"))
+            self._waiters.clear()
+
+    def _on_advertisement(self, device: BLEDevice, advertisement: AdvertisementData):
+        self.advertisements += 1
+        address = device.address
+        local_name = advertisement.local_name
+        now = time.monotonic()
+        sighting = self._sightings.pop(address, None)
+        if sighting is not None:
+            self._sightings[address] = sighting
+            # Moved to the end, so that the sightings stay ordered by last_seen
+        if sighting is not None and sighting.local_name == local_name:
+            stale = now - sighting.last_seen > self.max_age
+            sighting.rssi = advertisement.rssi
+            sighting.last_seen = now
+            if not stale:
+                return
+            # The vehicle is back after having left the inventory
+        elif sighting is None:
+            if address in self._ignored and self._ignored[address] == local_name:
+                return
+            try:
+                battery, version, name = interpret_local_name(local_name)
+            except ValueError:
+                # If we can't interprete the name, it can't be a vehicle
+                if address not in self._ignored and len(self._ignored) >= MAX_IGNORED:
+                    del self._ignored[next(iter(self._ignored))]
+                    # Dicts keep insertion order, so this is the one dismissed first
+                self._ignored[address] = local_name
+                return
+            self._prune(now, MAX_SIGHTINGS - 1)
+            # Makes room for the new one
+            sighting = self._sightings[address] = _Sighting(
+                device, local_name, battery, version, name  # type: ignore
+            )
+            sighting.rssi = advertisement.rssi
+            sighting.last_seen = now
+        else:
+            try:
+                battery, version, name = interpret_local_name(local_name)
+            except ValueError:
+                return
+            sighting.local_name = local_name  # type: ignore
+            sighting.battery = battery
+            sighting.version = version
+            sighting.name = name
+            sighting.device = device
+            sighting.rssi = advertisement.rssi
+            sighting.last_seen = now
+
+        self.changes += 1
+        self._changed[address] = None
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.interval, self._flush
+            )
+
+    def _prune(self, now: float, limit: int):
+        # Forgets devices not heard from within max_age, and the least recently
+        # heard ones beyond limit. Those are the first ones in _sightings
+        sightings = self._sightings
+        oldest = now - self.max_age
+        while sightings:
+            address, sighting = next(iter(sightings.items()))
+            if sighting.last_seen >= oldest and len(sightings) <= limit:
+                break
+            del sightings[address]
+
+    def _flush(self):
+        # Notifies subscribers and waiters about all changes since the last call
+        self._flush_handle = None
+        self._prune(time.monotonic(), MAX_SIGHTINGS)
+        changed = tuple(
+            self._sightings[address].freeze() for address in self._changed
+            if address in self._sightings
+        )
+        self._changed.clear()
+        if not changed:
+            return
+
+        waiting = []
+        for predicate, waiter in self._waiters:
+            if waiter.done():
+                # Cancelled or timed out
+                continue
+            try:
+                satisfied = predicate()
+            except Exception as e:
+                waiter.set_exception(e)
+                continue
+            if satisfied:
+                waiter.set_result(None)
+            else:
+                waiting.append((predicate, waiter))
+        self._waiters = waiting
+
+        self._events.publish(_CHANGE_EVENT, changed)
+
+    def subscribe(
+            self,
+            callback: Callable[[tuple[MonitoredVehicle, ...]], Any],
+            **kwargs
+    ) -> Subscription:
+        """
+        Call callback with the vehicles that changed, at most once per interval.
+        Accepts the keyword arguments of :meth:`EventBus.subscribe`
+
+        Returns
+        -------
+        :class:`Subscription`
+            A handle that can be used to unsubscribe again
+        """
+        return self._events.subscribe(_CHANGE_EVENT, callback, **kwargs)
+
+    def inventory(self) -> list[MonitoredVehicle]:
+        """
+        Every vehicle heard from within :attr:`AdvertisementMonitor.max_age`,
+        including charging ones
+        """
+        oldest = time.monotonic() - self.max_age
+        return [
+            sighting.freeze() for sighting in self._sightings.values()
+            if sighting.last_seen >= oldest
+        ]
+
+    def get(self, address: str) -> Optional[MonitoredVehicle]:
+        """The vehicle at address. `None` if it is not in the inventory"""
+        sighting = self._sightings.get(address)
+        if sighting is None or time.monotonic() - sighting.last_seen > self.max_age:
+            return None
+        return sighting.freeze()
+
+    def available(
+            self,
+            predicate: Callable[[MonitoredVehicle], bool]=is_charged
+    ) -> list[MonitoredVehicle]:
+        """
+        The vehicles in the inventory that predicate accepts, best first. See :attr:`Candidate.rank`
+
+        :param predicate: :class:`Callable[[MonitoredVehicle], bool]`
+            Defaults to :func:`is_charged`
+        """
+        return sorted(
+            (vehicle for vehicle in self.inventory() if predicate(vehicle)),
+            key=lambda vehicle: vehicle.to_candidate().rank
+        )
+
+    async def wait_for_available(
+            self,
+            count: int=1,
+            predicate: Callable[[MonitoredVehicle], bool]=is_charged,
+            *,
+            timeout: Optional[float]=None
+    ) -> list[MonitoredVehicle]:
+        """
+        Wait until at least count vehicles are available. This does not start a scan
+        of its own, the monitor has to be running.
+
+        :param count: :class:`int`
+            The number of vehicles to wait for
+        :param predicate: :class:`Callable[[MonitoredVehicle], bool]`
+            Which vehicles count as available. Defaults to :func:`is_charged`
+        :param timeout: :class:`Optional[float]`
+            The longest time to wait for, in seconds
+
+        Returns
+        -------
+        :class:`list[MonitoredVehicle]`
+            The available vehicles, best first
+
+        Raises
+        ------
+        :class:`asyncio.TimeoutError`
+            Fewer vehicles were available when the timeout passed
+        :class:`RuntimeError`
+            The monitor is not running or was stopped while waiting
+        """
+        def enough() -> bool:
+            return len(self.available(predicate)) >= count
+
+        if not enough():
+            if self._scanner is None:
+                raise RuntimeError("The advertisement monitor is not running")
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append((enough, waiter))
+            await asyncio.wait_for(waiter, timeout)
+        return self.available(predicate)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.stop()
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} running={self.running} vehicles={len(self.inventory())} "
+            f"advertisements={self.advertisements} changes={self.changes}>"
+        )
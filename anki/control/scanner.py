@@ -79,17 +79,15 @@ class Scanner(BaseScanner):
     async def scan(self) -> list[TrackPiece]:
         """Perform the scan"""
         completed = [False]  # In a list because of global local issues
-        track_types = []
+        track_types: set[TrackPieceType] = set()
         # This keeps track of the types we've visited
-        # (could also be a set,
-        # but TrackPieceType didn't have hashes back then)
         
         def watcher():
             track = self.vehicle._current_track_piece
             if track is not None:
                 # track might be None for the first time this event is called
                 self.map.append(track)
-                track_types.append(track.type)
+                track_types.add(track.type)
                 if TrackPieceType.START in track_types and TrackPieceType.FINISH in track_types:
                     # This marks the scan as complete
                     # once both START and FINISH have been found
@@ -0,0 +1,179 @@
+import math
+from array import array
+from typing import NamedTuple, Optional
+
+__all__ = (
+    "FleetSnapshot",
+    "FleetTable",
+)
+
+NO_POSITION = -1
+"""Stored in :attr:`FleetSnapshot.positions` for vehicles that have not been aligned yet"""
+
+_COLUMNS = (
+    # Name and array typecode of every column
+    ("ids", "q"),
+    ("positions", "q"),
+    ("offsets", "d"),
+    ("speeds", "q"),
+    ("timestamps", "q"),
+)
+
+
+def _frozen(column: array) -> memoryview:
+    # Slicing copies the array with a single memcpy
+    return memoryview(column[:]).toreadonly()
+
+
+class FleetSnapshot(NamedTuple):
+    """
+    An immutable view of the state of all vehicles of a :class:`Controller` at one point in time.
+
+    Every field is a column: a read-only :class:`memoryview` with one entry per vehicle.
+    The entries at the same index belong to the same vehicle.
+    Use :meth:`FleetSnapshot.to_numpy` to get the columns as NumPy arrays.
+
+    .. code-block:: python
+
+        snapshot = controller.snapshot()
+        for vehicle_id, speed in zip(snapshot.ids, snapshot.speeds):
+            ...
+    """
+    ids: memoryview
+    """The vehicle ids"""
+    positions: memoryview
+    """The positions on the map. :data:`NO_POSITION` for vehicles that are not aligned"""
+    offsets: memoryview
+    """The offsets from the road centre in mm. NaN if the vehicle did not report one yet"""
+    speeds: memoryview
+    """The speeds in mm/s"""
+    timestamps: memoryview
+    """:func:`time.monotonic_ns` at which the last notification of the vehicle was received"""
+
+    @property
+    def size(self) -> int:
+        """The number of vehicles in the snapshot"""
+        return len(self.ids)
+
+    def index_of(self, vehicle_id: int) -> int:
+        """
+        The index of a vehicle in the columns
+
+        Raises
+        ------
+        :class:`ValueError`
+            The vehicle is not part of the snapshot
+        """
+        return self.ids.tolist().index(vehicle_id)
+
+    def to_numpy(self) -> dict[str, "numpy.ndarray"]:  # type: ignore # noqa: F821
+        """
+        The columns as read-only NumPy arrays. They share memory with the snapshot.
+
+        Raises
+        ------
+        :class:`ImportError`
+            NumPy is not installed
+        """
+        try:
+            import numpy
+        except ImportError as e:
+            raise ImportError(
+                "FleetSnapshot.to_numpy requires numpy. "
+                "Install it with 'pip install py-drivesdk[numpy]'"
+            ) from e
+        return {name: numpy.asarray(column) for name, column in zip(self._fields, self)}
+
+
+class FleetTable:
+    """
+    The struct-of-arrays state of a fleet, kept up to date by the vehicles' notification path.
+    Every vehicle owns one row. Rows are kept dense, so removing a vehicle
+    moves the last row into its place.
+
+    .. note::
+        You should not be creating these manually,
+        use :func:`Controller.snapshot` to read the state of the fleet.
+    """
+    __slots__ = (
+        "ids",
+        "positions",
+        "offsets",
+        "speeds",
+        "timestamps",
+        "_owners",
+        "_version",
+        "_snapshot",
+        "_snapshot_version",
+    )
+
+    def __init__(self):
+        for name, typecode in _COLUMNS:
+            setattr(self, name, array(typecode))
+        self._owners: list = []
+        # The owner of every row. Owners have a _fleet_row attribute that is kept up to date
+        self._version = 0
+        # Incremented on every write, so unchanged snapshots can be reused
+        self._snapshot: Optional[FleetSnapshot] = None
+        self._snapshot_version = -1
+
+    def add(self, owner, vehicle_id: int) -> int:
+        """Add a row for owner and return its index"""
+        self._owners.append(owner)
+        self.ids.append(vehicle_id)
+        self.positions.append(NO_POSITION)
+        self.offsets.append(math.nan)
+        self.speeds.append(0)
+        self.timestamps.append(0)
+        self._version += 1
+        return len(self._owners) - 1
+
+    def remove(self, row: int):
+        """Remove a row. The last row takes its place"""
+        last = len(self._owners) - 1
+        if row != last:
+            moved = self._owners[last]
+            self._owners[row] = moved
+            moved._fleet_row = row
+            for name, _ in _COLUMNS:
+                column = getattr(self, name)
+                column[row] = column[last]
+        self._owners.pop()
+        for name, _ in _COLUMNS:
+            getattr(self, name).pop()
+        self._version += 1
+
+    def write(
+            self,
+            row: int,
+            position: Optional[int],
+            offset: Optional[float],
+            speed: int,
+            timestamp: int
+    ):
+        """Overwrite the state of a row"""
+        self.positions[row] = NO_POSITION if position is None else position
+        self.offsets[row] = math.nan if offset is None else offset
+        self.speeds[row] = speed
+        self.timestamps[row] = timestamp
+        self._version += 1
+
+    def snapshot(self) -> FleetSnapshot:
+        """
+        Copy the current state into a :class:`FleetSnapshot`.
+        The previous snapshot is returned if nothing has changed since.
+        """
+        snapshot = self._snapshot
+        if snapshot is None or self._snapshot_version != self._version:
+            snapshot = self._snapshot = FleetSnapshot(
+                _frozen(self.ids),
+                _frozen(self.positions),
+                _frozen(self.offsets),
+                _frozen(self.speeds),
+                _frozen(self.timestamps)
+            )
+            self._snapshot_version = self._version
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self._owners)
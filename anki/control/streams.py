@@ -0,0 +1,261 @@
+import asyncio
+from collections import deque
+from enum import Enum
+from typing import Generic, Optional, TypeVar
+
+from .. import errors
+from .events import Subscription
+
+__all__ = (
+    "OverflowPolicy",
+    "TelemetryStream",
+)
+
+T = TypeVar("T")
+
+DEFAULT_STREAM_SIZE = 64
+"""The number of items a stream buffers by default"""
+
+
+class OverflowPolicy(Enum):
+    """What a :class:`TelemetryStream` does with a new item while its buffer is full"""
+    DROP_OLDEST = "drop_oldest"
+    """Discard the oldest buffered item to make room. Consumers always see the latest data"""
+    DROP_NEWEST = "drop_newest"
+    """Discard the new item. Consumers see a contiguous run of items, but may miss recent ones"""
+    BLOCK = "block"
+    """
+    Make producers wait for space in :meth:`TelemetryStream.put`.
+    Streams fed by notifications, such as :func:`Vehicle.stream`, do not accept this policy,
+    since the notification handler must never be stalled by a consumer.
+    """
+
+
+class TelemetryStream(Generic[T]):
+    """
+    A bounded asynchronous stream of items, consumed with ``async for``.
+
+    Items are kept in a fixed-size ring buffer. When it is full, the
+    :class:`OverflowPolicy` decides which item is lost; every lost item is
+    counted in :attr:`TelemetryStream.dropped`. Iteration ends once the stream
+    has been closed and the remaining items have been consumed.
+
+    .. code-block:: python
+
+        with vehicle.track_updates(maxsize=16) as updates:
+            async for update in updates:
+                print(update.road_offset, update.speed)
+
+    :param maxsize: :class:`int`
+        The number of items the stream buffers
+    :param policy: :class:`OverflowPolicy`
+        What to do with new items while the buffer is full
+
+    .. note::
+        Streams of a :class:`Vehicle` should be opened with its stream methods
+        such as :func:`Vehicle.track_updates`. Remember to close them when you are done,
+        otherwise the vehicle keeps filling them.
+    """
+    __slots__ = (
+        "_buffer",
+        "_head",
+        "_size",
+        "_maxsize",
+        "_policy",
+        "_getters",
+        "_putters",
+        "_closed",
+        "_subscription",
+        "dropped",
+    )
+
+    def __init__(
+            self,
+            maxsize: int=DEFAULT_STREAM_SIZE,
+            policy: OverflowPolicy=OverflowPolicy.DROP_OLDEST
+    ):
+        if maxsize < 1:
+            raise ValueError("The size of a stream has to be at least 1")
+        self._buffer: list[Optional[T]] = [None] * maxsize
+        self._head = 0
+        # Index of the oldest item in the ring buffer
+        self._size = 0
+        self._maxsize = maxsize
+        self._policy = OverflowPolicy(policy)
+        self._getters: deque[asyncio.Future] = deque()
+        self._putters: deque[asyncio.Future] = deque()
+        # Futures are only created while somebody is actually waiting
+        self._closed = False
+        self._subscription: Optional[Subscription] = None
+        # Feeds the stream, if it is attached to an event source
+        self.dropped: int = 0
+        """The number of items lost to the overflow policy"""
+
+    def _attach(self, subscription: Subscription):
+        # Ties the lifetime of subscription to this stream
+        self._subscription = subscription
+
+    @staticmethod
+    def _wake(waiters: deque[asyncio.Future]):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def _wait(self, waiters: deque[asyncio.Future]):
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Pass the wake-up on, in case this waiter had already been chosen
+            if waiter.done() and not waiter.cancelled():
+                self._wake(waiters)
+            raise
+
+    def offer(self, item: T) -> bool:
+        """
+        Add an item without waiting. This never blocks, regardless of the policy.
+
+        :param item:
+            The item to add
+
+        Returns
+        -------
+        :class:`bool`
+            `False` if the item was dropped or the stream is closed
+        """
+        if self._closed:
+            return False
+
+        if self._size == self._maxsize:
+            self.dropped += 1
+            if self._policy is not OverflowPolicy.DROP_OLDEST:
+                return False
+            # Overwrite the oldest item
+            self._buffer[self._head] = item
+            self._head = (self._head + 1) % self._maxsize
+        else:
+            self._buffer[(self._head + self._size) % self._maxsize] = item
+            self._size += 1
+
+        if self._getters:
+            self._wake(self._getters)
+        return True
+
+    async def put(self, item: T) -> bool:
+        """
+        Add an item. With :attr:`OverflowPolicy.BLOCK` this waits until there is space,
+        with any other policy it behaves like :meth:`TelemetryStream.offer`.
+
+        Returns
+        -------
+        :class:`bool`
+            `False` if the item was dropped or the stream is closed
+        """
+        if self._policy is OverflowPolicy.BLOCK:
+            while self._size == self._maxsize and not self._closed:
+                await self._wait(self._putters)
+        return self.offer(item)
+
+    def get_nowait(self) -> T:
+        """
+        Remove and return the oldest item.
+
+        Raises
+        ------
+        :class:`asyncio.QueueEmpty`
+            There is no item available
+        """
+        if not self._size:
+            raise asyncio.QueueEmpty
+        item = self._buffer[self._head]
+        self._buffer[self._head] = None
+        # Don't keep consumed items alive
+        self._head = (self._head + 1) % self._maxsize
+        self._size -= 1
+
+        if self._putters:
+            self._wake(self._putters)
+        return item  # type: ignore
+
+    async def get(self) -> T:
+        """
+        Remove and return the oldest item, waiting for one if the stream is empty.
+
+        Raises
+        ------
+        :class:`StreamClosedError`
+            The stream is closed and all items have been consumed
+        """
+        while not self._size:
+            if self._closed:
+                raise errors.StreamClosedError("The stream has been closed")
+            await self._wait(self._getters)
+        return self.get_nowait()
+
+    def close(self):
+        """
+        Close the stream. Items that are still buffered can be consumed,
+        after that iteration stops. New items are refused.
+        Closing a stream twice does nothing.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._subscription is not None:
+            self._subscription.cancel()
+            self._subscription = None
+        for waiters in (self._getters, self._putters):
+            while waiters:
+                self._wake(waiters)
+
+    @property
+    def closed(self) -> bool:
+        """`True` once :meth:`TelemetryStream.close` has been called"""
+        return self._closed
+
+    @property
+    def maxsize(self) -> int:
+        """The number of items the stream buffers"""
+        return self._maxsize
+
+    @property
+    def policy(self) -> OverflowPolicy:
+        """The overflow policy of the stream"""
+        return self._policy
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> T:
+        try:
+            return await self.get()
+        except errors.StreamClosedError:
+            raise StopAsyncIteration from None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} size={self._size}/{self._maxsize} "
+            f"policy={self._policy.name} dropped={self.dropped} closed={self._closed}>"
+        )
+
+
+def _notification_stream(maxsize: int, policy: OverflowPolicy) -> TelemetryStream:
+    # Creates a stream that is fed by notifications, which never wait for a consumer
+    if OverflowPolicy(policy) is OverflowPolicy.BLOCK:
+        raise ValueError(
+            "Streams of notifications cannot make the vehicle wait. "
+            "Use OverflowPolicy.DROP_OLDEST or OverflowPolicy.DROP_NEWEST"
+        )
+    return TelemetryStream(maxsize, policy)
@@ -1,105 +1,81 @@
 from warnings import warn
-from enum import IntEnum
 
-from typing import Callable, Optional
+from typing import Any, Callable, Optional
 import bleak
 import asyncio
+import time
+from concurrent.futures import Executor
 from bleak.backends.device import BLEDevice
-import dataclasses
 from bleak.exc import BleakDBusError, BleakError
 
 from ..misc import msg_protocol
 
 from ..misc.msgs import (
-    disassemble_charger_info,
-    disassemble_track_update,
-    disassemble_track_change,
     set_sdk_pkg,
     set_speed_pkg,
     change_lane_pkg,
     turn_180_pkg,
-    ping_pkg
+    ping_pkg,
+    decode_raw,
+    Decoder,
+    DECODERS,
+    TrackPieceUpdate,
+    TrackPieceChange,
+    ChargerInfo,
+    Delocalized
 )
 from ..misc.track_pieces import TrackPiece, TrackPieceType
 from ..misc import const
+from ..misc.const import Lights
+from ..misc.advertisement import BatteryState, interpret_local_name
 from ..misc.lanes import Lane3, Lane4, BaseLane, _Lane
 from .. import errors
+from .events import DEFAULT_MAX_IN_FLIGHT, EventBus, Subscription, VehicleEvent
+from .streams import DEFAULT_STREAM_SIZE, OverflowPolicy, TelemetryStream, _notification_stream
+from .ingress import NotificationIngress
+from .snapshot import FleetTable
+from .history import DEFAULT_HISTORY_SIZE, TelemetryHistory
+from .connection import ConnectPhase, ConnectTimings
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .controller import Controller
     pass
 
-_Callback = Callable[[], None]
+_Callback = Callable[[], Any]
+_MessageCallback = Callable[[Any], None]
+_DispatchEntry = tuple[Decoder, _MessageCallback]
 
+_LATENCY_SMOOTHING = 0.25
+# Weight of a new ping round trip in the moving average of Vehicle.latency
 
-def interpret_local_name(name: str|None):
-    # Get the state of the vehicle from the local name
-    if name is None or len(name) < 1:  # Fix some issues that might occur
-        raise ValueError("Name was empty")
-        pass
-    nameBytes = name.encode("utf-8")
-    vehicleState = nameBytes[0]
-    version = int.from_bytes(nameBytes[1:3], "little", signed=False)
-    vehicleName = nameBytes[8:].decode("utf-8")
-
-    return BatteryState.from_int(vehicleState), version, vehicleName
-
-
-def _call_all_soon(funcs, *args):
-    # Registers everything in funcs to be called soon with *args
-    for f in funcs:
-        asyncio.get_running_loop().call_soon(f, *args)
-
-
-@dataclasses.dataclass(frozen=True)
-class BatteryState:
-    """Represents the state of a supercar"""
-    full_battery: bool
-    low_battery: bool|None
-    on_charger: bool
-    charging: bool|None = None
-
-    @classmethod
-    def from_int(cls, state: int):
-        """Constructs a :class:`BatteryState` from an integer representation
-        
-        :param state: :class:`int`
-            The integer state passed by the discovery process
-        
-        Returns
-        -------
-        :class:`BatteryState`
-        The new :class:`BatteryState` instance
-        """
-        full = bool(state & (1 << const.VehicleBattery.FULL_BATTERY))
-        low = bool(state & (1 << const.VehicleBattery.LOW_BATTERY))
-        on_charger = bool(state & (1 << const.VehicleBattery.ON_CHARGER))
+_IGNORE: _DispatchEntry = (lambda buffer, offset: None, lambda message: None)
+# Dispatch entry for message types nobody is interested in
 
-        return cls(full, low, on_charger)
 
-    @classmethod
-    def from_charger_info(cls, payload: bytes):
-        """
-        Constructs a :class:`BatteryState` instance from a CHARGER_INFO message.
+def _chain_publish(
+        entry: _DispatchEntry|None,
+        decoder: Decoder,
+        events: EventBus,
+        msg_type: int
+) -> _DispatchEntry:
+    # Builds a dispatch entry that runs the built-in handler (if any)
+    # and then publishes the decoded message to the subscribers of its message type
+    publish = events.publish
+    if entry is None:
+        def dispatch(message):
+            publish(msg_type, message)
+        return decoder, dispatch
 
-        :param payload: :class:`bytes`
-            The payload of the CHARGER_INFO message
-        
-        Returns
-        -------
-        :class:`BatteryState`
-        The new :class:`BatteryState` instance
-        """
-        _, on_charger, charging, full = disassemble_charger_info(payload)
-        return cls(full, None, on_charger, charging)
+    decoder, handle = entry
+    def chained_dispatch(message):
+        handle(message)
+        publish(msg_type, message)
+    return decoder, chained_dispatch
 
 
-class Lights(IntEnum):
-    HEADLIGHTS = 0
-    BRAKELIGHTS = 1
-    FRONTLIGHTS = 2
-    ENGINELIGHTS = 3
+def _battery_state(info: ChargerInfo) -> BatteryState:
+    return BatteryState(info.full, None, info.on_charger, info.charging)
 
 
 class Vehicle:
@@ -131,19 +107,28 @@ class Vehicle:
         "_road_offset",
         "_speed",
         "on_track_piece_change",
-        "_track_piece_future",
+        "_track_generation",
+        "_track_waiters",
         "_position",
         "_map",
         "_read_chara",
         "_write_chara",
         "_id",
-        "_track_piece_watchers",
-        "_pong_watchers",
-        "_delocal_watchers",
-        "_battery_watchers",
+        "_events",
         "_controller",
         "_ping_task",
-        "_battery"
+        "_battery",
+        "_dispatch",
+        "_published_msg_types",
+        "_received_at",
+        "_tap",
+        "_triggers",
+        "_fleet_table",
+        "_fleet_row",
+        "_history",
+        "_connect_timings",
+        "_adapter",
+        "_latency"
     )
     
     def __init__(
@@ -170,108 +155,221 @@ class Vehicle:
         self._position: Optional[int] = None
 
         self.on_track_piece_change: Callable = lambda: None  # Set a dummy function by default
-        self._track_piece_future: asyncio.Future = asyncio.Future()
-        self._track_piece_watchers: list[_Callback] = []
-        self._pong_watchers: list[_Callback] = []
-        self._delocal_watchers: list[_Callback] = []
-        self._battery_watchers: list[_Callback] = []
+        self._track_generation: int = 0
+        # Counts the track piece changes. Waiters compare against it instead of
+        # the vehicle allocating a new future on every change
+        self._track_waiters: list[tuple[Callable[[], bool], asyncio.Future]] = []
+        self._events = EventBus()
         self._controller = controller
         self._battery: BatteryState = battery
 
+        self._dispatch: dict[int, _DispatchEntry] = {
+            const.VehicleMsg.TRACK_PIECE_UPDATE: (
+                TrackPieceUpdate.unpack, self._handle_track_piece_update
+            ),
+            const.VehicleMsg.TRACK_PIECE_CHANGE: (
+                TrackPieceChange, self._handle_track_piece_change
+            ),
+            const.VehicleMsg.PONG: (DECODERS[const.VehicleMsg.PONG], self._handle_pong),
+            const.VehicleMsg.DELOCALIZED: (
+                DECODERS[const.VehicleMsg.DELOCALIZED], self._handle_delocalized
+            ),
+            const.VehicleMsg.CHARGER_INFO: (ChargerInfo.unpack, self._handle_charger_info),
+        }
+        # Maps message types to their decoder and handler.
+        # Extended by Vehicle.message_handler
+        self._published_msg_types: set[int] = set()
+        self._received_at: int = 0
+        # time.monotonic_ns() at which the packet being processed was received
+        self._tap: Optional[Callable[["Vehicle", int, Any, bytearray], None]] = None
+        # Sees every notification after it has been handled. Set by the Controller
+        self._triggers: Optional[EventBus] = None
+        # Actions keyed by map position and track piece type.
+        # Created by the first call to at_position or at_piece_type
+        self._fleet_table: Optional[FleetTable] = None
+        self._fleet_row: int = -1
+        # The row of this vehicle in the fleet table of its Controller
+        self._history: Optional[TelemetryHistory] = None
+        self._connect_timings: Optional[ConnectTimings] = None
+        self._adapter: Optional[str] = None
+        # The Bluetooth adapter the client uses. Set by the Controller
+        self._latency: Optional[float] = None
+
+    def _receive(self, timestamp: int, data: bytearray):
+        # Called by the NotificationIngress on the event loop
+        self._received_at = timestamp
+        self._notify_handler(None, data)
+
     def _notify_handler(self, handler, data: bytearray):
         """An internal handler function that gets called on a notify receive"""
-        msg_type, payload = msg_protocol.disassemble_packet(data)
-        if msg_type == const.VehicleMsg.TRACK_PIECE_UPDATE:
-            # This gets called when part-way along a track piece (sometimes)
-            loc, piece, offset, speed, clockwise = disassemble_track_update(payload)
+        msg_type = msg_protocol.check_packet(data)
+        decode, handle = self._dispatch.get(msg_type, _IGNORE)
+        # The payload is decoded in place, so that no copies are made per notification
+        message = decode(data, msg_protocol.PAYLOAD_OFFSET)
+        handle(message)
+        if self._tap is not None:
+            self._tap(self, msg_type, message, data)
+
+    def _handle_track_piece_update(self, update: TrackPieceUpdate):
+        # This gets called when part-way along a track piece (sometimes)
+        # Update internal variables when new info available
+        self._road_offset = update.road_offset
+        self._speed = update.speed
+        if self._fleet_table is not None:
+            self._sync_fleet_row()
+        if self._history is not None:
+            self._history.record(
+                self._received_at,
+                update.piece,
+                update.loc,
+                update.road_offset,
+                update.speed,
+                self._position
+            )
+
+        # Post a warning when TrackPiece creation failed (but not an error)
+        try:
+            piece_obj = TrackPiece.from_raw(update.loc, update.piece, update.clockwise)
+        except ValueError:
+            warn(
+                f"A TrackPiece value received from the vehicle could not be decoded. \
+                If you are running a scan, this will break it. Received: {update.piece}",
+                errors.TrackPieceDecodeWarning
+            )
+            return
 
-            # Update internal variables when new info available
-            self._road_offset = offset
-            self._speed = speed
+        self._current_track_piece = piece_obj
 
-            # Post a warning when TrackPiece creation failed (but not an error)
+    def _handle_track_piece_change(self, change: TrackPieceChange):
+        if (
+            self._current_track_piece is not None 
+            and self._current_track_piece.type == TrackPieceType.FINISH
+        ):
+            self._position = 0
+        
+        # TODO: Find out what to do with change.uphill_counter and change.downhill_counter
+        # (The message is decoded lazily, so unused fields cost nothing)
+        if self._position is not None:
+            # If vehicle is aligned
+            # This may happen during scan or because of a flying realign
+            # FIXME: Position index 0 does not exist on flying align o.0
+            self._position += 1
+            if self._map is not None:
+                # If already scanned the map, ensure position is valid
+                self._position %= len(self._map)
+        if self._fleet_table is not None:
+            self._sync_fleet_row()
+
+        self._track_generation += 1
+        if self._track_waiters:
+            # Nothing is allocated or checked when nobody is waiting
+            self._wake_track_waiters()
+        self.on_track_piece_change()
+        self._events.publish(VehicleEvent.TRACK_PIECE_CHANGE)
+        if self._triggers is not None and self._position is not None:
+            # Only the actions of the new position are looked up
+            self._triggers.publish(self._position, self)
+            if self._map is not None:
+                self._triggers.publish(self._map[self._position].type, self)
+
+    def _wake_track_waiters(self):
+        waiting = []
+        for predicate, waiter in self._track_waiters:
+            if waiter.done():
+                # Cancelled or timed out
+                continue
             try:
-                piece_obj = TrackPiece.from_raw(loc, piece, clockwise)
-            except ValueError:
-                warn(
-                    f"A TrackPiece value received from the vehicle could not be decoded. \
-                    If you are running a scan, this will break it. Received: {piece}",
-                    errors.TrackPieceDecodeWarning
-                )
-                return
-
-            self._current_track_piece = piece_obj
-
-        elif msg_type == const.VehicleMsg.TRACK_PIECE_CHANGE:
-            if (
-                self._current_track_piece is not None 
-                and self._current_track_piece.type == TrackPieceType.FINISH
-            ):
-                self._position = 0
-            
-            uphill_count, downhill_count = disassemble_track_change(payload)[8:10]
-            """TODO: Find out what to do with these"""
-            if self._position is not None:
-                # If vehicle is aligned
-                # This may happen during scan or because of a flying realign
-                # FIXME: Position index 0 does not exist on flying align o.0
-                self._position += 1
-                if self._map is not None:
-                    # If already scanned the map, ensure position is valid
-                    self._position %= len(self._map)
-
-            self._track_piece_future.set_result(None)
-            # Complete internal future when on new track piece.
-            # This is used in wait_for_track_change
-            self._track_piece_future = asyncio.Future()
-            # Create new future since the old one is now done
-            self.on_track_piece_change()
-            _call_all_soon(self._track_piece_watchers)
-            pass
-        elif msg_type == const.VehicleMsg.PONG:
-            _call_all_soon(self._pong_watchers)
-        elif msg_type == const.VehicleMsg.DELOCALIZED:
-            _call_all_soon(self._delocal_watchers)
-            pass
-        elif msg_type == const.VehicleMsg.CHARGER_INFO:
-            self._battery = BatteryState.from_charger_info(payload)
-            _call_all_soon(self._battery_watchers)
-            pass
-        pass
+                satisfied = predicate()
+            except Exception as e:
+                waiter.set_exception(e)
+                continue
+            if satisfied:
+                waiter.set_result(None)
+            else:
+                waiting.append((predicate, waiter))
+        self._track_waiters = waiting
+
+    async def _wait_for_track(self, predicate: Callable[[], bool]):
+        # Waits until predicate is true after a track piece change.
+        # Returns immediately if it is already true.
+        if predicate():
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._track_waiters.append((predicate, waiter))
+        await waiter
+
+    def _sync_fleet_row(self):
+        # Writes the state of this vehicle into the fleet table
+        self._fleet_table.write(  # type: ignore
+            self._fleet_row,
+            self._position,
+            self._road_offset,
+            self._speed,
+            self._received_at
+        )
+
+    def _set_position(self, position: Optional[int]):
+        # For position changes outside of the notification path
+        self._position = position
+        if self._fleet_table is not None:
+            self._sync_fleet_row()
+
+    def _handle_pong(self, _):
+        self._events.publish(VehicleEvent.PONG)
+
+    def _handle_delocalized(self, _):
+        self._events.publish(VehicleEvent.DELOCALIZED)
+
+    def _handle_charger_info(self, info: ChargerInfo):
+        self._battery = _battery_state(info)
+        self._events.publish(VehicleEvent.BATTERY_CHANGE)
 
     async def _auto_ping(self):
         # Automatically pings the supercars
         # and disconnects when they don't respond.
         # TODO: Remove debug prints
         # TODO: Replace future with event
-        pong_reply_future = asyncio.Future()
+        loop = asyncio.get_running_loop()
+        pong_reply_future = loop.create_future()
         
-        @self.pong
         def pong_watch():
-            nonlocal pong_reply_future
-            pong_reply_future.set_result()
-            pong_reply_future = asyncio.Future()
+            # The future of a ping that timed out is cancelled, and late pongs must not fail
+            if not pong_reply_future.done():
+                pong_reply_future.set_result(None)
             print("Pong reply!")
             pass
         
-        config = type(self).AUTOMATIC_PING_CONTROL
-        timeouts = 0
-        while self.is_connected:
-            await asyncio.sleep(config["interval"])
-            await self.ping()
-            print("Ping!")
-            try:
-                await asyncio.wait_for(pong_reply_future, config["timeout"])
-            except asyncio.TimeoutError:
-                timeouts += 1
-                print("Ping failed")
-            else:
-                timeouts = 0
-                print("Ping succeeded")
-
-            if timeouts > config["max_timeouts"]:
-                warn("The vehicle did not sufficiently respond to pings. Disconnecting...")
-                await self.disconnect()
+        subscription = self.subscribe(VehicleEvent.PONG, pong_watch)
+        # Cancelled when the task ends, so that reconnecting does not pile up handlers
+        try:
+            config = type(self).AUTOMATIC_PING_CONTROL
+            timeouts = 0
+            while self.is_connected:
+                await asyncio.sleep(config["interval"])
+                pong_reply_future = loop.create_future()
+                # A fresh one per ping, so that a pong arriving late is not taken for the next one
+                sent = time.perf_counter()
+                await self.ping()
+                print("Ping!")
+                try:
+                    await asyncio.wait_for(pong_reply_future, config["timeout"])
+                except asyncio.TimeoutError:
+                    timeouts += 1
+                    print("Ping failed")
+                else:
+                    timeouts = 0
+                    print("Ping succeeded")
+                    round_trip = time.perf_counter() - sent
+                    if self._latency is None:
+                        self._latency = round_trip
+                    else:
+                        self._latency += _LATENCY_SMOOTHING * (round_trip - self._latency)
+
+                if timeouts > config["max_timeouts"]:
+                    warn("The vehicle did not sufficiently respond to pings. Disconnecting...")
+                    await self.disconnect()
+        finally:
+            subscription.cancel()
 
     async def __send_package(self, payload: bytes):
         """Send a payload to the supercar"""
@@ -293,13 +391,86 @@ class Vehicle:
             The new track piece. `None` if :func:`Vehicle.map` is None
             (for example if the map has not been scanned yet)
         """
-        await self._track_piece_future
-        # Wait on a new track piece (See _notify_handler)
+        return await self.wait_for_changes(1)
+
+    async def wait_for_changes(self, count: int) -> Optional[TrackPiece]:
+        """Waits until the track piece has changed count times.
+
+        :param count: :class:`int`
+            The number of track piece changes to wait for.
+            Returns immediately if this is 0
+
+        Returns
+        -------
+        :class:`TrackPiece`
+            The new track piece. `None` if :func:`Vehicle.map` is None
+
+        Raises
+        ------
+        :class:`ValueError`
+            count is negative
+        """
+        if count < 0:
+            raise ValueError("Cannot wait for a negative number of track piece changes")
+        target = self._track_generation + count
+        await self._wait_for_track(lambda: self._track_generation >= target)
         return self.current_track_piece
 
-    async def connect(self):
+    async def wait_until_position(self, position: int) -> Optional[TrackPiece]:
+        """Waits until the vehicle drives onto the given position on the map.
+        Returns immediately if the vehicle is already there.
+
+        :param position: :class:`int`
+            The index into :func:`Vehicle.map` to wait for
+
+        Returns
+        -------
+        :class:`TrackPiece`
+            The track piece at position. `None` if :func:`Vehicle.map` is None
+
+        Raises
+        ------
+        :class:`ValueError`
+            The position is not on the map
+        """
+        if self._map is not None and not 0 <= position < len(self._map):
+            raise ValueError(f"Position {position} is not on the map")
+        await self._wait_for_track(lambda: self._position == position)
+        return self.current_track_piece
+
+    async def wait_until_piece_type(self, piece_type: TrackPieceType) -> TrackPiece:
+        """Waits until the vehicle drives onto a track piece of the given type.
+        Returns immediately if the vehicle is already on one.
+
+        :param piece_type: :class:`TrackPieceType`
+            The type of track piece to wait for
+
+        Returns
+        -------
+        :class:`TrackPiece`
+            The track piece the vehicle is on
+
+        Raises
+        ------
+        :class:`RuntimeError`
+            The vehicle does not have a map. Scan the map and align the vehicle first
+        """
+        if self._map is None:
+            raise RuntimeError("Waiting for a track piece type requires a scanned map")
+
+        def on_piece_type():
+            piece = self.current_track_piece
+            return piece is not None and piece.type is piece_type
+        await self._wait_for_track(on_piece_type)
+        return self.current_track_piece  # type: ignore
+
+    async def connect(self, *, timings: Optional[ConnectTimings]=None):
         """Connect to the Supercar
         **Don't forget to call Vehicle.disconnect on program exit!**
+
+        :param timings: :class:`Optional[ConnectTimings]`
+            Record the time each phase takes in this object instead of a new one.
+            Available as :attr:`Vehicle.connect_timings` afterwards
         
         Raises
         ------
@@ -310,6 +481,10 @@ class Vehicle:
         :class:`ConnectionFailedException`
             A generic error occured whilst connection to the supercar
         """
+        if timings is None:
+            timings = ConnectTimings()
+        self._connect_timings = timings
+        timings.restart()
         try:
             connect_success = await self._client.connect()
             if not connect_success:
@@ -331,6 +506,7 @@ class Vehicle:
                 "An attempt to connect to the vehicle timed out. \
                 Make sure the car is actually disconnected."
             ) from e
+        timings.lap(ConnectPhase.CONNECT)
         
         # Get service and characteristics
         services = self._client.services
@@ -344,13 +520,22 @@ class Vehicle:
                 "This vehicle does not have a read or write characteristic. \
                 If this occurs again, something is severly wrong with your vehicle."
             )
+        timings.lap(ConnectPhase.SERVICE_LOOKUP)
 
         await self._client.write_gatt_char(
             write,
             set_sdk_pkg(True, 0x1)
         )
         # NOTE: If someone knows what the flags mean, please contact us
-        await self._client.start_notify(read, self._notify_handler)
+        timings.lap(ConnectPhase.SDK_ENABLE)
+        if self._controller is not None:
+            ingress = self._controller._notification_ingress()
+        else:
+            ingress = NotificationIngress()
+        await self._client.start_notify(read, ingress.callback(self._receive))
+        # Notifications may be delivered on any thread.
+        # The ingress hands them to the event loop in batches
+        timings.lap(ConnectPhase.NOTIFY_START)
 
         self._read_chara = read
         self._write_chara = write
@@ -391,6 +576,9 @@ class Vehicle:
         if not self._is_connected and self._controller is not None:
             self._controller.vehicles.remove(self)
             self._ping_task.cancel("Vehicle disconnected")
+        if not self._is_connected and self._fleet_table is not None:
+            self._fleet_table.remove(self._fleet_row)
+            self._fleet_table = None
 
         return self._is_connected
 
@@ -406,6 +594,8 @@ class Vehicle:
         # Update the internal speed as well
         # (this is technically an overestimate, but the error is marginal)
         self._speed = speed
+        if self._fleet_table is not None:
+            self._sync_fleet_row()
 
     async def stop(self):
         """Stops the Supercar"""
@@ -541,12 +731,13 @@ class Vehicle:
         await self.set_speed(speed)
         # Waits until the previous track piece was FINISH (by default).
         # This means the current position is START
-        while self._current_track_piece is None\
-                or self._current_track_piece.type is not target_previous_track_piece_type:
-            await self.wait_for_track_change()
+        await self._wait_for_track(
+            lambda: self._current_track_piece is not None
+            and self._current_track_piece.type is target_previous_track_piece_type
+        )
 
         # Vehicle is now at START which is always 0
-        self._position = 0
+        self._set_position(0)
 
         await self.stop()
     
@@ -556,14 +747,15 @@ class Vehicle:
         drives onto a new track piece
 
         :param func: :class:`function`
-            The listening function
+            The listening function. This may also be a coroutine function.
+            Use :func:`Vehicle.subscribe` to get a cancellable :class:`Subscription` instead
         
         Returns
         -------
         :class:`function`
             The function that was passed in
         """
-        self._track_piece_watchers.append(func)
+        self._events.subscribe(VehicleEvent.TRACK_PIECE_CHANGE, func)
         return func
         pass
     
@@ -579,7 +771,7 @@ class Vehicle:
         :class:`ValueError`
             The function passed is not an event handler
         """
-        self._track_piece_watchers.remove(func)
+        self._events.unsubscribe(VehicleEvent.TRACK_PIECE_CHANGE, func)
         pass
 
     def delocalized(self, func: _Callback):
@@ -589,14 +781,19 @@ class Vehicle:
         :param func: :class:`function`
             The listening function
 
+        Returns
+        -------
+        :class:`function`
+            The function that was passed in
+
         .. note::
             It is not guaranteed that the handler will be called when the vehicle is delocalized.
             Furthermore, it is not guaranteed that the handler will *not* be called when the
             vehicle is still localized.
             This method should only be used for informational purposes!
         """
-        self._delocal_watchers.append(func)
-        pass
+        self._events.subscribe(VehicleEvent.DELOCALIZED, func)
+        return func
 
     def remove_delocalized_watcher(self, func: _Callback):
         """
@@ -610,30 +807,42 @@ class Vehicle:
         :class:`ValueError`
             The function passed is not an event handler
         """
-        self._delocal_watchers.remove(func)
+        self._events.unsubscribe(VehicleEvent.DELOCALIZED, func)
         pass
 
     def battery_change(self, func: _Callback):
         """
         Register a callback to execute on changes to the battery state.
+
+        :param func: :class:`function`
+            The listening function
+
+        Returns
+        -------
+        :class:`function`
+            The function that was passed in
         
         .. note::
             It is not guaranteed that the battery state has actually changed
             from the last callback.
             Further note that this function is not called on startup.
-        
+        """
+        self._events.subscribe(VehicleEvent.BATTERY_CHANGE, func)
+        return func
+
+    def remove_battery_watcher(self, func: _Callback):
+        """
+        Remove a battery event handler that was added by :func:`Vehicle.battery_change`.
+
+        :param func: :class:`function`
+            The function to be removed
+
         Raises
         ------
         :class:`ValueError`
             The function passed is not an event handler
         """
-        self._battery_watchers.append(func)
-        # FIXME: Function returns None, should func
-        pass
-
-    def remove_battery_watcher(self, func: _Callback):
-        # TODO: Add code comments
-        self._battery_watchers.remove(func)
+        self._events.unsubscribe(VehicleEvent.BATTERY_CHANGE, func)
 
     async def ping(self):
         """
@@ -653,9 +862,325 @@ class Vehicle:
         :class:`function`
             The function being passed in
         """
-        self._pong_watchers.append(func)
+        self._events.subscribe(VehicleEvent.PONG, func)
         return func
 
+    def message_handler(self, msg_type: int):
+        """
+        A decorator marking a function to be executed when the supercar sends
+        a message of the given type.
+        The function is called with the decoded message
+        (such as :class:`anki.misc.msgs.VersionResponse`). Message types without
+        a decoder in :data:`anki.misc.msgs.DECODERS` pass the raw payload as :class:`bytes`.
+
+        .. code-block:: python
+
+            @vehicle.message_handler(const.VehicleMsg.VERSION_RESP)
+            def on_version(message: VersionResponse):
+                print(message.version)
+
+        :param msg_type: :class:`int`
+            The message type to listen for. See :class:`anki.misc.const.VehicleMsg`
+
+        Returns
+        -------
+        :class:`function`
+            The decorator
+        """
+        def decorator(func: _MessageCallback):
+            self.subscribe(msg_type, func)
+            return func
+        return decorator
+
+    def remove_message_handler(self, msg_type: int, func: _MessageCallback):
+        """
+        Remove a message handler added by :func:`Vehicle.message_handler`
+
+        :param msg_type: :class:`int`
+            The message type the function was registered for
+        :param func: :class:`function`
+            The function to remove as a message handler
+
+        Raises
+        ------
+        :class:`ValueError`
+            The function passed is not a handler for this message type
+        """
+        self._events.unsubscribe(msg_type, func)
+
+    def subscribe(
+            self,
+            event: VehicleEvent|int,
+            callback: Callable[..., Any],
+            *,
+            weak: bool=False,
+            executor: Optional[Executor]=None,
+            max_in_flight: int=DEFAULT_MAX_IN_FLIGHT,
+            once: bool=False
+    ) -> Subscription:
+        """
+        Subscribe a callback to an event of this vehicle.
+        This is what the decorators such as :func:`Vehicle.track_piece_change` use internally,
+        but it returns a :class:`Subscription` handle that can be cancelled in constant time.
+
+        .. code-block:: python
+
+            async def on_change():
+                await log_position(vehicle.map_position)
+
+            subscription = vehicle.subscribe(VehicleEvent.TRACK_PIECE_CHANGE, on_change)
+            ...
+            subscription.cancel()
+
+        :param event: :class:`VehicleEvent` | :class:`int`
+            A :class:`VehicleEvent` (callbacks take no arguments)
+            or a message type from :class:`anki.misc.const.VehicleMsg`
+            (callbacks take the decoded message, see :func:`Vehicle.message_handler`)
+        :param callback: :class:`Callable`
+            A function or coroutine function. Coroutine functions are started as tasks
+        :param weak: :class:`bool`
+            Only keep a weak reference to the callback. See :meth:`EventBus.subscribe`
+        :param executor: :class:`Optional[concurrent.futures.Executor]`
+            Run the callback in this thread or process pool instead of on the event loop.
+            Use this for slow callbacks such as logging or plotting.
+            Offloaded callbacks of this vehicle receive its events in order.
+            See :meth:`EventBus.subscribe`
+        :param max_in_flight: :class:`int`
+            The number of offloaded calls that may be queued or running at once.
+            Further events are dropped for this callback
+        :param once: :class:`bool`
+            Cancel the subscription after the first event
+
+        Returns
+        -------
+        :class:`Subscription`
+            The handle of the new subscription
+        """
+        if isinstance(event, int) and event not in self._published_msg_types:
+            # Message types are only published once somebody is interested in them
+            self._dispatch[event] = _chain_publish(
+                self._dispatch.get(event),
+                DECODERS.get(event, decode_raw),
+                self._events,
+                event
+            )
+            self._published_msg_types.add(event)
+        return self._events.subscribe(
+            event,
+            callback,
+            weak=weak,
+            executor=executor,
+            max_in_flight=max_in_flight,
+            once=once
+        )
+
+    def at_position(
+            self,
+            position: int,
+            action: Callable[["Vehicle"], Any],
+            *,
+            once: bool=False,
+            **kwargs
+    ) -> Subscription:
+        """
+        Run an action whenever the vehicle drives onto a position of the map.
+        Actions are kept in a table indexed by position, so a track piece change
+        only looks at the actions of the new position.
+
+        .. code-block:: python
+
+            async def brake(vehicle: Vehicle):
+                await vehicle.set_speed(200)
+
+            vehicle.at_position(5, brake)
+
+        :param position: :class:`int`
+            The index into :func:`Vehicle.map`
+        :param action: :class:`function`
+            A function or coroutine function called with the vehicle
+        :param once: :class:`bool`
+            Only run the action the next time the vehicle reaches position.
+            Otherwise it runs on every lap
+        :param kwargs:
+            Passed on to :func:`Vehicle.subscribe`, such as executor
+
+        Returns
+        -------
+        :class:`Subscription`
+            Cancel it to remove the action
+
+        Raises
+        ------
+        :class:`ValueError`
+            The position is not on the map
+        """
+        if self._map is not None and not 0 <= position < len(self._map):
+            raise ValueError(f"Position {position} is not on the map")
+        return self._add_trigger(position, action, once=once, **kwargs)
+
+    def at_piece_type(
+            self,
+            piece_type: TrackPieceType,
+            action: Callable[["Vehicle"], Any],
+            *,
+            once: bool=False,
+            **kwargs
+    ) -> Subscription:
+        """
+        Run an action whenever the vehicle drives onto a track piece of the given type.
+        This requires a scanned map. See :func:`Vehicle.at_position` for the arguments
+
+        Returns
+        -------
+        :class:`Subscription`
+            Cancel it to remove the action
+        """
+        return self._add_trigger(piece_type, action, once=once, **kwargs)
+
+    def _add_trigger(self, key: int|TrackPieceType, action: Callable, **kwargs) -> Subscription:
+        if self._triggers is None:
+            self._triggers = EventBus()
+        return self._triggers.subscribe(key, action, **kwargs)
+
+    def stream(
+            self,
+            msg_type: int,
+            *,
+            maxsize: int=DEFAULT_STREAM_SIZE,
+            policy: OverflowPolicy=OverflowPolicy.DROP_OLDEST
+    ) -> TelemetryStream:
+        """
+        Open a stream of the decoded messages of a message type.
+        This lets you consume messages with ``async for`` instead of polling properties.
+
+        .. code-block:: python
+
+            with vehicle.stream(const.VehicleMsg.TRACK_PIECE_UPDATE) as updates:
+                async for update in updates:
+                    print(update.speed)
+
+        :param msg_type: :class:`int`
+            The message type to stream. See :class:`anki.misc.const.VehicleMsg`
+        :param maxsize: :class:`int`
+            The number of messages buffered for a slow consumer
+        :param policy: :class:`OverflowPolicy`
+            What happens to new messages while the buffer is full
+
+        Returns
+        -------
+        :class:`TelemetryStream`
+            The stream. Close it when you are done with it
+
+        Raises
+        ------
+        :class:`ValueError`
+            policy is :attr:`OverflowPolicy.BLOCK`. The vehicle never waits for a consumer
+        """
+        stream = _notification_stream(maxsize, policy)
+        stream._attach(self.subscribe(msg_type, stream.offer))
+        return stream
+
+    def track_updates(self, **kwargs) -> TelemetryStream[TrackPieceUpdate]:
+        """
+        Open a stream of :class:`anki.misc.msgs.TrackPieceUpdate` messages.
+        These carry the speed and road offset of the supercar.
+        Takes the same keyword arguments as :func:`Vehicle.stream`
+        """
+        return self.stream(const.VehicleMsg.TRACK_PIECE_UPDATE, **kwargs)
+
+    def track_changes(self, **kwargs) -> TelemetryStream[TrackPieceChange]:
+        """
+        Open a stream of :class:`anki.misc.msgs.TrackPieceChange` messages.
+        Messages are added after :func:`Vehicle.map_position` has been updated.
+        Takes the same keyword arguments as :func:`Vehicle.stream`
+        """
+        return self.stream(const.VehicleMsg.TRACK_PIECE_CHANGE, **kwargs)
+
+    def delocalizations(self, **kwargs) -> TelemetryStream[Delocalized]:
+        """
+        Open a stream of :class:`anki.misc.msgs.Delocalized` messages.
+        The same restrictions as for :func:`Vehicle.delocalized` apply.
+        Takes the same keyword arguments as :func:`Vehicle.stream`
+        """
+        return self.stream(const.VehicleMsg.DELOCALIZED, **kwargs)
+
+    def battery_states(
+            self,
+            *,
+            maxsize: int=DEFAULT_STREAM_SIZE,
+            policy: OverflowPolicy=OverflowPolicy.DROP_OLDEST
+    ) -> TelemetryStream[BatteryState]:
+        """
+        Open a stream of the :class:`BatteryState` of the supercar,
+        with a new item every time the supercar reports it.
+        See :func:`Vehicle.stream` for the arguments
+        """
+        stream = _notification_stream(maxsize, policy)
+        stream._attach(self.subscribe(
+            const.VehicleMsg.CHARGER_INFO,
+            lambda info: stream.offer(_battery_state(info))
+        ))
+        # Built from the message, since the battery_state property may be newer by now
+        return stream
+
+    def enable_history(self, capacity: int=DEFAULT_HISTORY_SIZE) -> TelemetryHistory:
+        """
+        Start recording every track piece update of the supercar
+        (timestamp, track piece, location, road offset, speed and map position).
+        The samples are kept in a fixed-capacity :class:`TelemetryHistory`.
+        If a history is already being recorded, it is replaced.
+
+        :param capacity: :class:`int`
+            The number of samples kept. Older samples are overwritten
+
+        Returns
+        -------
+        :class:`TelemetryHistory`
+            The new history. It is also available as :func:`Vehicle.history`
+        """
+        self._history = TelemetryHistory(capacity)
+        return self._history
+
+    def disable_history(self):
+        """Stop recording the history. The samples recorded so far are discarded"""
+        self._history = None
+
+    @property
+    def history(self) -> Optional[TelemetryHistory]:
+        """
+        The history enabled with :func:`Vehicle.enable_history`.
+        This is :class:`None` if no history is being recorded.
+        """
+        return self._history
+
+    @property
+    def adapter(self) -> Optional[str]:
+        """
+        The Bluetooth adapter the vehicle is connected through, such as ``hci1``.
+        This is :class:`None` for the default adapter.
+        """
+        return self._adapter
+
+    @property
+    def latency(self) -> Optional[float]:
+        """
+        The moving average of the ping round trip time in seconds,
+        measured by the automatic pings. This is :class:`None` until the first pong.
+
+        The vehicles do not timestamp their notifications, so this stands in for
+        their latency. It is only updated once per ping interval
+        (see :attr:`Vehicle.AUTOMATIC_PING_CONTROL`) and lags behind sudden changes.
+        """
+        return self._latency
+
+    @property
+    def connect_timings(self) -> Optional[ConnectTimings]:
+        """
+        How long each phase of the last connection attempt took.
+        This is :class:`None` if :func:`Vehicle.connect` has not been called yet.
+        """
+        return self._connect_timings
+
     @property
     def is_connected(self) -> bool:
         """
@@ -671,10 +1196,11 @@ class Vehicle:
         .. note::
             This will return :class:`None` if either scan or align is not completed
         """
-        if self.map is None or self.map_position is None:
+        if self._map is None or self._position is None:
             # If scan or align not complete, we can't find the track piece
             return None
-        return self.map[self.map_position]
+        return self._map[self._position]
+        # Uses the internal list, since Vehicle.map copies it
 
     @property
     def map(self) -> tuple[TrackPiece, ...]|None:
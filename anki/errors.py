@@ -44,3 +44,7 @@ class DisconnectFailedError(AnkiError):
 
 class DisconnectTimedoutError(DisconnectFailedError):
     """The disconnect attempt timed out"""
+
+
+class StreamClosedError(AnkiError):
+    """A value was requested from a closed and exhausted telemetry stream"""
@@ -0,0 +1,66 @@
+"""
+Decoding of the information vehicles broadcast while discoverable.
+This module does not depend on bleak.
+"""
+import dataclasses
+
+from . import const
+from .msgs import disassemble_charger_info
+
+
+def interpret_local_name(name: str|None):
+    # Get the state, version and name of the vehicle from the local name
+    if name is None or len(name) < 1:  # Fix some issues that might occur
+        raise ValueError("Name was empty")
+        pass
+    nameBytes = name.encode("utf-8")
+    vehicleState = nameBytes[0]
+    version = int.from_bytes(nameBytes[1:3], "little", signed=False)
+    vehicleName = nameBytes[8:].decode("utf-8")
+
+    return BatteryState.from_int(vehicleState), version, vehicleName
+
+
+@dataclasses.dataclass(frozen=True)
+class BatteryState:
+    """Represents the state of a supercar"""
+    full_battery: bool
+    low_battery: bool|None
+    on_charger: bool
+    charging: bool|None = None
+
+    @classmethod
+    def from_int(cls, state: int):
+        """Constructs a :class:`BatteryState` from an integer representation
+        
+        :param state: :class:`int`
+            The integer state passed by the discovery process
+        
+        Returns
+        -------
+        :class:`BatteryState`
+        The new :class:`BatteryState` instance
+        """
+        full = bool(state & (1 << const.VehicleBattery.FULL_BATTERY))
+        low = bool(state & (1 << const.VehicleBattery.LOW_BATTERY))
+        on_charger = bool(state & (1 << const.VehicleBattery.ON_CHARGER))
+
+        return cls(full, low, on_charger)
+
+    @classmethod
+    def from_charger_info(cls, payload: bytes, offset: int=0):
+        """
+        Constructs a :class:`BatteryState` instance from a CHARGER_INFO message.
+
+        :param payload: :class:`bytes`
+            The payload of the CHARGER_INFO message
+        :param offset: :class:`int`
+            The index at which the payload starts within the buffer
+        
+        Returns
+        -------
+        :class:`BatteryState`
+        The new :class:`BatteryState` instance
+        """
+        _, on_charger, charging, full = disassemble_charger_info(payload, offset)
+        return cls(full, None, on_charger, charging)
@@ -0,0 +1,172 @@
+"""
+Vectorized decoding of recorded vehicle notifications.
+
+This module requires NumPy, which is an optional dependency
+(``pip install py-drivesdk[numpy]``).
+"""
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "anki.misc.batch requires numpy. Install it with 'pip install py-drivesdk[numpy]'"
+    ) from e
+
+from . import const
+from .msg_protocol import PAYLOAD_OFFSET
+from .msgs import (
+    _TRACK_UPDATE,
+    _TRACK_CHANGE,
+    _TRACK_CHANGE_FIELDS,
+    _CHARGER_INFO,
+    _VERSION_RESP,
+    TrackPieceUpdate,
+    ChargerInfo,
+    VersionResponse
+)
+from ..errors import MalformedPacketWarning
+
+from collections.abc import Collection
+
+__all__ = (
+    "BATCH_DTYPES",
+    "split_packets",
+    "decode_packets",
+)
+
+_NUMPY_CODES = {
+    "b": "i1",
+    "B": "u1",
+    "?": "?",
+    "h": "<i2",
+    "H": "<u2",
+    "f": "<f4",
+}
+
+
+def _struct_dtype(fmt: str, names: tuple[str, ...]) -> np.dtype:
+    # Translates a little endian struct format into an unaligned structured dtype
+    return np.dtype([
+        (name, _NUMPY_CODES[code])
+        for name, code in zip(names, fmt.lstrip("<"), strict=True)
+    ])
+
+
+BATCH_DTYPES: dict[int, np.dtype] = {
+    const.VehicleMsg.TRACK_PIECE_UPDATE: _struct_dtype(
+        _TRACK_UPDATE.format, TrackPieceUpdate._fields
+    ),
+    const.VehicleMsg.TRACK_PIECE_CHANGE: _struct_dtype(
+        _TRACK_CHANGE.format, _TRACK_CHANGE_FIELDS
+    ),
+    const.VehicleMsg.CHARGER_INFO: _struct_dtype(_CHARGER_INFO.format, ChargerInfo._fields),
+    const.VehicleMsg.VERSION_RESP: _struct_dtype(_VERSION_RESP.format, VersionResponse._fields),
+}
+"""
+The structured dtypes the payloads of each message type are decoded into.
+Field names match the attributes of the messages in :mod:`anki.misc.msgs`.
+"""
+
+
+def split_packets(buffer: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Splits a buffer of concatenated packets (each starting with its size byte)
+    into the offsets at which the packets begin and their message types.
+
+    :param buffer: :class:`bytes`
+        The concatenated packets
+
+    Returns
+    -------
+    :class:`tuple[numpy.ndarray, numpy.ndarray]`
+        The offsets of the packets and their message types
+
+    Raises
+    ------
+    :class:`MalformedPacketWarning`
+        A packet is empty or extends beyond the end of the buffer
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    size = len(data)
+    offsets = []
+    position = 0
+    # Each packet start depends on the previous size byte,
+    # so walking the sizes is the only sequential step
+    while position < size:
+        offsets.append(position)
+        position += buffer[position] + 1
+    if position != size:
+        raise MalformedPacketWarning(
+            f"The last packet extends beyond the end of the buffer ({position} > {size})"
+        )
+
+    offset_array = np.array(offsets, dtype=np.intp)
+    if np.any(data[offset_array] < 1):
+        raise MalformedPacketWarning("The buffer contains a packet without a message type")
+    return offset_array, data[offset_array + 1]
+
+
+def decode_packets(
+        buffer: bytes,
+        msg_types: Collection[int]|None=None
+) -> dict[int, np.ndarray]:
+    """
+    Decodes a buffer of concatenated packets into one structured array per message type.
+    All packets of a type are decoded in a single vectorized pass.
+
+    .. code-block:: python
+
+        updates = decode_packets(recording)[const.VehicleMsg.TRACK_PIECE_UPDATE]
+        print(updates["speed"].mean())
+
+    :param buffer: :class:`bytes`
+        The concatenated packets, as received from the vehicles (including the size bytes)
+    :param msg_types: :class:`Optional[Collection[int]]`
+        The message types to decode. Defaults to every type in :data:`BATCH_DTYPES`
+
+    Returns
+    -------
+    :class:`dict[int, numpy.ndarray]`
+        The decoded payloads by message type,
+        with dtypes as specified in :data:`BATCH_DTYPES`.
+        Message types that do not occur in the buffer are left out.
+
+    Raises
+    ------
+    :class:`MalformedPacketWarning`
+        A packet is malformed or its payload is too short for its message type
+    :class:`KeyError`
+        One of the requested message types has no entry in :data:`BATCH_DTYPES`
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    offsets, opcodes = split_packets(buffer)
+    if msg_types is None:
+        msg_types = BATCH_DTYPES.keys()
+
+    decoded = {}
+    for msg_type in msg_types:
+        dtype = BATCH_DTYPES[msg_type]
+        starts = offsets[opcodes == msg_type]
+        if len(starts) == 0:
+            continue
+        decoded[msg_type] = _decode_payloads(data, starts, msg_type, dtype)
+
+    return decoded
+
+
+def _decode_payloads(
+        data: np.ndarray,
+        starts: np.ndarray,
+        msg_type: int,
+        dtype: np.dtype
+) -> np.ndarray:
+    # Decodes the packets of one message type beginning at starts
+    if np.any(data[starts] - 1 < dtype.itemsize):
+        # Longer payloads are accepted, just like struct.unpack_from does
+        raise MalformedPacketWarning(
+            f"A packet of type {msg_type:#04x} is too short for its payload layout"
+        )
+    payloads = data[
+        starts[:, np.newaxis] + PAYLOAD_OFFSET + np.arange(dtype.itemsize)
+    ]
+    # Gathering the payload bytes into rows lets them be viewed as the structured type
+    return payloads.view(dtype).reshape(len(starts))
@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import Enum, IntEnum
 from typing import Self
 
 SERVICE_UUID = 'be15beef-6186-407e-8381-0bd89c4d8df4'
@@ -59,6 +59,13 @@ class VehicleMsg:
     pass
 
 
+class Lights(IntEnum):
+    HEADLIGHTS = 0
+    BRAKELIGHTS = 1
+    FRONTLIGHTS = 2
+    ENGINELIGHTS = 3
+
+
 class TrackPieceType(Enum):
     """
     An enumerator for all supported track piece types.
@@ -78,12 +85,17 @@ class TrackPieceType(Enum):
 
     @classmethod
     def try_enum(cls, value: int) -> Self:
-        for enum in cls:
-            if value in enum.value:
-                return enum
-                pass
-            pass
-
-        raise ValueError("piece value is not valid")
+        try:
+            return _PIECE_TYPES[value]
+        except KeyError:
+            raise ValueError("piece value is not valid") from None
         pass
     pass
+
+
+_PIECE_TYPES: dict[int, TrackPieceType] = {
+    value: piece_type
+    for piece_type in TrackPieceType
+    for value in piece_type.value
+}
+# Precomputed so that TrackPieceType.try_enum does not have to scan every member
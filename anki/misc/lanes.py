@@ -1,8 +1,60 @@
 from warnings import warn
 from enum import Enum
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from functools import cache
+from types import ModuleType
 from typing import TypeVar, Self
 
 
+@cache
+def _numpy() -> ModuleType|None:
+    # NumPy is optional and slow to import, so it is only loaded once it is needed
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class _LaneTable:
+    # Lookup tables of a lane class, built once when the class is created.
+    # The lanes are sorted by value. bounds[i] is the midpoint between lanes i and i+1,
+    # so the closest lane of a position is found with a single bisection.
+    __slots__ = ("lanes", "bounds", "ties", "by_name", "_arrays")
+
+    def __init__(self, lanes: Iterable["BaseLane"]):
+        definition_order = list(lanes)
+        self.lanes = tuple(sorted(definition_order, key=lambda lane: lane.value))
+        self.bounds = [
+            (low.value + high.value) / 2 for low, high in zip(self.lanes, self.lanes[1:])
+        ]
+        # A position exactly between two lanes goes to the one defined first
+        self.ties = [
+            i if definition_order.index(low) < definition_order.index(high) else i + 1
+            for i, (low, high) in enumerate(zip(self.lanes, self.lanes[1:]))
+        ]
+        self.by_name = {lane.name: lane for lane in definition_order}
+        self._arrays = None
+
+    def arrays(self, numpy: ModuleType) -> tuple:
+        # The tables as NumPy arrays. The bounds are padded with inf,
+        # so that every index returned by searchsorted is valid
+        if self._arrays is None:
+            self._arrays = (
+                numpy.array(self.lanes, dtype=object),
+                numpy.array(self.bounds + [numpy.inf]),
+                numpy.array(self.ties + [len(self.lanes) - 1], dtype=numpy.intp)
+            )
+        return self._arrays
+
+    def index(self, position: float) -> int:
+        i = bisect_left(self.bounds, position)
+        if i < len(self.bounds) and self.bounds[i] == position:
+            return self.ties[i]
+        return i
+
+
 class BaseLane(float, Enum):
     """
     The base class for all Lanes.
@@ -24,13 +76,53 @@ class BaseLane(float, Enum):
         :class:`RuntimeError`
             The this method is being called with does not have any specified lanes.
         """
+        table = cls._lane_table
         try:
-            return min(cls, key=lambda v: abs(position - v.value))
-        except ValueError as e:
+            return table.lanes[table.index(position)]
+        except IndexError as e:
             raise RuntimeError(f"Subclass {cls.__name__} of BaseLane has no lanes") from e
             pass
         pass
 
+    @classmethod
+    def get_closest_lanes(cls, positions: Iterable[float]) -> Sequence[Self]:
+        """
+        Returns the closest lane for every position in positions.
+        This is equivalent to calling :meth:`BaseLane.get_closest_lane` for each position,
+        but classifies the whole collection at once.
+
+        :param positions: :class:`Iterable[float]`
+            The position offsets from the centre of the road in millimetres.
+
+        Returns
+        -------
+        :class:`Sequence[BaseLane]`
+            The closest lanes. When NumPy is installed, this is a :class:`numpy.ndarray`
+            of lanes. Otherwise it is a :class:`list`.
+
+        Raises
+        ------
+        :class:`RuntimeError`
+            The this method is being called with does not have any specified lanes.
+        """
+        table = cls._lane_table
+        if not table.lanes:
+            raise RuntimeError(f"Subclass {cls.__name__} of BaseLane has no lanes")
+
+        numpy = _numpy()
+        if numpy is None:
+            return [table.lanes[table.index(position)] for position in positions]
+
+        lanes, bounds, ties = table.arrays(numpy)
+        if not isinstance(positions, Sequence | numpy.ndarray):
+            positions = list(positions)
+        positions = numpy.asarray(positions, dtype=float)
+        indices = numpy.searchsorted(bounds, positions, side="left")
+        indices[numpy.isnan(positions)] = 0
+        # searchsorted sorts NaN past the end. bisect_left, and so get_closest_lane, returns 0
+        indices = numpy.where(bounds[indices] == positions, ties[indices], indices)
+        return lanes[indices]
+
     @classmethod
     def by_name(cls, name: str):
         """
@@ -45,17 +137,24 @@ class BaseLane(float, Enum):
             The name passed does not refer to an existing lane
         """
         try:
-            return next(filter(lambda v: v.name == name, cls))
-        except StopIteration as e:
+            return cls._lane_table.by_name[name]
+        except KeyError as e:
             raise ValueError("Lane does not exist for the chosen type") from e
             pass
         pass
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._lane_table = _LaneTable(cls)
+
     def __str__(self) -> str:
         return self.name
     pass
 
 
+BaseLane._lane_table = _LaneTable(())
+
+
 class Lane3(BaseLane):
     """
     A lane class that supports 3 different lanes.
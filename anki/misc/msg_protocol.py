@@ -1,7 +1,64 @@
+import struct
+from functools import partial
+from typing import Callable
+
 from . import const
 from ..errors import MalformedPacketWarning
 
 
+def _collect_msg_types(*namespaces: type) -> frozenset[int]:
+    # Gathers the opcodes of the message namespaces in const
+    return frozenset(
+        value
+        for namespace in namespaces
+        for name, value in vars(namespace).items()
+        if not name.startswith("_") and isinstance(value, int)
+    )
+
+
+CONTROLLER_MSG_TYPES = _collect_msg_types(const.ControllerMsg)
+"""All opcodes the controller may send to a vehicle"""
+VEHICLE_MSG_TYPES = _collect_msg_types(const.VehicleMsg)
+"""All opcodes a vehicle may send to the controller"""
+MSG_TYPES = CONTROLLER_MSG_TYPES | VEHICLE_MSG_TYPES
+"""All opcodes known to this library"""
+
+
+PAYLOAD_OFFSET = 2
+"""The index at which the payload of a packet begins (after size byte and message type)"""
+
+
+class PacketCodec:
+    """
+    A precompiled packet layout for a single message type.
+    The size byte and the message type are bound to a preallocated :class:`struct.Struct`
+    once, so :meth:`PacketCodec.pack` only has to fill in the payload fields
+    and assembles the whole packet in a single C-level call.
+
+    :param msg_type: :class:`int`
+        The message type. Has to be in :const:`MSG_TYPES`
+    :param payload_format: :class:`str`
+        A little endian :mod:`struct` format string describing the payload
+    """
+    __slots__ = ("msg_type", "struct", "size", "pack")
+
+    def __init__(self, msg_type: int, payload_format: str=""):
+        if msg_type not in MSG_TYPES:
+            raise ValueError(
+                f"msgType has to be a type specified in const.ControllerMsg or \
+                const.VehicleMsg. You entered {msg_type!r}"
+            )
+        self.msg_type = msg_type
+        self.struct = struct.Struct("<BB" + payload_format.lstrip("<"))
+        self.size = self.struct.size - 1
+        # The size byte does not count itself
+        self.pack: Callable[..., bytes] = partial(self.struct.pack, self.size, self.msg_type)
+        """Assembles a full packet from the payload fields"""
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.msg_type:#04x}, {self.struct.format!r})"
+
+
 def assemble_packet(
         msgType: int|bytes|bytearray,
         payload: str|bytes|bytearray
@@ -15,10 +72,7 @@ def assemble_packet(
             f"Could not cast msgType to bytes. \
             Should be either bytes or bytearray, was {type(msgType)}"
         ) from e
-    if not (
-        msgType_bytes[0] in const.ControllerMsg.__dict__.values()
-        or msgType_bytes[0] in const.VehicleMsg.__dict__.values()
-    ):
+    if msgType_bytes[0] not in MSG_TYPES:
         # Only allow for msgTypes specified in const.ControllerMsg or const.VehicleMsg
         raise ValueError(
             f"msgType has to be a type specified in const.ControllerMsg or \
@@ -39,41 +93,57 @@ def assemble_packet(
             bytes or bytesarray, was {type(payload)}"
         ) from e
 
-    size: int = len(msgType) + len(payload_bytes)
-    byteSize = size.to_bytes(1, "little", signed=False)
+    size: int = len(msgType_bytes) + len(payload_bytes)
 
-    return byteSize + msgType + payload_bytes
+    return b"".join((size.to_bytes(1, "little", signed=False), msgType_bytes, payload_bytes))
     pass
 
 
-def disassemble_packet(
-        packet: bytes|bytearray
-) -> tuple[int, bytes]:
+def check_packet(
+        packet: bytes|bytearray|memoryview
+) -> int:
+    """
+    Validates the framing of a received packet and returns its message type.
+    The packet is not copied. Its payload starts at :const:`PAYLOAD_OFFSET`
+    and can be decoded in place with :meth:`struct.Struct.unpack_from`.
+
+    :param packet: :class:`bytes`
+        The raw packet, including the size byte
+
+    Raises
+    ------
+    :class:`MalformedPacketWarning`
+        The packet size or payload size is invalid
+    """
     try:
-        bytes_packet = bytes(packet)
+        actualSize = len(packet) - 1
     except TypeError as e:
         raise TypeError(
-            f"Parameter packet could not be cast to bytes, \
+            f"Parameter packet has to be a bytes-like object, \
             should be either bytes or bytesarray, was {type(packet)}"
         ) from e
+    if actualSize < 1:
+        raise MalformedPacketWarning("Packet does not contain a message type")
 
-    packageSize = bytes_packet[0]  # Single indexes of bytes are ints
-    actualSize = len(bytes_packet[1:])
+    packageSize = packet[0]
     # Security check
     if actualSize != packageSize:
         raise MalformedPacketWarning(
             f"Package Size did not match the actual \
             size of the packet ({packageSize} != {actualSize})"
         )
-        pass
-
-    msgType = bytes_packet[1]
-    payload = bytes_packet[2:]
-    if len(payload) > const.MAX_PACKET_PAYLOAD_SIZE:
+    if actualSize - 1 > const.MAX_PACKET_PAYLOAD_SIZE:
         raise MalformedPacketWarning(
-            f"Payload is too large. Has to be <= {const.MAX_PACKET_PAYLOAD_SIZE}, is {len(payload)}"
+            f"Payload is too large. Has to be <= {const.MAX_PACKET_PAYLOAD_SIZE}, \
+            is {actualSize - 1}"
         )
-        pass
 
-    return msgType, payload
+    return packet[1]
+
+
+def disassemble_packet(
+        packet: bytes|bytearray
+) -> tuple[int, bytes]:
+    msgType = check_packet(packet)
+    return msgType, bytes(packet[PAYLOAD_OFFSET:])
     pass
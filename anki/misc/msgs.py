@@ -1,40 +1,51 @@
-from .msg_protocol import assemble_packet
+from .msg_protocol import assemble_packet, PacketCodec
 from . import const
 import struct
-from typing import Literal
+from functools import lru_cache
+from typing import Callable, Literal, NamedTuple, Self, Union
 
 
-def set_speed_pkg(speed: int, accel: int=500):
-    speedBytes = speed.to_bytes(2, "little", signed=True)
-    accelBytes = accel.to_bytes(2, "little", signed=True)
+PACKET_CACHE_SIZE = 128
+"""
+The amount of finished packets kept per cached builder.
+Control loops tend to resend the same few speed and lane commands,
+so :func:`set_speed_pkg` and :func:`change_lane_pkg` return them from an LRU cache.
+"""
 
-    return assemble_packet(
-        const.ControllerMsg.SET_SPEED,
-        speedBytes + accelBytes
-    )
+_SET_SPEED = PacketCodec(const.ControllerMsg.SET_SPEED, "<hh")
+_SET_SDK = PacketCodec(const.ControllerMsg.SET_SDK, "<BB")
+_TURN_180 = PacketCodec(const.ControllerMsg.TURN_180, "<BB")
+_CHANGE_LANE = PacketCodec(const.ControllerMsg.CHANGE_LANE, "<HHfBB")
+_SET_LIGHTS = PacketCodec(const.ControllerMsg.SET_LIGHTS, "<B")
+_LIGHT_PATTERN = PacketCodec(const.ControllerMsg.LIGHT_PATTERN, "<16B")
+_PING_PACKET = PacketCodec(const.ControllerMsg.PING).pack()
+# The ping packet has no variable fields, so it only needs to be built once
+
+# The decoders accept an offset so that they can unpack a whole packet in place
+# (at msg_protocol.PAYLOAD_OFFSET) without copying out the payload first
+_TRACK_UPDATE = struct.Struct("<BBfHB")
+_TRACK_CHANGE = struct.Struct("<bbfBBHbBBBBB")
+_CHARGER_INFO = struct.Struct("<????")
+_VERSION_RESP = struct.Struct("<H")
+
+
+@lru_cache(maxsize=PACKET_CACHE_SIZE, typed=True)
+def set_speed_pkg(speed: int, accel: int=500):
+    return _SET_SPEED.pack(speed, accel)
     pass
 
 
 def set_sdk_pkg(state: bool, flags: int=0):
-    state_bytes = b"\xff" if state else b"\x00"
-    flag_bytes = flags.to_bytes(1, "little", signed=False)
-
-    return assemble_packet(
-        const.ControllerMsg.SET_SDK,
-        state_bytes + flag_bytes
-    )
+    return _SET_SDK.pack(0xff if state else 0x00, flags)
     pass
 
 
 def turn_180_pkg(type: int, trigger: int):
-    return assemble_packet(
-        const.ControllerMsg.TURN_180,
-        type.to_bytes(1, "little", signed=False)
-        + trigger.to_bytes(1, "little", signed=False)
-    )
+    return _TURN_180.pack(type, trigger)
     pass
 
 
+@lru_cache(maxsize=PACKET_CACHE_SIZE, typed=True)
 def change_lane_pkg(
         roadCenterOffset: float,
         horizontalSpeed: int=300,
@@ -42,60 +53,48 @@ def change_lane_pkg(
         _hopIntent: int=0x0,
         _tag: int=0x0
 ):
-    return assemble_packet(
-        const.ControllerMsg.CHANGE_LANE,
-        struct.pack(
-            "<HHfBB",
-            horizontalSpeed,
-            horizontalAcceleration,
-            roadCenterOffset,
-            _hopIntent,
-            _tag
-        )
+    return _CHANGE_LANE.pack(
+        horizontalSpeed,
+        horizontalAcceleration,
+        roadCenterOffset,
+        _hopIntent,
+        _tag
     )
     pass
 
 
 def set_light_pkg(light: int):
-    return assemble_packet(
-        const.ControllerMsg.SET_LIGHTS,
-        light.to_bytes(1, "little", signed=False)
-    )
+    return _SET_LIGHTS.pack(light)
     pass
 
 
 def light_pattern_pkg(r: int, g: int, b: int):
-    return assemble_packet(
-        const.ControllerMsg.LIGHT_PATTERN,
-        struct.pack(
-            "<BBBBBBBBBBBBBBBB",
-            3, 0, 0,
-            r, r,
-            0, 3, 0,
-            g, g,
-            0, 2, 0,
-            b, b,
-            0
-        )
+    return _LIGHT_PATTERN.pack(
+        3, 0, 0,
+        r, r,
+        0, 3, 0,
+        g, g,
+        0, 2, 0,
+        b, b,
+        0
     )
     pass
 
 def ping_pkg():
-    return assemble_packet(
-        const.ControllerMsg.PING,
-        b""
-    )
+    return _PING_PACKET
 
 
 def disassemble_track_update(
-        payload: bytes
+        payload: bytes,
+        offset: int=0
 ) -> tuple[int, int, float, int, int]:
-    return struct.unpack_from("<BBfHB", payload)  # type: ignore
+    return _TRACK_UPDATE.unpack_from(payload, offset)  # type: ignore
     pass
 
 
 def disassemble_track_change(
-        payload: bytes
+        payload: bytes,
+        offset: int=0
 ) -> tuple[
         Literal[0],
         Literal[0],
@@ -147,11 +146,213 @@ def disassemble_track_change(
         See above
     """
 
-    return struct.unpack_from("<bbfBBHbBBBBB", payload)  # type: ignore
+    return _TRACK_CHANGE.unpack_from(payload, offset)  # type: ignore
     pass
 
 
 def disassemble_charger_info(
-        payload: bytes
+        payload: bytes,
+        offset: int=0
 ) -> tuple[bool, bool, bool, bool]:
-    return struct.unpack_from('<????', payload)  # type: ignore
+    return _CHARGER_INFO.unpack_from(payload, offset)  # type: ignore
+
+
+# Typed messages
+# These are named tuples, so they are immutable, carry no instance dict
+# and are built straight from the result of Struct.unpack_from.
+class TrackPieceUpdate(NamedTuple):
+    """A decoded TRACK_PIECE_UPDATE message. See :func:`disassemble_track_update`"""
+    loc: int
+    piece: int
+    road_offset: float
+    speed: int
+    clockwise: int
+
+    @classmethod
+    def unpack(cls, buffer: bytes, offset: int=0) -> Self:
+        return cls._make(_TRACK_UPDATE.unpack_from(buffer, offset))
+
+
+class _LazyField:
+    # A read-only field of a lazily decoded message.
+    # The value is unpacked from the raw buffer on first access
+    # and then cached in a slot of the message.
+    __slots__ = ("struct", "offset", "bit", "cache")
+
+    def __init__(self, fmt: str, offset: int, bit: int):
+        self.struct = struct.Struct("<" + fmt)
+        self.offset = offset
+        self.bit = bit
+
+    def __set_name__(self, owner: type, name: str):
+        self.cache = getattr(owner, "_" + name)
+        # The member descriptor of the slot holding the cached value
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if instance._decoded & self.bit:
+            return self.cache.__get__(instance)
+
+        value = self.struct.unpack_from(instance._buffer, instance._offset + self.offset)[0]
+        self.cache.__set__(instance, value)
+        instance._decoded |= self.bit
+        return value
+
+    def __set__(self, instance, value):
+        raise AttributeError("Message fields are read-only")
+
+
+def _add_lazy_fields(cls: type, fmt: str, names: tuple[str, ...]):
+    # Adds a lazy field to cls for every entry in a struct format (without byte order)
+    offset = 0
+    for bit, (name, code) in enumerate(zip(names, fmt, strict=True)):
+        field = _LazyField(code, offset, 1 << bit)
+        setattr(cls, name, field)
+        field.__set_name__(cls, name)
+        offset += struct.calcsize("<" + code)
+
+
+_TRACK_CHANGE_FIELDS = (
+    "road_piece",
+    "prev_road_piece",
+    "road_offset",
+    "last_received_lane_change_id",
+    "last_executed_lane_change_id",
+    "last_desired_lane_change_speed",
+    "ave_follow_line_drift_pixels",
+    "had_lane_change",
+    "uphill_counter",
+    "downhill_counter",
+    "left_wheel_dist",
+    "right_wheel_dist",
+)
+
+
+class TrackPieceChange:
+    """
+    A lazily decoded TRACK_PIECE_CHANGE message. See :func:`disassemble_track_change`
+
+    The message keeps a reference to the received buffer and only unpacks a field
+    when it is first accessed. The result is cached, so repeated reads are cheap.
+    Iterating or indexing the message decodes all fields at once,
+    in the same order :func:`disassemble_track_change` returns them.
+    """
+    __slots__ = (
+        "_buffer",
+        "_offset",
+        "_decoded",
+        *("_" + name for name in _TRACK_CHANGE_FIELDS)
+    )
+
+    def __init__(self, buffer: bytes, offset: int=0):
+        if len(buffer) - offset < _TRACK_CHANGE.size:
+            raise struct.error(
+                f"unpack_from requires a buffer of at least {_TRACK_CHANGE.size + offset} \
+                bytes for unpacking {_TRACK_CHANGE.size} bytes at offset {offset}"
+            )
+        self._buffer = buffer
+        self._offset = offset
+        self._decoded = 0
+
+    @classmethod
+    def unpack(cls, buffer: bytes, offset: int=0) -> Self:
+        return cls(buffer, offset)
+
+    def astuple(self) -> tuple:
+        """Decodes all fields and returns them as a tuple"""
+        return _TRACK_CHANGE.unpack_from(self._buffer, self._offset)
+
+    def __iter__(self):
+        return iter(self.astuple())
+
+    def __getitem__(self, index):
+        return self.astuple()[index]
+
+    def __len__(self):
+        return len(_TRACK_CHANGE_FIELDS)
+
+    def __eq__(self, other):
+        if not isinstance(other, TrackPieceChange):
+            return NotImplemented
+        return self.astuple() == other.astuple()
+
+    def __hash__(self):
+        return hash(self.astuple())
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{name}={value!r}" for name, value in zip(_TRACK_CHANGE_FIELDS, self.astuple())
+        )
+        return f"{self.__class__.__name__}({fields})"
+
+
+_add_lazy_fields(TrackPieceChange, _TRACK_CHANGE.format[1:], _TRACK_CHANGE_FIELDS)
+
+
+class ChargerInfo(NamedTuple):
+    """A decoded CHARGER_INFO message. See :func:`disassemble_charger_info`"""
+    unknown: bool
+    on_charger: bool
+    charging: bool
+    full: bool
+
+    @classmethod
+    def unpack(cls, buffer: bytes, offset: int=0) -> Self:
+        return cls._make(_CHARGER_INFO.unpack_from(buffer, offset))
+
+
+class VersionResponse(NamedTuple):
+    """A decoded VERSION_RESP message"""
+    version: int
+
+    @classmethod
+    def unpack(cls, buffer: bytes, offset: int=0) -> Self:
+        return cls._make(_VERSION_RESP.unpack_from(buffer, offset))
+
+
+class Pong(NamedTuple):
+    """A PONG message. It does not carry any data"""
+
+    @classmethod
+    def unpack(cls, buffer: bytes, offset: int=0) -> Self:
+        return _PONG
+
+
+class Delocalized(NamedTuple):
+    """A DELOCALIZED message. It does not carry any data"""
+
+    @classmethod
+    def unpack(cls, buffer: bytes, offset: int=0) -> Self:
+        return _DELOCALIZED
+
+
+_PONG = Pong()
+_DELOCALIZED = Delocalized()
+# Messages without data are singletons
+
+Message = Union[
+    TrackPieceUpdate,
+    TrackPieceChange,
+    ChargerInfo,
+    VersionResponse,
+    Pong,
+    Delocalized
+]
+Decoder = Callable[[bytes, int], object]
+
+
+def decode_raw(buffer: bytes, offset: int=0) -> bytes:
+    """The fallback decoder for messages without a known layout. Returns the raw payload"""
+    return bytes(buffer[offset:])
+
+
+DECODERS: dict[int, Decoder] = {
+    const.VehicleMsg.TRACK_PIECE_UPDATE: TrackPieceUpdate.unpack,
+    const.VehicleMsg.TRACK_PIECE_CHANGE: TrackPieceChange,
+    const.VehicleMsg.CHARGER_INFO: ChargerInfo.unpack,
+    const.VehicleMsg.VERSION_RESP: VersionResponse.unpack,
+    const.VehicleMsg.PONG: Pong.unpack,
+    const.VehicleMsg.DELOCALIZED: Delocalized.unpack,
+}
+"""Maps every known vehicle message type to the decoder for its payload"""
@@ -29,10 +29,27 @@ class TrackPiece():
         piece_val: int,
         clockwise: int
     ) -> "TrackPiece":
-        return TrackPiece(
-            loc,
-            TrackPieceType.try_enum(piece_val),
-            clockwise > 30
-        )
+        """
+        Returns the track piece for the values of a TRACK_PIECE_UPDATE.
+        Track pieces are interned, so equal inputs return the identical instance.
+        """
+        is_clockwise = clockwise > 30
+        interned = _INTERNED[is_clockwise]
+        by_loc = interned.get(piece_val)
+        if by_loc is not None:
+            piece = by_loc.get(loc)
+            if piece is not None:
+                return piece
+
+        piece = TrackPiece(loc, TrackPieceType.try_enum(piece_val), is_clockwise)
+        # Only valid pieces get interned, as try_enum raises otherwise
+        interned.setdefault(piece_val, {})[loc] = piece
+        return piece
         pass
     pass
+
+
+_INTERNED: tuple[dict[int, dict[int, TrackPiece]], ...] = ({}, {})
+# Interned track pieces by clockwise, piece value and loc.
+# Nested dicts keep lookups free of key allocations.
+# This stays small, since a track only has a handful of different pieces.
@@ -2,15 +2,18 @@ from time import monotonic
 import asyncio
 import logging
 
-from ..control.vehicle import Vehicle
 from .references import Reference
 
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from ..control.vehicle import Vehicle
+
 __all__ = (
     "recover_delocalization",
 )
 
 async def _handle_delocalization_task(
-        v: Vehicle,
+        v: "Vehicle",
         tracker: Reference[float],
         recovery_speed: int|None
     ):
@@ -25,7 +28,7 @@ async def _handle_delocalization_task(
     await v.set_speed(recovery_speed)
     logging.debug("Recovery successful. Vehicle restarted")
 
-def recover_delocalization(vehicle: Vehicle, recovery_speed: int|None=None):
+def recover_delocalization(vehicle: "Vehicle", recovery_speed: int|None=None):
     """
     Generates and registers a callback that 
     automatically handles a delocalized vehicle.
@@ -0,0 +1,83 @@
+"""
+Runs the benchmark suite.
+
+Run from the repository root with::
+
+    python -m benchmarks                          # print a table
+    python -m benchmarks --json current.json      # write the JSON report
+    python -m benchmarks --compare baseline.json  # exit with 1 on regressions
+"""
+import argparse
+import asyncio
+import json
+import sys
+import warnings
+
+from . import cases, harness
+
+
+async def run(pattern: str|None, options: dict) -> dict[str, harness.Result]:
+    results = {}
+
+    def run_cases(suite: dict[str, cases.Benchmark]):
+        for name, func in suite.items():
+            if pattern is None or pattern in name:
+                results[name] = harness.measure(func, **options)
+
+    run_cases(cases.encode_cases())
+    run_cases(cases.decode_cases())
+    run_cases(cases.lane_cases())
+    run_cases(cases.fleet_cases())
+    run_cases(cases.history_cases())
+
+    vehicle = cases.stub_vehicle()
+    with warnings.catch_warnings():
+        # Random piece values are not always valid track pieces
+        warnings.simplefilter("ignore")
+        for name, func in cases.notify_cases(vehicle).items():
+            run_cases({name: func})
+            await cases.drain()
+
+    return results
+
+
+def main(argv: list[str]|None=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks containing this string")
+    parser.add_argument("--json", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="compare against this JSON report")
+    parser.add_argument(
+        "--threshold", type=float, default=0.15,
+        help="relative slowdown reported as a regression (default: %(default)s)"
+    )
+    parser.add_argument("--quick", action="store_true", help="fewer and shorter repeats")
+    args = parser.parse_args(argv)
+
+    options = {"repeat": 2, "min_time": 0.01} if args.quick else {}
+    results = asyncio.run(run(args.pattern, options))
+
+    for name, result in sorted(results.items()):
+        print(
+            f"{name:<48} {result.ns_per_op:9.0f} ns/op {result.ops_per_sec:12.0f} ops/s "
+            f"{result.alloc_blocks_per_op:6.2f} allocs/op"
+        )
+    if args.json:
+        harness.dump(results, args.json)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if args.pattern is not None:
+            baseline["benchmarks"] = {
+                name: entry for name, entry in baseline["benchmarks"].items()
+                if args.pattern in name
+            }
+        regressions = harness.compare(baseline, harness.report(results), args.threshold)
+        for regression in regressions:
+            print("REGRESSION", regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+The benchmarks of the suite.
+
+Packets are generated from a fixed seed, so every run measures the same data.
+"""
+import asyncio
+import itertools
+import random
+import struct
+from typing import Callable
+
+from anki.misc import const, msgs, msg_protocol
+from anki.misc.track_pieces import TrackPiece
+from anki.misc.lanes import Lane4
+from anki.control.vehicle import Vehicle, BatteryState
+from anki.control.ingress import NotificationIngress
+from anki.control.snapshot import FleetTable
+from anki.control.history import TelemetryHistory
+
+Benchmark = Callable[[], object]
+
+SEED = 0x29
+MIX_SIZE = 1000
+MIX_WEIGHTS = {
+    const.VehicleMsg.TRACK_PIECE_UPDATE: 75,
+    const.VehicleMsg.TRACK_PIECE_CHANGE: 20,
+    const.VehicleMsg.CHARGER_INFO: 2,
+    const.VehicleMsg.PONG: 2,
+    const.VehicleMsg.DELOCALIZED: 1,
+}
+"""Relative frequency of the message types in the notification mix of a driving vehicle"""
+
+BUILDER_ARGS: dict[str, tuple] = {
+    "set_speed_pkg": (500, 500),
+    "set_sdk_pkg": (True, 1),
+    "turn_180_pkg": (3, 0),
+    "change_lane_pkg": (30.0, 300, 300),
+    "set_light_pkg": (1,),
+    "light_pattern_pkg": (1, 2, 3),
+    "ping_pkg": (),
+}
+"""Arguments for every packet builder in anki.misc.msgs"""
+
+FLEET_SIZE = 20
+"""The number of vehicles in the fleet benchmarks"""
+
+_PIECES = (33, 34, 36, 39, 17, 18, 20, 10)
+
+
+def _packet(msg_type: int, payload: bytes=b"") -> bytearray:
+    # bleak hands notifications to the handler as bytearrays
+    return bytearray(msg_protocol.assemble_packet(msg_type, payload))
+
+
+def track_update(rng: random.Random) -> bytearray:
+    """A TRACK_PIECE_UPDATE packet with random content"""
+    return _packet(const.VehicleMsg.TRACK_PIECE_UPDATE, struct.pack(
+        "<BBfHB",
+        rng.randrange(50),
+        rng.choice(_PIECES),
+        rng.uniform(-68, 68),
+        rng.randrange(200, 1000),
+        rng.choice((0x47, 0x07))
+    ))
+
+
+def track_change(rng: random.Random) -> bytearray:
+    """A TRACK_PIECE_CHANGE packet with random content"""
+    return _packet(const.VehicleMsg.TRACK_PIECE_CHANGE, struct.pack(
+        "<bbfBBHbBBBBB",
+        0, 0,
+        rng.uniform(-68, 68),
+        rng.randrange(256), rng.randrange(256),
+        rng.randrange(300, 1000),
+        rng.randrange(-20, 20),
+        rng.randrange(2),
+        rng.randrange(4), rng.randrange(4),
+        rng.randrange(256), rng.randrange(256)
+    ))
+
+
+def charger_info(rng: random.Random) -> bytearray:
+    """A CHARGER_INFO packet with random content"""
+    return _packet(
+        const.VehicleMsg.CHARGER_INFO,
+        bytes(rng.randrange(2) for _ in range(4))
+    )
+
+
+_GENERATORS = {
+    const.VehicleMsg.TRACK_PIECE_UPDATE: track_update,
+    const.VehicleMsg.TRACK_PIECE_CHANGE: track_change,
+    const.VehicleMsg.CHARGER_INFO: charger_info,
+    const.VehicleMsg.PONG: lambda rng: _packet(const.VehicleMsg.PONG),
+    const.VehicleMsg.DELOCALIZED: lambda rng: _packet(const.VehicleMsg.DELOCALIZED),
+}
+
+
+def packet_mix(size: int=MIX_SIZE, seed: int=SEED) -> list[bytearray]:
+    """A reproducible list of notifications, distributed according to MIX_WEIGHTS"""
+    rng = random.Random(seed)
+    msg_types = rng.choices(list(MIX_WEIGHTS), weights=list(MIX_WEIGHTS.values()), k=size)
+    return [_GENERATORS[msg_type](rng) for msg_type in msg_types]
+
+
+def _cycle(func: Callable, packets: list) -> Benchmark:
+    # Calls func with the next packet of packets on every call
+    packet = itertools.cycle(packets).__next__
+    return lambda: func(packet())
+
+
+def encode_cases() -> dict[str, Benchmark]:
+    """Encoding benchmarks for every packet builder"""
+    builders = sorted(name for name in vars(msgs) if name.endswith("_pkg"))
+    missing = set(builders) - BUILDER_ARGS.keys()
+    if missing:
+        raise LookupError(f"No benchmark arguments for the builders {sorted(missing)}")
+
+    cases = {}
+    for name in builders:
+        builder = getattr(msgs, name)
+        args = BUILDER_ARGS[name]
+        cases[f"encode.{name}"] = lambda builder=builder, args=args: builder(*args)
+        if hasattr(builder, "__wrapped__"):
+            # Cached builders are measured on a cache miss as well
+            cases[f"encode.{name}.uncached"] = (
+                lambda builder=builder.__wrapped__, args=args: builder(*args)
+            )
+    return cases
+
+
+def _read_hill_counters(packet: bytearray) -> tuple[int, int]:
+    change = msgs.TrackPieceChange(packet, msg_protocol.PAYLOAD_OFFSET)
+    return change.uphill_counter, change.downhill_counter
+
+
+def decode_cases() -> dict[str, Benchmark]:
+    """Decoding benchmarks for the framing and every payload decoder"""
+    rng = random.Random(SEED)
+    mix = packet_mix()
+    updates = [track_update(rng) for _ in range(MIX_SIZE)]
+    changes = [track_change(rng) for _ in range(MIX_SIZE)]
+    chargers = [charger_info(rng) for _ in range(MIX_SIZE)]
+    update_payloads = [bytes(p[msg_protocol.PAYLOAD_OFFSET:]) for p in updates]
+    change_payloads = [bytes(p[msg_protocol.PAYLOAD_OFFSET:]) for p in changes]
+    charger_payloads = [bytes(p[msg_protocol.PAYLOAD_OFFSET:]) for p in chargers]
+    offset = msg_protocol.PAYLOAD_OFFSET
+
+    cases = {
+        "decode.disassemble_packet.mix": _cycle(msg_protocol.disassemble_packet, mix),
+        "decode.check_packet.mix": _cycle(msg_protocol.check_packet, mix),
+        "decode.disassemble_track_update": _cycle(msgs.disassemble_track_update, update_payloads),
+        "decode.disassemble_track_change": _cycle(msgs.disassemble_track_change, change_payloads),
+        "decode.disassemble_charger_info": _cycle(msgs.disassemble_charger_info, charger_payloads),
+        "decode.TrackPieceUpdate": _cycle(
+            lambda packet: msgs.TrackPieceUpdate.unpack(packet, offset), updates
+        ),
+        "decode.TrackPieceChange": _cycle(
+            lambda packet: msgs.TrackPieceChange(packet, offset), changes
+        ),
+        "decode.TrackPieceChange.uphill_downhill": _cycle(_read_hill_counters, changes),
+        "decode.ChargerInfo": _cycle(
+            lambda packet: msgs.ChargerInfo.unpack(packet, offset), chargers
+        ),
+    }
+
+    try:
+        from anki.misc import batch
+    except ImportError:
+        pass
+    else:
+        recording = b"".join(mix)
+        cases[f"decode.batch.decode_packets.{MIX_SIZE}"] = lambda: batch.decode_packets(recording)
+
+    return cases
+
+
+def lane_cases() -> dict[str, Benchmark]:
+    """Lane classification of single offsets and of a whole recording"""
+    rng = random.Random(SEED)
+    offsets = [rng.uniform(-68, 68) for _ in range(MIX_SIZE)]
+    return {
+        "lanes.get_closest_lane": _cycle(Lane4.get_closest_lane, offsets),
+        f"lanes.get_closest_lanes.{MIX_SIZE}": lambda: Lane4.get_closest_lanes(offsets),
+    }
+
+
+class _Row:
+    # Stands in for a vehicle owning a row of the fleet table
+    _fleet_row = -1
+
+
+def fleet_cases() -> dict[str, Benchmark]:
+    """Snapshots of a fleet table, with and without a change since the last snapshot"""
+    table = FleetTable()
+    for vehicle_id in range(FLEET_SIZE):
+        table.add(_Row(), vehicle_id)
+    rows = itertools.cycle(range(FLEET_SIZE)).__next__
+
+    def write_and_snapshot():
+        table.write(rows(), 3, 12.5, 500, 1)
+        return table.snapshot()
+
+    return {
+        f"fleet.snapshot.{FLEET_SIZE}": write_and_snapshot,
+        f"fleet.snapshot.{FLEET_SIZE}.unchanged": table.snapshot,
+    }
+
+
+def history_cases() -> dict[str, Benchmark]:
+    """Recording into and querying a full telemetry history"""
+    history = TelemetryHistory()
+    for timestamp in range(history.capacity):
+        history.record(timestamp, 36, 3, 12.5, 500, 4)
+    middle = history.capacity // 2
+    return {
+        "history.record": lambda: history.record(history.capacity, 36, 3, 12.5, 500, 4),
+        "history.last.100": lambda: history.last(100),
+        "history.since": lambda: history.since(middle),
+    }
+
+
+class StubClient:
+    """Stands in for a BleakClient. The notify handler never touches the client"""
+
+
+def stub_vehicle() -> Vehicle:
+    """
+    A vehicle on a scanned and aligned map with one no-op watcher per event.
+    Has to be created inside a running event loop.
+    """
+    vehicle = Vehicle(
+        1024,
+        None,  # type: ignore
+        StubClient(),  # type: ignore
+        battery=BatteryState.from_int(1 << const.VehicleBattery.FULL_BATTERY)
+    )
+    vehicle._map = [TrackPiece.from_raw(loc, piece, 0x47) for loc, piece in enumerate(_PIECES)]
+    vehicle._position = 0
+
+    def noop(*args):
+        pass
+    vehicle.track_piece_change(noop)
+    vehicle.pong(noop)
+    vehicle.delocalized(noop)
+    vehicle.battery_change(noop)
+    return vehicle
+
+
+def notify_cases(vehicle: Vehicle) -> dict[str, Benchmark]:
+    """
+    Benchmarks for Vehicle._notify_handler.
+    Have to be run inside the event loop vehicle was created in.
+    """
+    rng = random.Random(SEED)
+    handler = vehicle._notify_handler
+    notify = lambda packet: handler(None, packet)
+    mix = packet_mix()
+    ingress = NotificationIngress(max_batch=MIX_SIZE)
+    sink = vehicle._receive
+
+    def ingress_batch():
+        # Queues a whole mix and processes it as a single batch
+        for packet in mix:
+            ingress.push(sink, packet)
+        ingress._drain()
+
+    return {
+        "notify.track_update": _cycle(notify, [track_update(rng) for _ in range(MIX_SIZE)]),
+        "notify.track_change": _cycle(notify, [track_change(rng) for _ in range(MIX_SIZE)]),
+        "notify.mix": _cycle(notify, mix),
+        f"notify.ingress.batch.{MIX_SIZE}": ingress_batch,
+    }
+
+
+async def drain():
+    """Runs the callbacks the notify handler scheduled"""
+    for _ in range(3):
+        await asyncio.sleep(0)
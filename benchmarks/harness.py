@@ -0,0 +1,162 @@
+"""
+Measurement helpers for the benchmark suite.
+
+Every benchmark is a zero-argument callable performing a single operation.
+Throughput is the best of several timed repeats, allocations are counted
+with :mod:`tracemalloc` in a separate, untimed run.
+"""
+import dataclasses
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+SCHEMA_VERSION = 1
+"""Bumped whenever the layout of the JSON report changes"""
+ALLOCATION_TOLERANCE = 0.5
+"""Additional allocations per operation that are not yet considered a regression"""
+
+_TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class Result:
+    """The measurements of a single benchmark"""
+    ns_per_op: float
+    ops_per_sec: float
+    alloc_blocks_per_op: float
+    alloc_bytes_per_op: float
+
+
+def _time(func: Callable[[], object], number: int) -> float:
+    # Returns the time for number calls of func in nanoseconds
+    loop = range(number)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        for _ in loop:
+            func()
+        return time.perf_counter_ns() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _calibrate(func: Callable[[], object], min_time_ns: int) -> int:
+    # Finds a call count that takes at least min_time_ns
+    number = 1
+    while True:
+        if _time(func, number) >= min_time_ns:
+            return number
+        number *= 2
+
+
+def _allocations(func: Callable[[], object], number: int) -> tuple[float, float]:
+    # Counts the memory blocks and bytes still alive after number calls, per call.
+    # Return values are kept, so objects produced by an operation are counted
+    # even if the caller would drop them right away.
+    results: list[object] = [None] * number
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+        for i in range(number):
+            results[i] = func()
+        after = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    del results
+    return blocks / number, size / number
+
+
+def measure(
+        func: Callable[[], object],
+        *,
+        repeat: int=5,
+        min_time: float=0.05,
+        alloc_number: int=1000
+) -> Result:
+    """
+    Measures a single operation.
+
+    :param func: :class:`Callable[[], object]`
+        Performs the operation once
+    :param repeat: :class:`int`
+        How often the timing is repeated. The best run is reported
+    :param min_time: :class:`float`
+        The minimum duration of a single timed run in seconds
+    :param alloc_number: :class:`int`
+        How many calls are made while tracing allocations
+    """
+    number = _calibrate(func, int(min_time * 1e9))
+    best = min(_time(func, number) for _ in range(repeat)) / number
+    blocks, size = _allocations(func, alloc_number)
+    return Result(
+        ns_per_op=best,
+        ops_per_sec=1e9 / best if best else float("inf"),
+        alloc_blocks_per_op=blocks,
+        alloc_bytes_per_op=size
+    )
+
+
+def report(results: dict[str, Result]) -> dict:
+    """Builds the JSON report. Keys are sorted, so reports diff cleanly"""
+    return {
+        "schema": SCHEMA_VERSION,
+        "python": platform.python_version(),
+        "implementation": sys.implementation.name,
+        "machine": platform.machine(),
+        "benchmarks": {
+            name: {
+                field: round(value, 3)
+                for field, value in dataclasses.asdict(result).items()
+            }
+            for name, result in sorted(results.items())
+        }
+    }
+
+
+def dump(results: dict[str, Result], path: str):
+    """Writes the JSON report to path"""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report(results), file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """
+    Compares two JSON reports.
+
+    :param threshold: :class:`float`
+        The relative slowdown that counts as a regression
+
+    Returns
+    -------
+    :class:`list[str]`
+        A description of every regression. Empty if there are none
+    """
+    regressions = []
+    for name, old in baseline["benchmarks"].items():
+        new = current["benchmarks"].get(name)
+        if new is None:
+            regressions.append(f"{name}: missing from the current run")
+            continue
+        if new["ns_per_op"] > old["ns_per_op"] * (1 + threshold):
+            regressions.append(
+                f"{name}: {old['ns_per_op']:.0f} -> {new['ns_per_op']:.0f} ns/op"
+            )
+        if new["alloc_blocks_per_op"] > old["alloc_blocks_per_op"] + ALLOCATION_TOLERANCE:
+            regressions.append(
+                f"{name}: {old['alloc_blocks_per_op']:.2f} -> "
+                f"{new['alloc_blocks_per_op']:.2f} allocations/op"
+            )
+    return regressions
@@ -0,0 +1,80 @@
+"""
+Measures how long importing parts of the library takes in a fresh interpreter
+and whether bleak gets loaded along the way.
+
+Run from the repository root with::
+
+    python -m benchmarks.imports
+    python -m benchmarks.imports --json imports.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+TARGETS = {
+    "anki": "import anki",
+    "anki.misc.msgs": "import anki.misc.msgs",
+    "anki.misc.msg_protocol": "import anki.misc.msg_protocol",
+    "anki.misc.track_pieces": "import anki.misc.track_pieces",
+    "anki.misc.lanes": "import anki.misc.lanes",
+    "anki.misc.advertisement": "import anki.misc.advertisement",
+    "anki.Vehicle": "import anki; anki.Vehicle",
+    "anki.Controller": "import anki; anki.Controller",
+}
+"""The statements being timed"""
+
+_PROBE = """
+import sys, time
+start = time.perf_counter_ns()
+{statement}
+elapsed = time.perf_counter_ns() - start
+print(elapsed, "bleak" in sys.modules)
+"""
+
+
+def measure(statement: str, runs: int) -> tuple[float, bool]:
+    """
+    Runs statement in runs fresh interpreters.
+
+    Returns
+    -------
+    :class:`tuple[float, bool]`
+        The median import time in milliseconds and whether bleak was imported
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (os.getcwd(), env.get("PYTHONPATH"))))
+    times = []
+    loaded_bleak = False
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(statement=statement)],
+            capture_output=True, text=True, check=True, env=env
+        ).stdout.split()
+        times.append(int(output[0]) / 1e6)
+        loaded_bleak = output[1] == "True"
+    return statistics.median(times), loaded_bleak
+
+
+def main(argv: list[str]|None=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.imports", description=__doc__)
+    parser.add_argument("--runs", type=int, default=10, help="interpreters per target")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, statement in TARGETS.items():
+        milliseconds, loaded_bleak = measure(statement, args.runs)
+        results[name] = {"ms": round(milliseconds, 3), "imports_bleak": loaded_bleak}
+        print(f"{name:<28} {milliseconds:8.2f} ms   bleak: {'yes' if loaded_bleak else 'no'}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+            file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
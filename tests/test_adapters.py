@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+from anki.control.adapters import LATENCY_PER_CONNECTION, AdapterLoad, adapter_loads, least_loaded
+
+
+def vehicle(adapter, latency=None):
+    return SimpleNamespace(adapter=adapter, latency=latency)
+
+
+def test_loads_follow_the_adapter_order():
+    vehicles = [vehicle("hci1", 0.02), vehicle("hci1", 0.04), vehicle("hci0"), vehicle("hci9")]
+    loads = adapter_loads(["hci0", "hci1"], vehicles)
+    assert [load.adapter for load in loads] == ["hci0", "hci1"]
+    assert [load.connections for load in loads] == [1, 2]
+    assert loads[0].latency is None
+    assert abs(loads[1].latency - 0.03) < 1e-9
+
+
+def test_score():
+    assert AdapterLoad("hci0", 2, None).score == 2
+    assert AdapterLoad("hci0", 2, LATENCY_PER_CONNECTION).score == 3
+
+
+def test_least_loaded():
+    assert least_loaded(["hci0", "hci1"], []) == "hci0"
+    assert least_loaded(["hci0", "hci1"], [vehicle("hci0")]) == "hci1"
+    assert least_loaded([None], [vehicle(None)]) is None
+
+
+def test_latency_outweighs_a_connection():
+    vehicles = [vehicle("hci0", 3 * LATENCY_PER_CONNECTION), vehicle("hci1"), vehicle("hci1")]
+    assert least_loaded(["hci0", "hci1"], vehicles) == "hci1"
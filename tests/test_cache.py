@@ -0,0 +1,79 @@
+import json
+import time
+
+from anki.misc.advertisement import BatteryState
+from anki.control.cache import DEFAULT_MAX_AGE, VehicleCache
+
+OFF_CHARGER = BatteryState(True, False, False)
+ON_CHARGER = BatteryState(True, False, True)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "vehicles.json")
+    cache = VehicleCache(path)
+    cache.seen("a", name="Skull", version=0x2654, battery=OFF_CHARGER, rssi=-40)
+    cache.assign("a", 3)
+    cache.save()
+
+    loaded = VehicleCache(path)
+    vehicle = loaded.get("a")
+    assert vehicle.vehicle_id == 3
+    assert vehicle.name == "Skull"
+    assert vehicle.version == 0x2654
+    assert vehicle.battery == OFF_CHARGER
+    assert vehicle.rssi == -40
+
+
+def test_seen_keeps_the_id(tmp_path):
+    cache = VehicleCache(str(tmp_path / "vehicles.json"))
+    cache.seen("a", name="Skull", version=1, battery=OFF_CHARGER)
+    cache.assign("a", 3)
+    cache.seen("a", name="Skull", version=1, battery=ON_CHARGER)
+    assert cache.get("a").vehicle_id == 3
+
+
+def test_assign_ignores_unknown_vehicles(tmp_path):
+    cache = VehicleCache(str(tmp_path / "vehicles.json"))
+    cache.assign("a", 3)
+    assert len(cache) == 0
+
+
+def test_known_skips_charging_and_old_vehicles(tmp_path):
+    cache = VehicleCache(str(tmp_path / "vehicles.json"), max_age=60)
+    cache.seen("old", name="Old", version=1, battery=OFF_CHARGER)
+    cache._entries["old"] = cache.get("old")._replace(last_seen=time.time() - 61)
+    cache.seen("docked", name="Docked", version=1, battery=ON_CHARGER)
+    cache.seen("first", name="First", version=1, battery=OFF_CHARGER)
+    cache.seen("second", name="Second", version=1, battery=OFF_CHARGER)
+    cache._entries["first"] = cache.get("first")._replace(last_seen=time.time() - 10)
+    assert [vehicle.address for vehicle in cache.known()] == ["second", "first"]
+
+
+def test_max_age_is_finite_by_default(tmp_path):
+    cache = VehicleCache(str(tmp_path / "vehicles.json"))
+    assert cache.max_age == DEFAULT_MAX_AGE
+    cache.seen("a", name="Skull", version=1, battery=OFF_CHARGER)
+    cache._entries["a"] = cache.get("a")._replace(last_seen=time.time() - DEFAULT_MAX_AGE - 1)
+    assert cache.known() == []
+
+
+def test_broken_files_are_treated_as_empty(tmp_path):
+    path = tmp_path / "vehicles.json"
+    path.write_text("{not json")
+    assert len(VehicleCache(str(path))) == 0
+    path.write_text(json.dumps({"version": 1, "vehicles": [{"address": "a"}]}))
+    assert len(VehicleCache(str(path))) == 0
+    path.write_text(json.dumps({"version": 99, "vehicles": []}))
+    assert len(VehicleCache(str(path))) == 0
+
+
+def test_save_only_writes_changes(tmp_path):
+    path = tmp_path / "vehicles.json"
+    cache = VehicleCache(str(path))
+    cache.save()
+    assert not path.exists()
+    cache.seen("a", name="Skull", version=1, battery=OFF_CHARGER)
+    cache.save()
+    assert path.exists()
+    assert list(tmp_path.iterdir()) == [path]
+    # The temporary file is gone
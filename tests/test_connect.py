@@ -0,0 +1,171 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Optional
+
+import bleak
+import pytest
+from bleak.exc import BleakDBusError
+
+from anki import errors
+from anki.misc.const import VehicleBattery
+from anki.control.connection import ConnectPhase, RetryPolicy
+from anki.control.controller import Controller
+
+FULL = 1 << VehicleBattery.FULL_BATTERY
+
+
+class Simulation:
+    # Stands in for the Bluetooth stack: the vehicles in range and how connecting to them goes
+    def __init__(self, count: int):
+        self.devices = [
+            SimpleNamespace(address=f"00:00:00:00:00:{i:02}", name=chr(FULL) + "\x00" * 7 + "Drive")
+            for i in range(count)
+        ]
+        self.failures: dict[str, list[Optional[str]]] = {}
+        # Per address, where each attempt fails: "connect", "notify" or None for not at all.
+        # Attempts beyond the list succeed
+        self.attempts: dict[str, int] = {}
+        self.active: dict[Optional[str], int] = {}
+        self.peak: dict[Optional[str], int] = {}
+
+    def address(self, index: int) -> str:
+        return self.devices[index].address
+
+    def fails_at(self, address: str, phase: str) -> bool:
+        script = self.failures.get(address, [])
+        attempt = self.attempts[address] - 1
+        return attempt < len(script) and script[attempt] == phase
+
+
+class FakeScanner:
+    simulation: Simulation
+
+    def __init__(self, detection_callback=None, **kwargs):
+        self._callback = detection_callback
+
+    async def __aenter__(self):
+        for device in self.simulation.devices:
+            self._callback(device, SimpleNamespace(local_name=device.name, rssi=-50))
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class FakeServices:
+    def get_service(self, uuid):
+        return self
+
+    def get_characteristic(self, uuid):
+        return uuid
+
+
+class FakeClient:
+    simulation: Simulation
+
+    def __init__(self, device, timeout=10, **kwargs):
+        self.address = device if isinstance(device, str) else device.address
+        self.adapter = kwargs.get("bluez", {}).get("adapter")
+        self.services = FakeServices()
+
+    async def connect(self):
+        simulation = self.simulation
+        simulation.attempts[self.address] = simulation.attempts.get(self.address, 0) + 1
+        active = simulation.active[self.adapter] = simulation.active.get(self.adapter, 0) + 1
+        simulation.peak[self.adapter] = max(simulation.peak.get(self.adapter, 0), active)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            simulation.active[self.adapter] -= 1
+        if simulation.fails_at(self.address, "connect"):
+            raise BleakDBusError("org.bluez.Error.Failed", [])
+        return True
+
+    async def write_gatt_char(self, characteristic, payload):
+        pass
+
+    async def start_notify(self, characteristic, callback):
+        if self.simulation.fails_at(self.address, "notify"):
+            raise errors.ConnectionTimedoutError("Notifications could not be started")
+
+    async def disconnect(self):
+        return True
+
+
+@pytest.fixture
+def simulation(monkeypatch):
+    def create(count: int) -> Simulation:
+        simulation = Simulation(count)
+        monkeypatch.setattr(FakeScanner, "simulation", simulation, raising=False)
+        monkeypatch.setattr(FakeClient, "simulation", simulation, raising=False)
+        return simulation
+
+    monkeypatch.setattr(bleak, "BleakScanner", FakeScanner)
+    monkeypatch.setattr(bleak, "BleakClient", FakeClient)
+    return create
+
+
+def connect_fleet(amount: int, retry: RetryPolicy, **kwargs):
+    async def main():
+        controller = Controller(**kwargs)
+        report = await controller.connect_fleet(amount, retry=retry)
+        for vehicle in controller.vehicles:
+            vehicle._ping_task.cancel()
+        return controller, report
+
+    return asyncio.run(main())
+
+
+def retries(attempts: int) -> RetryPolicy:
+    return RetryPolicy(attempts=attempts, base_delay=0)
+
+
+def test_retries_until_connected(simulation):
+    sim = simulation(1)
+    sim.failures[sim.address(0)] = ["connect", "connect"]
+    controller, report = connect_fleet(1, retries(3))
+    assert report.ok
+    assert sim.attempts[sim.address(0)] == 3
+    assert report.vehicles[0].connect_timings.failed_phase is None
+
+
+def test_gives_up_after_the_last_attempt(simulation):
+    sim = simulation(1)
+    sim.failures[sim.address(0)] = ["connect"] * 3
+    controller, report = connect_fleet(1, retries(2))
+    failure, = report.failures
+    assert failure.attempts == 2
+    assert isinstance(failure.error, errors.ConnectionDatabusError)
+    assert controller.vehicles == set()
+
+
+def test_partial_results(simulation):
+    sim = simulation(3)
+    sim.failures[sim.address(1)] = ["connect"] * 2
+    controller, report = connect_fleet(3, retries(2))
+    assert len(report.vehicles) == 2 and len(report.failures) == 1
+    assert report.failures[0].timings.failed_phase is ConnectPhase.CONNECT
+    assert {v._client.address for v in controller.vehicles} == {sim.address(0), sim.address(2)}
+    with pytest.raises(errors.ConnectionDatabusError):
+        report.raise_first()
+
+
+def test_failures_only_show_the_last_attempt(simulation):
+    sim = simulation(1)
+    sim.failures[sim.address(0)] = ["notify", "connect"]
+    # The first attempt gets as far as starting notifications, the second one fails earlier
+    controller, report = connect_fleet(1, retries(2))
+    failure, = report.failures
+    assert failure.timings.failed_phase is ConnectPhase.CONNECT
+    assert ConnectPhase.SERVICE_LOOKUP not in failure.timings
+    assert ConnectPhase.DISCOVER in failure.timings
+
+
+def test_concurrency_is_limited_per_adapter(simulation):
+    sim = simulation(8)
+    controller, report = connect_fleet(
+        8, retries(1), connect_concurrency=2, adapters=["hci0", "hci1"]
+    )
+    assert report.ok
+    assert sim.peak == {"hci0": 2, "hci1": 2}
+    assert [load.connections for load in controller.adapter_load()] == [4, 4]
@@ -0,0 +1,70 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from anki import errors
+from anki.control.connection import (
+    NO_RETRY,
+    ConnectFailure,
+    ConnectPhase,
+    ConnectReport,
+    ConnectTimings,
+    RetryPolicy
+)
+
+
+def test_should_retry():
+    policy = RetryPolicy(attempts=3)
+    error = errors.ConnectionDatabusError("")
+    assert policy.should_retry(error, 1)
+    assert policy.should_retry(error, 2)
+    assert not policy.should_retry(error, 3)
+    assert not policy.should_retry(errors.VehicleNotFoundError(""), 1)
+    assert not NO_RETRY.should_retry(error, 1)
+
+
+def test_delay_grows_exponentially_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(random, "uniform", lambda low, high: high)
+    policy = RetryPolicy(base_delay=0.5, max_delay=3.0)
+    assert [policy.delay(attempt) for attempt in range(1, 6)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+
+
+def test_delay_is_jittered():
+    policy = RetryPolicy(base_delay=1.0, max_delay=8.0)
+    delays = [policy.delay(3) for _ in range(200)]
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_timings():
+    timings = ConnectTimings()
+    timings.record(ConnectPhase.DISCOVER, 1.0)
+    timings.lap(ConnectPhase.CONNECT)
+    assert ConnectPhase.CONNECT in timings
+    assert timings.failed_phase is ConnectPhase.SERVICE_LOOKUP
+    assert timings.total == pytest.approx(1.0 + timings[ConnectPhase.CONNECT])
+    for phase in ConnectPhase:
+        timings.record(phase, 0.5)
+    assert timings.failed_phase is None
+
+
+def test_report():
+    def timed(**durations) -> ConnectTimings:
+        timings = ConnectTimings()
+        for name, duration in durations.items():
+            timings.record(ConnectPhase[name], duration)
+        return timings
+
+    vehicle = SimpleNamespace(connect_timings=timed(DISCOVER=1.0, CONNECT=2.0))
+    error = errors.ConnectionTimedoutError("")
+    failure = ConnectFailure(None, error, 2, timed(DISCOVER=3.0))
+    report = ConnectReport((vehicle,), (failure,), 4.0)  # type: ignore
+    stats = report.phase_stats()
+    assert stats[ConnectPhase.DISCOVER] == (2, 2.0, 1.0, 3.0)
+    assert stats[ConnectPhase.CONNECT] == (1, 2.0, 2.0, 2.0)
+    assert ConnectPhase.SDK_ENABLE not in stats
+    assert not report.ok
+    with pytest.raises(errors.ConnectionTimedoutError):
+        report.raise_first()
+    ConnectReport((), (), 0.0).raise_first()
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+from anki.misc.const import VehicleBattery
+from anki.control.discovery import DiscoverySession
+
+FULL = 1 << VehicleBattery.FULL_BATTERY
+LOW = 1 << VehicleBattery.LOW_BATTERY
+ON_CHARGER = 1 << VehicleBattery.ON_CHARGER
+
+
+def advertise(session: DiscoverySession, address: str, state: int|None, rssi: int):
+    local_name = None if state is None else chr(state) + "\x00" * 7 + "Drive"
+    session._on_advertisement(
+        SimpleNamespace(address=address),  # type: ignore
+        SimpleNamespace(local_name=local_name, rssi=rssi)  # type: ignore
+    )
+
+
+def test_ranking():
+    session = DiscoverySession()
+    advertise(session, "low", LOW, -30)
+    advertise(session, "weak", FULL, -80)
+    advertise(session, "strong", FULL, -40)
+    advertise(session, "half", 0, -35)
+    advertise(session, "charging", FULL | ON_CHARGER, -20)
+    advertise(session, "phone", None, -10)
+    assert [c.address for c in session.candidates()] == ["strong", "weak", "half", "low"]
+
+
+def test_repeated_advertisements_update_the_signal():
+    session = DiscoverySession()
+    advertise(session, "a", FULL, -80)
+    advertise(session, "b", FULL, -60)
+    advertise(session, "a", FULL, -40)
+    assert [c.address for c in session.candidates()] == ["a", "b"]
+    assert session.advertisements == 3
+
+
+def test_charging_vehicles_are_removed():
+    session = DiscoverySession()
+    advertise(session, "a", FULL, -40)
+    advertise(session, "a", FULL | ON_CHARGER, -40)
+    assert session.candidates() == []
+
+
+def test_claim_hands_out_each_candidate_once():
+    session = DiscoverySession()
+    advertise(session, "a", FULL, -40)
+    advertise(session, "b", FULL, -50)
+    advertise(session, "c", FULL, -60)
+    assert session.claim(exclude={"a"}).address == "b"
+    assert session.claim(address="c").address == "c"
+    assert session.claim(address="c") is None
+    assert session.claim().address == "a"
+    assert session.claim() is None
+    assert len(session) == 0
+
+
+def test_claim_skips_stale_candidates():
+    session = DiscoverySession(max_age=5)
+    advertise(session, "old", FULL, -30)
+    advertise(session, "new", FULL, -50)
+    old = session._candidates["old"]
+    session._candidates["old"] = old._replace(last_seen=old.last_seen - 6)
+    assert session.claim().address == "new"
+    assert session.claim() is None
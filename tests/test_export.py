@@ -0,0 +1,70 @@
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from anki.misc import const, msg_protocol
+from anki.control.export import ExportFormat, TelemetryRecorder
+
+
+def packet(msg_type: int, payload: bytes=b"") -> bytes:
+    return bytes(msg_protocol.assemble_packet(msg_type, payload))
+
+
+def update(piece: int) -> bytes:
+    payload = struct.pack("<BBfHB", 3, piece, 1.5, 500, 0x47)
+    return packet(const.VehicleMsg.TRACK_PIECE_UPDATE, payload)
+
+
+def read(recorder: TelemetryRecorder) -> dict:
+    columns = {}
+    for path in recorder.files:
+        with np.load(path) as archive:
+            for key in archive.files:
+                columns.setdefault(key, []).append(archive[key])
+    return {key: np.concatenate(parts) for key, parts in columns.items()}
+
+
+def test_round_trip(tmp_path):
+    with TelemetryRecorder(str(tmp_path), format=ExportFormat.NPZ, chunk_size=2) as recorder:
+        for i, piece in enumerate((17, 18, 20)):
+            recorder.add(i, 1 + i % 2, update(piece))
+    columns = read(recorder)
+    assert recorder.recorded == 3 and recorder.malformed == 0
+    assert columns["packets.timestamp"].tolist() == [0, 1, 2]
+    assert columns["packets.vehicle_id"].tolist() == [1, 2, 1]
+    assert columns["track_piece_update.piece"].tolist() == [17, 18, 20]
+    assert columns["track_piece_update.speed"].tolist() == [500, 500, 500]
+
+
+def test_malformed_packets_do_not_shift_later_ones(tmp_path):
+    with TelemetryRecorder(str(tmp_path), format=ExportFormat.NPZ) as recorder:
+        recorder.add(0, 1, b"\x09\x27")
+        # The size byte claims more data than the packet has
+        recorder.add(1, 1, update(33))
+    columns = read(recorder)
+    assert recorder.malformed == 1
+    assert columns["packets.msg_type"].tolist() == [0x27, const.VehicleMsg.TRACK_PIECE_UPDATE]
+    assert columns["track_piece_update.piece"].tolist() == [33]
+
+
+def test_trailing_empty_packet(tmp_path):
+    with TelemetryRecorder(str(tmp_path), format=ExportFormat.NPZ, chunk_size=3) as recorder:
+        recorder.add(0, 1, b"\x01\x17")
+        recorder.add(1, 1, b"\x01\x17")
+        recorder.add(2, 1, b"")
+        recorder.add(3, 1, update(36))
+    columns = read(recorder)
+    assert recorder.malformed == 1
+    assert columns["packets.msg_type"].tolist() == [
+        0x17, 0x17, -1, const.VehicleMsg.TRACK_PIECE_UPDATE
+    ]
+    assert columns["track_piece_update.piece"].tolist() == [36]
+
+
+def test_size_byte_does_not_wrap(tmp_path):
+    with TelemetryRecorder(str(tmp_path), format=ExportFormat.NPZ) as recorder:
+        recorder.add(0, 1, b"\xff\x17")
+        # 0xff + 1 must not wrap around to 0 as a uint8
+    assert recorder.malformed == 1
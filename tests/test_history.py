@@ -0,0 +1,58 @@
+import pytest
+
+from anki.control.history import NO_POSITION, TelemetryHistory
+
+
+def filled(capacity: int, count: int) -> TelemetryHistory:
+    history = TelemetryHistory(capacity)
+    for i in range(count):
+        history.record(i * 10, 17, i, float(i), 100 + i, i if i % 2 else None)
+    return history
+
+
+def test_partial():
+    history = filled(8, 3)
+    assert len(history) == 3
+    assert history.all().timestamps.tolist() == [0, 10, 20]
+    assert history.all().positions.tolist() == [NO_POSITION, 1, NO_POSITION]
+
+
+def test_wraparound_keeps_the_newest():
+    history = filled(4, 10)
+    assert len(history) == 4
+    window = history.all()
+    assert window.timestamps.tolist() == [60, 70, 80, 90]
+    assert window.speeds.tolist() == [106, 107, 108, 109]
+    assert history.last(2).locs.tolist() == [8, 9]
+    assert history.last(100).size == 4
+    assert history.last(0).size == 0
+
+
+def test_exactly_full():
+    history = filled(4, 4)
+    assert history.all().timestamps.tolist() == [0, 10, 20, 30]
+
+
+@pytest.mark.parametrize("count", [3, 4, 10])
+def test_since(count):
+    history = filled(4, count)
+    timestamps = history.all().timestamps.tolist()
+    for timestamp in range(-5, count * 10 + 5):
+        expected = [t for t in timestamps if t >= timestamp]
+        assert history.since(timestamp).timestamps.tolist() == expected
+
+
+def test_windows_are_read_only():
+    window = filled(4, 2).all()
+    with pytest.raises(TypeError):
+        window.speeds[0] = 1
+
+
+def test_clear_and_validation():
+    history = filled(4, 6)
+    history.clear()
+    assert len(history) == 0 and history.all().size == 0
+    with pytest.raises(ValueError):
+        TelemetryHistory(0)
+    with pytest.raises(ValueError):
+        history.last(-1)
@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+from anki.misc.const import VehicleBattery
+from anki.control import monitor
+from anki.control.monitor import AdvertisementMonitor
+
+FULL = 1 << VehicleBattery.FULL_BATTERY
+ON_CHARGER = 1 << VehicleBattery.ON_CHARGER
+
+
+def advertise(target: AdvertisementMonitor, address: str, state: int|None, rssi: int=-50):
+    local_name = None if state is None else chr(state) + "\x00" * 7 + "Drive"
+    target._on_advertisement(
+        SimpleNamespace(address=address),  # type: ignore
+        SimpleNamespace(local_name=local_name, rssi=rssi)  # type: ignore
+    )
+
+
+def test_changes_are_coalesced():
+    async def main():
+        target = AdvertisementMonitor(interval=0.01)
+        batches = []
+        target.subscribe(batches.append)
+        for _ in range(5):
+            advertise(target, "a", FULL)
+            advertise(target, "b", FULL | ON_CHARGER)
+        await asyncio.sleep(0.05)
+        return target, batches
+
+    target, batches = asyncio.run(main())
+    assert [[vehicle.address for vehicle in batch] for batch in batches] == [["a", "b"]]
+    assert target.advertisements == 10 and target.changes == 2
+    assert [vehicle.address for vehicle in target.available()] == ["a"]
+
+
+def test_ignored_devices_are_bounded(monkeypatch):
+    monkeypatch.setattr(monitor, "MAX_IGNORED", 4)
+    target = AdvertisementMonitor()
+    for i in range(10):
+        advertise(target, f"phone-{i}", None)
+    assert list(target._ignored) == [f"phone-{i}" for i in range(6, 10)]
+    assert target.inventory() == []
+
+
+def test_rotating_named_devices_are_bounded(monkeypatch):
+    monkeypatch.setattr(monitor, "MAX_SIGHTINGS", 16)
+
+    def pixel(target: AdvertisementMonitor, address: str):
+        target._on_advertisement(
+            SimpleNamespace(address=address),  # type: ignore
+            SimpleNamespace(local_name="Pixel 7", rssi=-60)  # type: ignore
+        )
+
+    async def main():
+        target = AdvertisementMonitor(interval=0.01)
+        advertise(target, "vehicle", FULL)
+        for i in range(5000):
+            pixel(target, f"pixel-{i}")
+            if i % 10 == 0:
+                advertise(target, "vehicle", FULL)
+                # Still advertising, so it is never the least recently heard
+        await asyncio.sleep(0.05)
+        return target
+
+    target = asyncio.run(main())
+    assert len(target._sightings) <= 16
+    assert "vehicle" in target._sightings
+
+
+def test_stale_sightings_are_removed():
+    async def main():
+        target = AdvertisementMonitor(interval=0.01, max_age=0.1)
+        for i in range(10):
+            advertise(target, f"old-{i}", FULL)
+        await asyncio.sleep(0.15)
+        advertise(target, "new", FULL)
+        await asyncio.sleep(0.03)
+        return target
+
+    target = asyncio.run(main())
+    assert list(target._sightings) == ["new"]
+    assert [vehicle.address for vehicle in target.inventory()] == ["new"]
@@ -0,0 +1,50 @@
+import asyncio
+from types import SimpleNamespace
+
+from anki.misc.advertisement import BatteryState
+from anki.control.events import VehicleEvent
+from anki.control.vehicle import Vehicle
+
+
+class PongClient:
+    # Answers the pings it is sent after the delays in replies, or not at all for None
+    def __init__(self, replies: list):
+        self.address = "a"
+        self.vehicle: Vehicle
+        self.replies = replies
+        self.pings = 0
+
+    async def write_gatt_char(self, characteristic, payload):
+        delay = self.replies[self.pings] if self.pings < len(self.replies) else 0.0
+        self.pings += 1
+        if delay is not None:
+            asyncio.get_running_loop().call_later(delay, self.vehicle._handle_pong, None)
+
+
+def test_latency_recovers_after_a_missed_pong(monkeypatch):
+    monkeypatch.setattr(
+        Vehicle, "AUTOMATIC_PING_CONTROL", {"interval": 0.01, "timeout": 0.05, "max_timeouts": 5}
+    )
+
+    async def main():
+        client = PongClient([None, 0.08, 0.0])
+        # The first pong never comes, the second one comes after its ping timed out
+        vehicle = Vehicle(
+            1, SimpleNamespace(address="a"), client,  # type: ignore
+            battery=BatteryState(True, False, False)
+        )
+        client.vehicle = vehicle
+        vehicle._is_connected = True
+        vehicle._write_chara = "write"
+        task = asyncio.ensure_future(vehicle._auto_ping())
+        try:
+            while client.pings < 5 and not task.done():
+                await asyncio.sleep(0.01)
+            assert not task.done(), task
+            assert vehicle.latency is not None and vehicle.latency < 0.05
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        assert len(vehicle._events._subscribers.get(VehicleEvent.PONG, {})) == 0
+
+    asyncio.run(main())
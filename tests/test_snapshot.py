@@ -0,0 +1,57 @@
+import math
+from types import SimpleNamespace
+
+from anki.control.snapshot import NO_POSITION, FleetTable
+
+
+def fleet(*vehicle_ids: int) -> tuple[FleetTable, list]:
+    table = FleetTable()
+    owners = []
+    for vehicle_id in vehicle_ids:
+        owner = SimpleNamespace()
+        owner._fleet_row = table.add(owner, vehicle_id)
+        owners.append(owner)
+    return table, owners
+
+
+def test_new_rows_are_unknown():
+    table, _ = fleet(1)
+    snapshot = table.snapshot()
+    assert snapshot.ids.tolist() == [1]
+    assert snapshot.positions.tolist() == [NO_POSITION]
+    assert math.isnan(snapshot.offsets[0])
+
+
+def test_remove_moves_the_last_row():
+    table, owners = fleet(1, 2, 3)
+    for owner, speed in zip(owners, (100, 200, 300)):
+        table.write(owner._fleet_row, None, 0.0, speed, speed)
+    table.remove(owners[0]._fleet_row)
+    snapshot = table.snapshot()
+    assert snapshot.ids.tolist() == [3, 2]
+    assert snapshot.speeds.tolist() == [300, 200]
+    assert owners[2]._fleet_row == 0
+    assert owners[1]._fleet_row == 1
+
+    table.write(owners[2]._fleet_row, 4, 1.5, 350, 400)
+    assert table.snapshot().speeds.tolist() == [350, 200]
+    assert table.snapshot().index_of(3) == 0
+
+
+def test_remove_the_last_row():
+    table, owners = fleet(1, 2)
+    table.remove(owners[1]._fleet_row)
+    assert table.snapshot().ids.tolist() == [1]
+    assert owners[0]._fleet_row == 0
+    assert len(table) == 1
+
+
+def test_unchanged_snapshots_are_reused():
+    table, owners = fleet(1)
+    snapshot = table.snapshot()
+    assert table.snapshot() is snapshot
+    table.write(owners[0]._fleet_row, 1, 0.0, 10, 1)
+    changed = table.snapshot()
+    assert changed is not snapshot
+    assert snapshot.speeds.tolist() == [0]
+    # Older snapshots are not affected by later writes
@@ -0,0 +1,69 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from anki.misc import const
+from anki.misc.advertisement import BatteryState
+from anki.control.vehicle import Vehicle
+from anki.control.streams import OverflowPolicy, TelemetryStream
+
+
+def drain(stream: TelemetryStream) -> list:
+    items = []
+    while len(stream):
+        items.append(stream.get_nowait())
+    return items
+
+
+def test_drop_oldest():
+    stream = TelemetryStream(3, OverflowPolicy.DROP_OLDEST)
+    for i in range(5):
+        stream.offer(i)
+    assert drain(stream) == [2, 3, 4]
+    assert stream.dropped == 2
+
+
+def test_drop_newest():
+    stream = TelemetryStream(3, OverflowPolicy.DROP_NEWEST)
+    for i in range(5):
+        stream.offer(i)
+    assert drain(stream) == [0, 1, 2]
+    assert stream.dropped == 2
+
+
+def test_block_waits_for_space():
+    async def main():
+        stream = TelemetryStream(1, OverflowPolicy.BLOCK)
+        await stream.put(0)
+        blocked = asyncio.ensure_future(stream.put(1))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        assert await stream.get() == 0
+        assert await blocked
+        assert await stream.get() == 1
+        assert stream.dropped == 0
+
+    asyncio.run(main())
+
+
+def test_iteration_ends_after_close():
+    async def main():
+        stream = TelemetryStream(4)
+        stream.offer(1)
+        stream.offer(2)
+        stream.close()
+        assert not stream.offer(3)
+        return [item async for item in stream]
+
+    assert asyncio.run(main()) == [1, 2]
+
+
+def test_vehicle_streams_reject_block():
+    address = SimpleNamespace(address="a")
+    vehicle = Vehicle(1, address, address, battery=BatteryState(True, False, False))  # type: ignore
+    with pytest.raises(ValueError):
+        vehicle.stream(const.VehicleMsg.TRACK_PIECE_UPDATE, policy=OverflowPolicy.BLOCK)
+    with pytest.raises(ValueError):
+        vehicle.battery_states(policy=OverflowPolicy.BLOCK)
+    vehicle.track_updates(policy=OverflowPolicy.DROP_NEWEST).close()